@@ -1,25 +1,29 @@
 # File: app.py
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 from flask_socketio import SocketIO, emit
 import threading
 import time
-from emulators.simulate_emulator import EmulatorSimulator
-from emulators import CHIP8
+from serving.sessions import SessionManager
+from serving.frame_codec import encode_png
+from experiment_tracking.StreamingLogger import StreamingLogger, MetricReader
 import numpy as np
-import base64
-import io
-from PIL import Image
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'secret!'
 socketio = SocketIO(app)
 
-# Global variables to store emulator states
-chip8 = None
-simulators = {}
-current_frame = None
-training_logs = {}
+EXPERIMENT_DIR = 'experiments'
+# A followed log that has not grown for this long is assumed abandoned and its feed stops
+TRAINING_FEED_IDLE_TIMEOUT = 300.0
+# experiment_id -> stop Event of the thread tailing that experiment's log
+training_feeds = {}
+
+def send(event, data, to, callback=None):
+    socketio.emit(event, data, to=to, callback=callback)
+
+# Every emulation session is advanced by the manager's single scheduler thread
+sessions = SessionManager(send, 'config.json')
 
 @app.route('/')
 def index():
@@ -27,69 +31,109 @@ def index():
 
 @app.route('/start_emulation', methods=['POST'])
 def start_emulation():
-    global chip8, simulators, current_frame
     rom_path = request.json['rom_path']
-    model_paths = request.json['model_paths']
-    
-    chip8 = CHIP8('config.json')
-    chip8.load_rom(rom_path)
-    
-    simulators = {
-        model_path: EmulatorSimulator(model_path) for model_path in model_paths
-    }
-    
-    current_frame = np.zeros((32, 64), dtype=np.uint8)
-    
-    threading.Thread(target=emulation_loop, daemon=True).start()
+    model_paths = request.json.get('model_paths', [])
+    try:
+        session = sessions.create_session(rom_path, model_paths)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    sessions.start()
+    return jsonify({"status": "success", "session_id": session.session_id, "streams": session.stream_names})
+
+@app.route('/stop_emulation', methods=['POST'])
+def stop_emulation():
+    if not sessions.stop_session(request.json['session_id']):
+        return jsonify({"status": "error", "message": "Unknown session"}), 404
     return jsonify({"status": "success"})
 
-def emulation_loop():
-    global chip8, simulators, current_frame
-    while True:
-        chip8_frame = chip8.run_frame()
-        current_frame = chip8_frame
-        
-        frames = {
-            "CHIP-8": encode_frame(chip8_frame)
-        }
-        
-        for name, simulator in simulators.items():
-            simulator.set_frame(chip8_frame)
-            ai_frame = simulator.run_frame()
-            frames[name] = encode_frame(ai_frame)
-        
-        socketio.emit('frames', frames)
-        time.sleep(1/60)  # Cap at 60 FPS
-
-def encode_frame(frame):
-    img = Image.fromarray(frame)
-    buffered = io.BytesIO()
-    img.save(buffered, format="PNG")
-    return base64.b64encode(buffered.getvalue()).decode('utf-8')
+@app.route('/sessions')
+def list_sessions():
+    return jsonify({"sessions": sessions.list_sessions(), "tick_seconds": sessions.tick_seconds})
+
+@app.route('/snapshot/<session_id>.png')
+def snapshot(session_id):
+    session = sessions.get(session_id)
+    if session is None:
+        return Response(status=404)
+    return Response(encode_png(session.last_frame), mimetype='image/png')
+
+@socketio.on('watch')
+def handle_watch(data):
+    session = sessions.get(data['session_id'])
+    if session is None:
+        emit('session_stopped', {"session_id": data['session_id']})
+        return
+    # A page watches one session at a time; stream names go out before its first frame
+    sessions.unwatch(request.sid)
+    emit('streams', {"session_id": session.session_id, "names": session.stream_names})
+    sessions.watch(session.session_id, request.sid)
+
+@socketio.on('keys')
+def handle_keys(data):
+    session = sessions.get(data['session_id'])
+    if session is not None:
+        try:
+            session.set_keys(data.get('keys'))
+        except ValueError as e:
+            emit('keys_error', {"status": "error", "session_id": session.session_id, "message": str(e)})
+
+@socketio.on('request_keyframe')
+def handle_request_keyframe(data):
+    sessions.request_keyframe(data['session_id'], request.sid)
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    sessions.unwatch(request.sid)
 
 @app.route('/start_training', methods=['POST'])
 def start_training():
     model_name = request.json['model_name']
-    training_logs[model_name] = []
-    threading.Thread(target=simulate_training, args=(model_name,), daemon=True).start()
+    logger = StreamingLogger(EXPERIMENT_DIR, flush_interval=1.0)
+    logger.log_parameter('model_name', model_name)
+    watch_training_log(logger.experiment_id, model_name)
+    threading.Thread(target=simulate_training, args=(logger,), daemon=True).start()
+    return jsonify({"status": "success", "experiment_id": logger.experiment_id})
+
+@app.route('/watch_training', methods=['POST'])
+def watch_training():
+    """Follow any experiment log (e.g. a main.py run) on the training_update feed."""
+    experiment_id = request.json['experiment_id']
+    # Only ids of existing logs: the id becomes part of a file path
+    if experiment_id not in MetricReader.list_experiments(EXPERIMENT_DIR):
+        return jsonify({"status": "error", "message": "Unknown experiment"}), 404
+    watch_training_log(experiment_id, request.json.get('model_name', experiment_id),
+                       request.json.get('metrics', ['train_loss', 'val_loss']))
     return jsonify({"status": "success"})
 
-def simulate_training(model_name):
+def watch_training_log(experiment_id, model_name, metrics=None):
+    if experiment_id in training_feeds:
+        return
+    stop = threading.Event()
+    training_feeds[experiment_id] = stop
+    threading.Thread(target=feed_training_updates, args=(experiment_id, model_name, metrics, stop),
+                     daemon=True).start()
+
+def feed_training_updates(experiment_id, model_name, metrics, stop):
+    # Replays what is already logged, then follows new flushes until the run closes its log
+    reader = MetricReader.for_experiment(EXPERIMENT_DIR, experiment_id)
+    try:
+        for record in reader.tail(names=metrics, stop_event=stop, idle_timeout=TRAINING_FEED_IDLE_TIMEOUT):
+            socketio.emit('training_update', {
+                "model_name": model_name,
+                "experiment_id": experiment_id,
+                "name": record["name"],
+                "step": record["step"],
+                "value": record["value"]
+            })
+    finally:
+        training_feeds.pop(experiment_id, None)
+
+def simulate_training(logger):
     for i in range(100):
-        loss = np.random.rand()
-        accuracy = np.random.rand()
-        training_logs[model_name].append({
-            "epoch": i,
-            "loss": loss,
-            "accuracy": accuracy
-        })
-        socketio.emit('training_update', {
-            "model_name": model_name,
-            "epoch": i,
-            "loss": loss,
-            "accuracy": accuracy
-        })
+        logger.log_metric('loss', np.random.rand(), i)
+        logger.log_metric('accuracy', np.random.rand(), i)
         time.sleep(1)  # Simulate training time
+    logger.close()
 
 if __name__ == '__main__':
     socketio.run(app, debug=True)
\ No newline at end of file
@@ -0,0 +1,151 @@
+// File: benchmarks/bench_chip8.cpp
+//
+// Throughput of the C++ core without any Python in the way. Prints one JSON
+// object; benchmarks/run_benchmarks.py runs this binary and merges its results.
+//
+//   bench_chip8 [rom_path] [--seconds S] [--batch N] [--threads T]
+
+#include "chip8_batch.hpp"
+#include "chip8_emulator.hpp"
+
+#include <algorithm>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <string>
+#include <vector>
+
+namespace {
+
+using Clock = std::chrono::steady_clock;
+
+struct Result {
+    std::string name;
+    double value;
+    const char* unit;
+};
+
+// Repeats `fn` (which returns how many operations it did) for `seconds` and
+// returns operations per second, taking the best of a few windows so one
+// preempted window does not read as a regression.
+template <typename Fn>
+double measure(double seconds, Fn&& fn, int windows = 3) {
+    fn();  // warm up caches and the decoded-instruction table
+    double best = 0.0;
+    for (int window = 0; window < windows; ++window) {
+        const auto start = Clock::now();
+        double elapsed = 0.0;
+        double operations = 0.0;
+        while (elapsed < seconds / windows) {
+            operations += static_cast<double>(fn());
+            elapsed = std::chrono::duration<double>(Clock::now() - start).count();
+        }
+        best = std::max(best, operations / elapsed);
+    }
+    return best;
+}
+
+CHIP8Emulator make_emulator(const std::string& rom_path, ExecutionEngine engine, bool idle_skip) {
+    CHIP8Emulator emulator;
+    if (!emulator.load_rom(rom_path)) {
+        std::fprintf(stderr, "Failed to load ROM: %s\n", rom_path.c_str());
+        std::exit(1);
+    }
+    emulator.seed(0);
+    emulator.set_engine(engine);
+    emulator.set_idle_skip(idle_skip);
+    return emulator;
+}
+
+}  // namespace
+
+int main(int argc, char** argv) {
+    std::string rom_path = "Airplane.ch8";
+    double seconds = 0.5;
+    size_t batch_size = 64;
+    size_t threads = 1;
+    for (int i = 1; i < argc; ++i) {
+        if (std::strcmp(argv[i], "--seconds") == 0 && i + 1 < argc) {
+            seconds = std::atof(argv[++i]);
+        } else if (std::strcmp(argv[i], "--batch") == 0 && i + 1 < argc) {
+            batch_size = static_cast<size_t>(std::atoi(argv[++i]));
+        } else if (std::strcmp(argv[i], "--threads") == 0 && i + 1 < argc) {
+            threads = static_cast<size_t>(std::atoi(argv[++i]));
+        } else {
+            rom_path = argv[i];
+        }
+    }
+
+    std::vector<Result> results;
+    const size_t block = 10000;
+
+    // Raw instruction rate through step(), one call per instruction
+    const std::pair<const char*, ExecutionEngine> engines[] = {
+        {"interpreter", ExecutionEngine::Interpreter},
+        {"cached", ExecutionEngine::Cached},
+    };
+    for (const auto& [engine_name, engine] : engines) {
+        CHIP8Emulator emulator = make_emulator(rom_path, engine, false);
+        results.push_back({std::string("step_") + engine_name, measure(seconds, [&] {
+            for (size_t i = 0; i < block; ++i) {
+                emulator.step();
+            }
+            return block;
+        }), "cycles/s"});
+
+        // The batched loop used by run_frame; with idle skipping the rate counts skipped cycles too
+        for (bool idle_skip : {false, true}) {
+            CHIP8Emulator looped = make_emulator(rom_path, engine, idle_skip);
+            results.push_back({std::string("run_cycles_") + engine_name + (idle_skip ? "_idle_skip" : ""),
+                               measure(seconds, [&] {
+                looped.run_cycles(block);
+                return block;
+            }), "cycles/s"});
+        }
+    }
+
+    CHIP8Emulator emulator = make_emulator(rom_path, ExecutionEngine::Cached, true);
+    emulator.run_frames(60, 10);
+    std::vector<uint8_t> frame(CHIP8Emulator::SCREEN_WIDTH * CHIP8Emulator::SCREEN_HEIGHT);
+    results.push_back({"get_frame", measure(seconds, [&] {
+        for (size_t i = 0; i < 1000; ++i) {
+            emulator.get_frame(frame.data(), frame.size());
+        }
+        return 1000;
+    }), "calls/s"});
+
+    std::vector<uint8_t> state = emulator.get_state();
+    results.push_back({"get_state", measure(seconds, [&] {
+        for (size_t i = 0; i < 1000; ++i) {
+            emulator.get_state(state.data(), state.size());
+        }
+        return 1000;
+    }), "calls/s"});
+    results.push_back({"set_state", measure(seconds, [&] {
+        for (size_t i = 0; i < 1000; ++i) {
+            emulator.set_state(state.data(), state.size());
+        }
+        return 1000;
+    }), "calls/s"});
+
+    CHIP8Batch batch(batch_size, threads);
+    batch.seed(0);
+    if (!batch.load_rom(rom_path)) {
+        std::fprintf(stderr, "Failed to load ROM: %s\n", rom_path.c_str());
+        return 1;
+    }
+    results.push_back({"batch_run_frames", measure(seconds, [&] {
+        batch.run_frames(10, 10);
+        return 10 * batch_size;
+    }), "frames/s"});
+
+    std::printf("{\n  \"rom\": \"%s\",\n  \"batch_size\": %zu,\n  \"threads\": %zu,\n  \"results\": {\n",
+                rom_path.c_str(), batch_size, threads);
+    for (size_t i = 0; i < results.size(); ++i) {
+        std::printf("    \"%s\": {\"value\": %.1f, \"unit\": \"%s\"}%s\n", results[i].name.c_str(),
+                    results[i].value, results[i].unit, i + 1 < results.size() ? "," : "");
+    }
+    std::printf("  }\n}\n");
+    return 0;
+}
@@ -0,0 +1,172 @@
+# File: benchmarks/profile_roms.py
+"""Execution profiles of CHIP-8 ROMs: where each ROM spends its cycles.
+
+Every ROM is run for a number of frames with profiling enabled, under one of the
+capture input policies, and reported as:
+
+- the share of instructions per opcode class,
+- draw and clear counts and the share of cycles spent in Fx0A key waits,
+- its hot loops, ranked by the share of all cycles spent inside them.
+
+A loop is the range from a backward jump's target to the jump (JP to itself
+included), or a single Fx0A waiting for a key. Nested loops are each listed, so
+an outer loop's share includes its inner loops'.
+
+    python benchmarks/profile_roms.py Airplane.ch8 roms/ --frames 3600 --top 5
+    python benchmarks/profile_roms.py roms/ --policy sticky --output profiles.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+PROGRAM_START = 0x200
+MEMORY_SIZE = 4096
+
+OPCODE_CLASSES = (
+    "0nnn SYS/CLS/RET", "1nnn JP", "2nnn CALL", "3xnn SE", "4xnn SNE", "5xy0 SE", "6xnn LD", "7xnn ADD",
+    "8xyn ALU", "9xy0 SNE", "Annn LD I", "Bnnn JP V0", "Cxnn RND", "Dxyn DRW", "ExNN SKP/SKNP", "FxNN misc",
+)
+
+def rom_paths(paths):
+    """Expand directories into the .ch8 files they contain."""
+    roms = []
+    for path in paths:
+        if os.path.isdir(path):
+            roms.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(".ch8")))
+        else:
+            roms.append(path)
+    return roms
+
+def load_memory(rom_path):
+    """The ROM as loaded at 0x200; like the core's load_rom, oversized ROMs are rejected."""
+    memory = np.zeros(MEMORY_SIZE, dtype=np.uint8)
+    with open(rom_path, "rb") as f:
+        rom = np.frombuffer(f.read(), dtype=np.uint8)
+    if len(rom) > MEMORY_SIZE - PROGRAM_START:
+        raise ValueError(f"ROM too large ({len(rom)} bytes, at most {MEMORY_SIZE - PROGRAM_START}): {rom_path}")
+    memory[PROGRAM_START:PROGRAM_START + len(rom)] = rom
+    return memory
+
+def describe(opcodes):
+    """Short label for a loop body from the opcodes it contains."""
+    if len(opcodes) == 1 and opcodes[0] & 0xF000 == 0x1000:
+        return "spin (jump to self)"
+    if len(opcodes) == 1 and opcodes[0] & 0xF0FF == 0xF00A:
+        return "key wait"
+    labels = []
+    if any(op & 0xF0FF == 0xF007 for op in opcodes):
+        labels.append("timer poll")
+    if any(op & 0xF000 == 0xD000 for op in opcodes):
+        labels.append("draws")
+    if any(op & 0xF000 == 0xE000 for op in opcodes):
+        labels.append("reads keys")
+    if any(op & 0xF000 == 0x2000 for op in opcodes):
+        labels.append("calls")
+    return ", ".join(labels) or "compute"
+
+def hot_loops(memory, pc_hits, top):
+    """Loops found from executed backward jumps and key waits, hottest first."""
+    total = int(pc_hits.sum())
+    if total == 0:
+        return []
+    loops = []
+    for address in np.flatnonzero(pc_hits[:-1]):
+        opcode = int(memory[address]) << 8 | int(memory[address + 1])
+        if opcode & 0xF000 == 0x1000 and opcode & 0x0FFF <= address:
+            start = opcode & 0x0FFF
+        elif opcode & 0xF0FF == 0xF00A:
+            start = address
+        else:
+            continue
+        end = address + 2
+        cycles = int(pc_hits[start:end].sum())
+        opcodes = [int(memory[a]) << 8 | int(memory[a + 1]) for a in range(start, end, 2)]
+        loops.append({
+            "start": int(start),
+            "end": int(end),
+            "cycles": cycles,
+            "share": cycles / total,
+            # Times the closing jump or wait ran
+            "iterations": int(pc_hits[address]),
+            "kind": describe(opcodes),
+        })
+    loops.sort(key=lambda loop: loop["cycles"], reverse=True)
+    return loops[:top]
+
+def profile_rom(rom_path, args):
+    from data.input_policies import make_input_policy
+    from emulators.chip8_wrapper import CHIP8
+
+    memory = load_memory(rom_path)
+    emulator = CHIP8(args.config, seed=args.seed)
+    if not emulator.load_rom(rom_path):
+        raise ValueError(f"Failed to load ROM: {rom_path}")
+    emulator.set_profiling(True)
+    policy = make_input_policy(args.policy, seed=args.seed)
+    for frame_index in range(args.frames):
+        emulator.set_keys(policy(frame_index).tolist())
+        emulator.advance(1)
+    profile = emulator.get_profile()
+
+    total = int(profile["pc_hits"].sum())
+    classes = profile["opcode_classes"]
+    return {
+        "rom": os.path.basename(rom_path),
+        "frames": args.frames,
+        "instructions": total,
+        "draws": int(profile["draws"]),
+        "clears": int(profile["clears"]),
+        "key_wait_cycles": int(profile["key_wait_cycles"]),
+        "key_wait_share": int(profile["key_wait_cycles"]) / total if total else 0.0,
+        "opcode_classes": {OPCODE_CLASSES[i]: int(count) for i, count in enumerate(classes) if count},
+        "hot_loops": hot_loops(memory, profile["pc_hits"], args.top),
+    }
+
+def print_report(report, top_classes=5):
+    total = report["instructions"] or 1
+    print(f"{report['rom']}: {report['frames']} frames, {report['instructions']:,} instructions, "
+          f"{report['draws']:,} draws, {report['clears']:,} clears, "
+          f"{report['key_wait_share']:.1%} of cycles in Fx0A waits")
+    classes = sorted(report["opcode_classes"].items(), key=lambda item: item[1], reverse=True)
+    print("  opcode classes: " + ", ".join(f"{name} {count / total:.1%}" for name, count in classes[:top_classes]))
+    if not report["hot_loops"]:
+        print("  no loops executed")
+    for loop in report["hot_loops"]:
+        print(f"  {loop['start']:#05x}-{loop['end'] - 2:#05x} {loop['share']:>7.1%} "
+              f"{loop['iterations']:>12,} iterations  {loop['kind']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank the hot loops of CHIP-8 ROMs from execution profiles")
+    parser.add_argument("roms", type=str, nargs="+", help="ROM files or directories of .ch8 files")
+    parser.add_argument("--config", type=str, default="config.json")
+    parser.add_argument("--frames", type=int, default=3600, help="Frames to run each ROM for (60 per second)")
+    parser.add_argument("--policy", type=str, default="random", help="Input policy: none, random or sticky")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=5, help="Hot loops to list per ROM")
+    parser.add_argument("--output", type=str, default=None, help="Write the reports as JSON here")
+    args = parser.parse_args()
+
+    reports = []
+    for rom_path in rom_paths(args.roms):
+        try:
+            report = profile_rom(rom_path, args)
+        except ValueError as e:
+            print(f"Skipping {rom_path}: {e}", file=sys.stderr)
+            continue
+        reports.append(report)
+        print_report(report)
+        print()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+# File: benchmarks/run_benchmarks.py
+"""Performance suite for the emulator core, bindings, capture, encoding and models.
+
+Every result is a {"value", "unit", "higher_is_better"} entry keyed by name, so runs
+can be written as JSON and compared against a stored baseline:
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.25
+    python benchmarks/run_benchmarks.py --save_baseline benchmarks/baseline.json --repeats 5
+
+The C++ numbers come from the bench_chip8 binary (built with the project; point
+--cpp_bench at it). Suites whose optional dependencies (torch, PIL) are missing
+are reported as skipped. Baselines are machine-specific; regenerate them on the
+machine that runs the comparison.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+SUITES = ("cpp", "bindings", "capture", "encoding", "simulator", "trainer")
+
+def rate(fn, seconds, windows=3):
+    """Operations per second of `fn` (which returns its operation count) over `seconds`.
+
+    The best of a few windows is reported, so one preempted window does not read as
+    a regression.
+    """
+    fn()
+    best = 0.0
+    for _ in range(windows):
+        operations = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < seconds / windows:
+            operations += fn()
+            elapsed = time.perf_counter() - start
+        best = max(best, operations / elapsed)
+    return best
+
+def latency(fn, seconds, min_iterations=5):
+    """Median and p95 wall time of `fn` in milliseconds."""
+    fn()
+    timings = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline or len(timings) < min_iterations:
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1e3), float(np.percentile(timings, 95) * 1e3)
+
+def result(value, unit, higher_is_better=True):
+    return {"value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+def bench_cpp(args):
+    binary = args.cpp_bench
+    if not binary or not os.path.exists(binary):
+        raise FileNotFoundError(f"bench_chip8 binary not found at {binary!r}; build the project or pass --cpp_bench")
+    output = subprocess.run([binary, args.rom, "--seconds", str(args.seconds)],
+                            check=True, capture_output=True, text=True).stdout
+    return {f"cpp.{name}": result(entry["value"], entry["unit"])
+            for name, entry in json.loads(output)["results"].items()}
+
+def bench_bindings(args):
+    from emulators.emulator_module import CHIP8Emulator, ExecutionEngine
+
+    emulator = CHIP8Emulator()
+    emulator.load_rom(args.rom)
+    emulator.engine = ExecutionEngine.CACHED
+    emulator.idle_skip = False
+    emulator.run_frames(60, 10)
+    block = 1000
+
+    def steps():
+        for _ in range(block):
+            emulator.step()
+        return block
+
+    def run_cycles():
+        emulator.run_cycles(block * 100)
+        return block * 100
+
+    def property_reads():
+        for _ in range(block):
+            emulator.idle_skip
+        return block
+
+    step_rate = rate(steps, args.seconds)
+    cycle_rate = rate(run_cycles, args.seconds)
+    results = {
+        "bindings.step_calls": result(step_rate, "calls/s"),
+        "bindings.run_cycles": result(cycle_rate, "cycles/s"),
+        # Cost of crossing into C++ for a call that does no work
+        "bindings.call_overhead": result(1e9 / rate(property_reads, args.seconds), "ns", False),
+        # What one step() costs beyond the instruction it executes
+        "bindings.step_overhead": result(1e9 / step_rate - 1e9 / cycle_rate, "ns", False),
+    }
+
+    frame = np.empty((32, 64), dtype=np.uint8)
+    state = bytearray(len(emulator.get_state()))
+    snapshot = emulator.get_state()
+    calls = {
+        "get_frame": lambda: emulator.get_frame(),
+        "get_frame_into": lambda: emulator.get_frame_into(frame),
+        "get_state": lambda: emulator.get_state(),
+        "get_state_into": lambda: emulator.get_state_into(state),
+        "set_state": lambda: emulator.set_state(snapshot),
+    }
+    for name, call in calls.items():
+        def repeated(call=call):
+            for _ in range(block):
+                call()
+            return block
+        results[f"bindings.{name}"] = result(rate(repeated, args.seconds), "calls/s")
+    return results
+
+def bench_capture(args):
+    from data.capture import DataCapture
+    from emulators.chip8_wrapper import CHIP8
+
+    results = {}
+    for packed in (False, True):
+        emulator = CHIP8(args.config)
+        emulator.load_rom(args.rom)
+        capture = DataCapture(emulator, packed=packed)
+
+        def frames():
+            capture.run_and_capture(100)
+            return 100
+
+        name = "capture.packed_frames" if packed else "capture.frames"
+        results[name] = result(rate(frames, args.seconds), "frames/s")
+    return results
+
+def captured_frames(args, count):
+    from emulators.chip8_wrapper import CHIP8
+
+    emulator = CHIP8(args.config)
+    emulator.load_rom(args.rom)
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(count):
+        emulator.set_keys((rng.random(16) < 0.1).tolist())
+        frames.append(emulator.run_frame())
+    return np.stack(frames)
+
+def bench_encoding(args):
+    from serving.frame_codec import FrameEncoder, encode_png
+
+    frames = captured_frames(args, 600)
+    encoder = FrameEncoder()
+    sizes = []
+    position = [0]
+
+    def messages():
+        for _ in range(100):
+            i = position[0] % len(frames)
+            position[0] += 1
+            message = encoder.encode({0: frames[i], 1: frames[i - 1]})
+            if message is not None:
+                sizes.append(len(message))
+        return 100
+
+    results = {"encoding.frame_messages": result(rate(messages, args.seconds), "messages/s"),
+               "encoding.mean_message_bytes": result(np.mean(sizes), "bytes", False)}
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return results
+
+    def pngs():
+        for frame in frames[:50]:
+            encode_png(frame)
+        return 50
+
+    results["encoding.png_frames"] = result(rate(pngs, args.seconds), "frames/s")
+    return results
+
+def model_path(args, workdir):
+    """The model to benchmark, or a randomly initialised SimpleCNN saved to `workdir`."""
+    if args.model_path:
+        return args.model_path
+    import torch
+    from models.simple_models import SimpleCNN
+
+    torch.manual_seed(0)
+    path = os.path.join(workdir, "simple_cnn_random.pth")
+    torch.save(SimpleCNN(input_channels=1, output_channels=1).state_dict(), path)
+    return path
+
+def bench_simulator(args):
+    from emulators.simulate_emulator import EmulatorSimulator
+
+    with tempfile.TemporaryDirectory() as workdir:
+        simulator = EmulatorSimulator(model_path(args, workdir), args.config)
+    frames = captured_frames(args, max(args.batch_sizes))
+    results = {}
+    for batch_size in args.batch_sizes:
+        p50, p95 = latency(lambda: simulator.predict(frames[:batch_size]), args.seconds)
+        results[f"simulator.batch{batch_size}_p50"] = result(p50, "ms", False)
+        results[f"simulator.batch{batch_size}_p95"] = result(p95, "ms", False)
+        results[f"simulator.batch{batch_size}_frames"] = result(batch_size / p50 * 1e3, "frames/s")
+    return results
+
+def bench_trainer(args):
+    import torch
+    import torch.nn as nn
+    from models.simple_models import SimpleCNN
+    from training.trainer import Trainer
+
+    frames = torch.from_numpy(captured_frames(args, 33)).float().div_(255.0).unsqueeze(1)
+    batch = (frames[:-1], frames[1:])
+    model = SimpleCNN(input_channels=1, output_channels=1)
+    with tempfile.TemporaryDirectory() as log_dir:
+        trainer = Trainer(model, torch.optim.Adam(model.parameters(), lr=0.001), nn.MSELoss(), log_dir=log_dir)
+        trainer.model.to(trainer.device)
+        trainer._train_epoch([batch] * 2)
+        deadline = time.perf_counter() + args.seconds
+        summaries = []
+        while time.perf_counter() < deadline or not summaries:
+            trainer._train_epoch([batch] * 10)
+            summaries.append(trainer.timer.summary())
+        trainer.logger.close()
+    return {
+        "trainer.samples": result(np.mean([s["samples_per_sec"] for s in summaries]), "samples/s"),
+        "trainer.step_ms": result(np.mean([s["step_ms"] for s in summaries]), "ms", False),
+    }
+
+def run_suites(args):
+    benches = {"cpp": bench_cpp, "bindings": bench_bindings, "capture": bench_capture,
+               "encoding": bench_encoding, "simulator": bench_simulator, "trainer": bench_trainer}
+    runs = {suite: [] for suite in args.suites}
+    skipped = {}
+    # Repeats cycle through the suites rather than running each back to back, so a slow spell of
+    # the machine lands in one run of several suites instead of every run of one
+    for _ in range(args.repeats):
+        for suite in args.suites:
+            if suite in skipped:
+                continue
+            try:
+                runs[suite].append(benches[suite](args))
+            except (ImportError, FileNotFoundError) as e:
+                skipped[suite] = str(e)
+                print(f"Skipping {suite}: {e}", file=sys.stderr)
+    results = {}
+    for suite_runs in runs.values():
+        if not suite_runs:
+            continue
+        for name, entry in suite_runs[0].items():
+            results[name] = dict(entry, value=float(np.median([run[name]["value"] for run in suite_runs])))
+    return {
+        "meta": {
+            "rom": os.path.basename(args.rom),
+            "seconds": args.seconds,
+            "repeats": args.repeats,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+def compare(results, baseline, threshold):
+    """Print each benchmark against the baseline; return the names that regressed."""
+    regressions = []
+    print(f"{'benchmark':<36} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, entry in results.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            # Not guarded: the baseline skipped this suite or predates the benchmark
+            print(f"{name:<36} {'no baseline':>14} {entry['value']:>14.4g}")
+            continue
+        change = entry["value"] / base["value"] - 1.0
+        worse = -change if entry["higher_is_better"] else change
+        flag = ""
+        if worse > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<36} {base['value']:>14.4g} {entry['value']:>14.4g} {change:>+8.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the emulator/model benchmark suite")
+    parser.add_argument("--rom", type=str, default=os.path.join(ROOT, "Airplane.ch8"))
+    parser.add_argument("--config", type=str, default="config.json")
+    parser.add_argument("--suites", type=str, nargs="+", default=list(SUITES), choices=SUITES)
+    parser.add_argument("--seconds", type=float, default=0.5, help="Measuring time per benchmark")
+    parser.add_argument("--repeats", type=int, default=1,
+                        help="Runs of each suite; the median is reported (use several for baselines)")
+    parser.add_argument("--cpp_bench", type=str, default=os.path.join(ROOT, "build", "benchmarks", "bench_chip8"),
+                        help="Path to the bench_chip8 binary")
+    parser.add_argument("--model_path", type=str, default=None, help="Model for the simulator suite (random if omitted)")
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--output", type=str, default=None, help="Write the results JSON here")
+    parser.add_argument("--baseline", type=str, default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown that counts as a regression")
+    parser.add_argument("--save_baseline", type=str, default=None, help="Store these results as the baseline")
+    args = parser.parse_args()
+
+    report = run_suites(args)
+    for name, entry in report["results"].items():
+        print(f"{name:<36} {entry['value']:>14.4g} {entry['unit']}")
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        for suite, reason in baseline.get("skipped", {}).items():
+            print(f"Baseline has no {suite} results ({reason}); they are not checked for regressions")
+        regressions = compare(report["results"], baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: "
+                  + ", ".join(regressions))
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,195 @@
 #include <pybind11/stl.h>
 #include <pybind11/numpy.h>
 #include "chip8_emulator.hpp"
+#include "chip8_batch.hpp"
+#include <algorithm>
 
 namespace py = pybind11;
 
+// Contiguous view of a bytes-like object, taken without copying it. C-contiguous numpy
+// byte arrays, bytearrays and (read-only) bytes are read directly; anything else goes
+// through the buffer protocol into a bare Py_buffer. Both are cheaper than a
+// py::buffer_info, whose shape and stride vectors cost more than copying a whole state.
+class ByteBuffer {
+public:
+    ByteBuffer(const py::buffer& buffer, bool writable) {
+        view.obj = nullptr;
+        if (PyByteArray_CheckExact(buffer.ptr())) {
+            view.buf = PyByteArray_AS_STRING(buffer.ptr());
+            view.len = PyByteArray_GET_SIZE(buffer.ptr());
+            return;
+        }
+        if (!writable && PyBytes_CheckExact(buffer.ptr())) {
+            view.buf = PyBytes_AS_STRING(buffer.ptr());
+            view.len = PyBytes_GET_SIZE(buffer.ptr());
+            return;
+        }
+        if (py::array::check_(buffer)) {
+            auto array = py::reinterpret_borrow<py::array>(buffer);
+            if (array.itemsize() == 1 && (array.flags() & py::array::c_style) && (!writable || array.writeable())) {
+                view.buf = const_cast<void*>(array.data());
+                view.len = array.nbytes();
+                return;
+            }
+        }
+        if (PyObject_GetBuffer(buffer.ptr(), &view, PyBUF_STRIDES | (writable ? PyBUF_WRITABLE : 0)) != 0) {
+            throw py::error_already_set();
+        }
+        if (view.itemsize != 1) {
+            PyBuffer_Release(&view);
+            throw std::invalid_argument("Expected a buffer of bytes");
+        }
+        for (Py_ssize_t i = view.ndim - 1, expected = 1; i >= 0; --i) {
+            if (view.strides[i] != expected) {
+                PyBuffer_Release(&view);
+                throw std::invalid_argument("Expected a contiguous buffer of bytes");
+            }
+            expected *= view.shape[i];
+        }
+    }
+    // No-op after the direct paths, which leave view.obj null
+    ~ByteBuffer() { PyBuffer_Release(&view); }
+    ByteBuffer(const ByteBuffer&) = delete;
+    ByteBuffer& operator=(const ByteBuffer&) = delete;
+
+    uint8_t* data() const { return static_cast<uint8_t*>(view.buf); }
+    size_t size() const { return static_cast<size_t>(view.len); }
+
+private:
+    Py_buffer view;
+};
+
 PYBIND11_MODULE(emulator_module, m) {
-    py::class_<CHIP8Emulator>(m, "CHIP8Emulator")
+    py::enum_<ExecutionEngine>(m, "ExecutionEngine")
+        .value("INTERPRETER", ExecutionEngine::Interpreter)
+        .value("CACHED", ExecutionEngine::Cached);
+
+    py::class_<CHIP8Emulator> emulator(m, "CHIP8Emulator");
+    emulator
         .def(py::init<>())
         .def("load_rom", &CHIP8Emulator::load_rom)
-        .def("step", &CHIP8Emulator::step)
+        .def("step", &CHIP8Emulator::step, py::call_guard<py::gil_scoped_release>())
+        .def("seed", &CHIP8Emulator::seed, py::arg("seed"))
+        .def("run_cycles", &CHIP8Emulator::run_cycles,
+             py::arg("cycles"), py::call_guard<py::gil_scoped_release>())
+        .def("run_frames", &CHIP8Emulator::run_frames,
+             py::arg("frames"), py::arg("cycles_per_frame"), py::call_guard<py::gil_scoped_release>())
         .def("get_frame", [](const CHIP8Emulator& self) {
-            std::vector<uint8_t> frame(64 * 32);
-            self.get_frame(frame.data(), frame.size());
-            return py::array_t<uint8_t>({32, 64}, frame.data());
+            py::array_t<uint8_t> frame({32, 64});
+            self.get_frame(frame.mutable_data(), frame.size());
+            return frame;
+        })
+        .def("get_frame_into", [](const CHIP8Emulator& self, py::buffer out) {
+            ByteBuffer buffer(out, true);
+            self.get_frame(buffer.data(), buffer.size());
+        }, py::arg("out"))
+        .def("frame_view", [](py::object self) {
+            // Read-only view of the emulator-owned display; it refreshes in place as the emulator runs.
+            const CHIP8Emulator& emulator = self.cast<const CHIP8Emulator&>();
+            py::array_t<uint8_t> view({32, 64}, {64, 1}, emulator.frame_data(), self);
+            view.attr("setflags")(py::arg("write") = false);
+            return view;
         })
-        .def("set_input", &CHIP8Emulator::set_input)
-        .def("get_state", &CHIP8Emulator::get_state)
-        .def("set_state", &CHIP8Emulator::set_state);
+        .def("get_frame_packed", [](const CHIP8Emulator& self) {
+            py::array_t<uint8_t> packed(CHIP8Emulator::PACKED_FRAME_SIZE);
+            self.get_frame_packed(packed.mutable_data(), packed.size());
+            return packed;
+        })
+        .def("get_frame_packed_into", [](const CHIP8Emulator& self, py::buffer out) {
+            ByteBuffer buffer(out, true);
+            self.get_frame_packed(buffer.data(), buffer.size());
+        }, py::arg("out"))
+        .def("set_input", py::overload_cast<const std::vector<bool>&>(&CHIP8Emulator::set_input))
+        .def("get_state", [](const CHIP8Emulator& self) {
+            py::bytes state(nullptr, CHIP8Emulator::STATE_SIZE);
+            self.get_state(reinterpret_cast<uint8_t*>(PyBytes_AS_STRING(state.ptr())), CHIP8Emulator::STATE_SIZE);
+            return state;
+        })
+        .def("get_state_into", [](const CHIP8Emulator& self, py::buffer out) {
+            ByteBuffer buffer(out, true);
+            self.get_state(buffer.data(), buffer.size());
+        }, py::arg("out"))
+        .def("set_state", [](CHIP8Emulator& self, py::buffer state) {
+            ByteBuffer buffer(state, false);
+            self.set_state(buffer.data(), buffer.size());
+        }, py::arg("state"))
+        .def("set_state", py::overload_cast<const std::vector<uint8_t>&>(&CHIP8Emulator::set_state), py::arg("state"))
+        .def("enable_rewind", &CHIP8Emulator::enable_rewind, py::arg("depth"), py::arg("interval") = 1)
+        .def("disable_rewind", &CHIP8Emulator::disable_rewind)
+        .def("rewind", &CHIP8Emulator::rewind, py::arg("snapshots") = 1)
+        .def("rewind_available", &CHIP8Emulator::rewind_available)
+        .def_property("engine", &CHIP8Emulator::get_engine, &CHIP8Emulator::set_engine)
+        .def_property("timer_period", &CHIP8Emulator::get_timer_period, &CHIP8Emulator::set_timer_period)
+        .def_property("idle_skip", &CHIP8Emulator::get_idle_skip, &CHIP8Emulator::set_idle_skip)
+        .def_property_readonly("idle_cycles_skipped", &CHIP8Emulator::get_idle_cycles_skipped)
+        .def("get_idle_skipped", [](const CHIP8Emulator& self) {
+            const auto& skipped = self.get_idle_skipped();
+            py::dict counts;
+            counts["jump_self"] = skipped[static_cast<size_t>(IdleLoop::JumpSelf)];
+            counts["key_wait"] = skipped[static_cast<size_t>(IdleLoop::KeyWait)];
+            counts["timer_wait"] = skipped[static_cast<size_t>(IdleLoop::TimerWait)];
+            return counts;
+        })
+        .def("reset_idle_stats", &CHIP8Emulator::reset_idle_stats)
+        .def_property("profiling", &CHIP8Emulator::get_profiling, &CHIP8Emulator::set_profiling)
+        .def("get_profile", [](const CHIP8Emulator& self) {
+            // Copies, so a profile taken now is not changed by later execution
+            const ExecutionProfile& profile = self.get_profile();
+            py::array_t<uint64_t> opcode_classes(profile.opcode_classes.size());
+            std::copy(profile.opcode_classes.begin(), profile.opcode_classes.end(), opcode_classes.mutable_data());
+            py::array_t<uint64_t> pc_hits(CHIP8Emulator::MEMORY_SIZE);
+            if (profile.pc_hits.empty()) {
+                std::fill(pc_hits.mutable_data(), pc_hits.mutable_data() + pc_hits.size(), 0);
+            } else {
+                std::copy(profile.pc_hits.begin(), profile.pc_hits.end(), pc_hits.mutable_data());
+            }
+            py::dict counts;
+            counts["opcode_classes"] = opcode_classes;
+            counts["pc_hits"] = pc_hits;
+            counts["draws"] = profile.draws;
+            counts["clears"] = profile.clears;
+            counts["key_wait_cycles"] = profile.key_wait_cycles;
+            return counts;
+        })
+        .def("reset_profile", &CHIP8Emulator::reset_profile)
+        .def_property_readonly("display_generation", &CHIP8Emulator::get_display_generation)
+        .def_property_readonly("dirty_rows", &CHIP8Emulator::get_dirty_rows)
+        .def("take_dirty_rows", &CHIP8Emulator::take_dirty_rows);
+    emulator.attr("STATE_SIZE") = CHIP8Emulator::STATE_SIZE;
+    emulator.attr("PACKED_FRAME_SIZE") = CHIP8Emulator::PACKED_FRAME_SIZE;
+
+    py::class_<CHIP8Batch>(m, "CHIP8Batch")
+        .def(py::init<size_t, size_t>(), py::arg("size"), py::arg("num_threads") = 1)
+        .def("__len__", &CHIP8Batch::size)
+        .def_property("num_threads", &CHIP8Batch::get_num_threads, &CHIP8Batch::set_num_threads)
+        .def("machine", &CHIP8Batch::machine, py::arg("index"), py::return_value_policy::reference_internal)
+        .def("seed", &CHIP8Batch::seed, py::arg("seed"))
+        .def("set_engine", &CHIP8Batch::set_engine, py::arg("engine"))
+        .def("load_rom", py::overload_cast<const std::string&>(&CHIP8Batch::load_rom), py::arg("rom_path"))
+        .def("load_rom", py::overload_cast<size_t, const std::string&>(&CHIP8Batch::load_rom),
+             py::arg("index"), py::arg("rom_path"))
+        .def("set_inputs", [](CHIP8Batch& self, py::array_t<bool, py::array::c_style | py::array::forcecast> inputs) {
+            self.set_inputs(reinterpret_cast<const uint8_t*>(inputs.data()), inputs.size());
+        }, py::arg("inputs"))
+        .def("run_frames", &CHIP8Batch::run_frames,
+             py::arg("frames"), py::arg("cycles_per_frame"), py::call_guard<py::gil_scoped_release>())
+        .def("get_frames", [](const CHIP8Batch& self, py::array_t<uint8_t, py::array::c_style> out) {
+            self.get_frames(out.mutable_data(), out.size());
+        }, py::arg("out").noconvert())
+        .def("get_frames_packed", [](const CHIP8Batch& self, py::array_t<uint8_t, py::array::c_style> out) {
+            self.get_frames_packed(out.mutable_data(), out.size());
+        }, py::arg("out").noconvert())
+        .def("step", [](CHIP8Batch& self,
+                        py::array_t<bool, py::array::c_style | py::array::forcecast> inputs,
+                        py::array_t<uint8_t, py::array::c_style> out,
+                        size_t cycles_per_frame, size_t frames) {
+            const uint8_t* input_data = reinterpret_cast<const uint8_t*>(inputs.data());
+            uint8_t* out_data = out.mutable_data();
+            size_t input_size = inputs.size();
+            size_t out_size = out.size();
+            py::gil_scoped_release release;
+            self.set_inputs(input_data, input_size);
+            self.run_frames(frames, cycles_per_frame);
+            self.get_frames(out_data, out_size);
+        }, py::arg("inputs"), py::arg("out").noconvert(), py::arg("cycles_per_frame"), py::arg("frames") = 1);
 }
\ No newline at end of file
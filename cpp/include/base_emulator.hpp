@@ -11,8 +11,20 @@ public:
 
     virtual bool load_rom(const std::string& rom_path) = 0;
     virtual void step() = 0;
+    virtual void run_cycles(size_t cycles) {
+        for (size_t i = 0; i < cycles; ++i) {
+            step();
+        }
+    }
+    virtual void run_frames(size_t frames, size_t cycles_per_frame) {
+        for (size_t i = 0; i < frames; ++i) {
+            run_cycles(cycles_per_frame);
+        }
+    }
     virtual void get_frame(uint8_t* buffer, size_t buffer_size) const = 0;
     virtual void set_input(const std::vector<bool>& input_state) = 0;
     virtual std::vector<uint8_t> get_state() const = 0;
+    virtual void get_state(uint8_t* buffer, size_t buffer_size) const = 0;
     virtual void set_state(const std::vector<uint8_t>& state) = 0;
+    virtual void set_state(const uint8_t* state, size_t state_size) = 0;
 };
\ No newline at end of file
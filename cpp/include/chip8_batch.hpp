@@ -0,0 +1,41 @@
+// File: cpp/include/chip8_batch.hpp
+
+#pragma once
+#include "chip8_emulator.hpp"
+#include <string>
+#include <vector>
+
+// Steps N independent CHIP-8 machines together. Inputs and displays are
+// exchanged as flat (N, 16) and (N, 32, 64) buffers so a whole batch crosses
+// the language boundary in a single call.
+class CHIP8Batch {
+public:
+    explicit CHIP8Batch(size_t size, size_t num_threads = 1);
+
+    size_t size() const { return machines.size(); }
+    size_t get_num_threads() const { return num_threads; }
+    void set_num_threads(size_t threads);
+
+    CHIP8Emulator& machine(size_t index);
+
+    // Seeds machine i with seed + i so a batch is reproducible from one number.
+    void seed(uint32_t seed);
+    void set_engine(ExecutionEngine engine);
+    bool load_rom(const std::string& rom_path);
+    bool load_rom(size_t index, const std::string& rom_path);
+    void set_inputs(const uint8_t* inputs, size_t inputs_size);
+    void run_frames(size_t frames, size_t cycles_per_frame);
+    void get_frames(uint8_t* buffer, size_t buffer_size) const;
+    void get_frames_packed(uint8_t* buffer, size_t buffer_size) const;
+
+    static constexpr size_t KEY_COUNT = 16;
+    static constexpr size_t FRAME_SIZE = CHIP8Emulator::SCREEN_WIDTH * CHIP8Emulator::SCREEN_HEIGHT;
+    static constexpr size_t PACKED_FRAME_SIZE = CHIP8Emulator::PACKED_FRAME_SIZE;
+
+private:
+    std::vector<CHIP8Emulator> machines;
+    size_t num_threads;
+
+    template <typename Fn>
+    void parallel_for(Fn&& fn);
+};
@@ -2,7 +2,45 @@
 
 #pragma once
 #include "base_emulator.hpp"
+#include "snapshot_ring.hpp"
 #include <array>
+#include <vector>
+
+class CHIP8Emulator;
+
+enum class ExecutionEngine {
+    Interpreter,  // Fetch and decode every opcode through the switch in execute_instruction
+    Cached        // Run pre-decoded handler + operand records, invalidated on memory writes
+};
+
+// Idle patterns run_cycles fast-forwards instead of executing cycle by cycle.
+enum class IdleLoop {
+    JumpSelf,   // 1NNN jumping to itself
+    KeyWait,    // Fx0A with no key held
+    TimerWait,  // Fx07; [6yNN/ANNN/Fy18]; SE Vx, 0; JP back -- polling the delay timer
+    Count
+};
+
+// Execution counters gathered while profiling is enabled. Cycles fast-forwarded by
+// idle skipping are counted as the instructions they stand for, so a profile does
+// not depend on whether idle skipping is on.
+struct ExecutionProfile {
+    std::array<uint64_t, 16> opcode_classes{};  // Instructions executed, by opcode high nibble
+    std::vector<uint64_t> pc_hits;              // Instructions executed at each address; empty until enabled
+    uint64_t draws = 0;                         // DRW instructions
+    uint64_t clears = 0;                        // CLS instructions
+    uint64_t key_wait_cycles = 0;               // Cycles spent in Fx0A waiting for a key
+};
+
+struct DecodedInstruction {
+    using handler_type = void (*)(CHIP8Emulator&, const DecodedInstruction&);
+    handler_type handler;
+    uint16_t nnn;
+    uint8_t x;
+    uint8_t y;
+    uint8_t n;
+    uint8_t nn;
+};
 
 class CHIP8Emulator : public BaseEmulator {
 public:
@@ -11,10 +49,59 @@ public:
 
     bool load_rom(const std::string& rom_path) override;
     void step() override;
+    void run_cycles(size_t cycles) override;
+    void run_frames(size_t frames, size_t cycles_per_frame) override;
     void get_frame(uint8_t* buffer, size_t buffer_size) const override;
+    // Packs the display to 1 bit per pixel, row-major, most significant bit first.
+    void get_frame_packed(uint8_t* buffer, size_t buffer_size) const;
+    // Pixels are stored as 0/255 so the display can be exposed without conversion.
+    const uint8_t* frame_data() const { return display.data(); }
     void set_input(const std::vector<bool>& input_state) override;
+    void set_input(const uint8_t* input_state, size_t input_size);
     std::vector<uint8_t> get_state() const override;
+    void get_state(uint8_t* buffer, size_t buffer_size) const override;
     void set_state(const std::vector<uint8_t>& state) override;
+    void set_state(const uint8_t* state, size_t state_size) override;
+    // Incremented whenever CLS, DRW or set_state may have changed the display.
+    uint64_t get_display_generation() const { return display_generation; }
+    // Bit r is set when row r changed since the last take_dirty_rows().
+    uint32_t get_dirty_rows() const { return dirty_rows; }
+    uint32_t take_dirty_rows() {
+        uint32_t rows = dirty_rows;
+        dirty_rows = 0;
+        return rows;
+    }
+    // Seeds this instance's RND generator; the generator state is part of get_state/set_state.
+    void seed(uint32_t seed);
+
+    // Keeps the last `depth` snapshots, taken every `interval` frames by run_frames.
+    void enable_rewind(size_t depth, size_t interval);
+    void disable_rewind();
+    // Restores the snapshot `snapshots` entries back (1 = most recent) and drops newer ones.
+    bool rewind(size_t snapshots);
+    size_t rewind_available() const { return rewind_buffer.size(); }
+
+    void set_engine(ExecutionEngine engine);
+    ExecutionEngine get_engine() const { return engine; }
+
+    // Skipping idle loops never changes results; it only saves host time.
+    // Delay and sound timers count down at 60 Hz: one tick every `timer_period` cycles.
+    // run_frames treats each frame as one tick: cycles_per_frame is the period for that
+    // call only, and the period set here is left unchanged.
+    void set_timer_period(size_t cycles);
+    size_t get_timer_period() const { return timer_period; }
+
+    void set_idle_skip(bool enabled) { idle_skip = enabled; }
+    bool get_idle_skip() const { return idle_skip; }
+    const std::array<uint64_t, static_cast<size_t>(IdleLoop::Count)>& get_idle_skipped() const { return idle_skipped; }
+    uint64_t get_idle_cycles_skipped() const;
+    void reset_idle_stats();
+    // Counting costs nothing while disabled: run_cycles dispatches to a loop without it.
+    // Disabling keeps the counts readable; reset_profile clears them.
+    void set_profiling(bool enabled);
+    bool get_profiling() const { return profiling; }
+    const ExecutionProfile& get_profile() const { return profile; }
+    void reset_profile();
     static constexpr size_t getMemorySize() { return MEMORY_SIZE; }
     static constexpr size_t getRegisterCount() { return REGISTER_COUNT; }
     static constexpr size_t MEMORY_SIZE = 4096;
@@ -22,6 +109,9 @@ public:
     static constexpr size_t STACK_SIZE = 16;
     static constexpr size_t SCREEN_WIDTH = 64;
     static constexpr size_t SCREEN_HEIGHT = 32;   
+    static constexpr size_t PACKED_FRAME_SIZE = SCREEN_WIDTH * SCREEN_HEIGHT / 8;
+    static constexpr uint32_t ALL_ROWS = 0xFFFFFFFFu;
+    static constexpr size_t DEFAULT_TIMER_PERIOD = 10;  // 600 Hz CPU clock / 60 Hz timers
 private:
     std::array<uint8_t, MEMORY_SIZE> memory;
     std::array<uint8_t, REGISTER_COUNT> V;
@@ -31,12 +121,90 @@ private:
     uint8_t SP;
     uint8_t delay_timer;
     uint8_t sound_timer;
-    std::array<bool, SCREEN_WIDTH * SCREEN_HEIGHT> display;
+    size_t timer_period;
+    // Cycles run since the last timer tick; not part of snapshots, so set_state restarts it
+    size_t timer_phase;
+    std::array<uint8_t, SCREEN_WIDTH * SCREEN_HEIGHT> display;
+    uint64_t display_generation;
+    uint32_t dirty_rows;
     std::array<bool, 16> keypad;
+    uint32_t rng_state;
+
+    SnapshotRing rewind_buffer;
+    size_t rewind_interval;
+    size_t frames_since_snapshot;
+
+    ExecutionEngine engine;
+    // One record per memory address, decoded on first execution; empty unless the cached engine is active.
+    std::vector<DecodedInstruction> decoded;
+
+    bool idle_skip;
+    std::array<uint64_t, static_cast<size_t>(IdleLoop::Count)> idle_skipped;
+
+    bool profiling;
+    ExecutionProfile profile;
+
+    friend struct CHIP8Ops;
 
     void initialize();
     void execute_instruction();
+    void execute_decoded();
+    template <ExecutionEngine Engine, bool Profile>
+    void run_loop(size_t cycles);
+    void mark_dirty(uint32_t rows) {
+        dirty_rows |= rows;
+        ++display_generation;
+    }
+    void tick_timers(size_t ticks);
+    void advance_timer() {
+        if (++timer_phase >= timer_period) {
+            timer_phase = 0;
+            tick_timers(1);
+        }
+    }
+    void advance_timers(size_t cycles);
+    size_t skip_idle(size_t budget);
+    uint16_t fetch_opcode(uint16_t address) const {
+        return address < MEMORY_SIZE - 1 ? static_cast<uint16_t>((memory[address] << 8) | memory[address + 1]) : 0;
+    }
+    // `opcode` was fetched from `pc` before it executed; PC is where execution went next.
+    void profile_executed(uint16_t pc, uint16_t opcode) {
+        ++profile.opcode_classes[opcode >> 12];
+        ++profile.pc_hits[pc & (MEMORY_SIZE - 1)];
+        if ((opcode & 0xF000) == 0xD000) {
+            ++profile.draws;
+        } else if (opcode == 0x00E0) {
+            ++profile.clears;
+        } else if ((opcode & 0xF0FF) == 0xF00A && PC == pc) {
+            ++profile.key_wait_cycles;
+        }
+    }
+    void profile_skipped(uint16_t start, size_t length, uint64_t passes);
+    void decode(uint16_t address);
+    void invalidate_decoded(size_t address, size_t length);
+    void clear_decoded();
+    // Copies MEMORY_SIZE bytes into memory, dropping only the decoded entries they change.
+    void restore_memory(const uint8_t* source);
+    uint8_t next_random();
 
 public:
-    static constexpr size_t STATE_SIZE = MEMORY_SIZE + REGISTER_COUNT + 2 + 2 + STACK_SIZE * 2 + 1 + 1 + 1 + SCREEN_WIDTH * SCREEN_HEIGHT / 8 + 2;
-};
\ No newline at end of file
+    // Snapshots written before the RNG state was saved; still accepted by set_state.
+    static constexpr size_t LEGACY_STATE_SIZE = MEMORY_SIZE + REGISTER_COUNT + 2 + 2 + STACK_SIZE * 2 + 1 + 1 + 1 + SCREEN_WIDTH * SCREEN_HEIGHT / 8 + 2;
+    static constexpr size_t STATE_SIZE = LEGACY_STATE_SIZE + 4;
+};
+
+// Defined inline so the run loop in chip8_emulator.cpp can inline the cached dispatch.
+inline void CHIP8Emulator::execute_decoded() {
+    if (PC >= MEMORY_SIZE - 1) {
+        // Opcodes straddling the end of memory are left to the interpreter
+        execute_instruction();
+        return;
+    }
+    if (decoded[PC].handler == nullptr) {
+        decode(PC);
+    }
+    // Copy the record: a store can invalidate the entry while its handler runs
+    const DecodedInstruction op = decoded[PC];
+    PC += 2;
+    op.handler(*this, op);
+}
@@ -0,0 +1,49 @@
+// File: cpp/include/snapshot_ring.hpp
+
+#pragma once
+#include <cstdint>
+#include <vector>
+
+// Fixed-capacity ring of equally sized snapshots backed by one allocation.
+// Once full, pushing overwrites the oldest snapshot.
+class SnapshotRing {
+public:
+    void reset(size_t capacity, size_t snapshot_size) {
+        storage.assign(capacity * snapshot_size, 0);
+        this->capacity = capacity;
+        this->snapshot_size = snapshot_size;
+        head = 0;
+        count = 0;
+    }
+
+    size_t size() const { return count; }
+    size_t get_capacity() const { return capacity; }
+
+    // Returns the slot for the next snapshot; the caller fills snapshot_size bytes.
+    uint8_t* push() {
+        uint8_t* slot = storage.data() + head * snapshot_size;
+        head = (head + 1) % capacity;
+        if (count < capacity) {
+            ++count;
+        }
+        return slot;
+    }
+
+    // Returns the snapshot `steps` entries back (1 = newest) and discards the
+    // newer ones, or nullptr if that much history is not available.
+    const uint8_t* rewind(size_t steps) {
+        if (steps == 0 || steps > count) {
+            return nullptr;
+        }
+        head = (head + capacity - (steps - 1)) % capacity;
+        count -= steps - 1;
+        return storage.data() + ((head + capacity - 1) % capacity) * snapshot_size;
+    }
+
+private:
+    std::vector<uint8_t> storage;
+    size_t capacity = 0;
+    size_t snapshot_size = 0;
+    size_t head = 0;
+    size_t count = 0;
+};
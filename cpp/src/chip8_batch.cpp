@@ -0,0 +1,121 @@
+// File: cpp/src/chip8_batch.cpp
+
+#include "chip8_batch.hpp"
+#include <algorithm>
+#include <exception>
+#include <stdexcept>
+#include <thread>
+
+CHIP8Batch::CHIP8Batch(size_t size, size_t num_threads) : machines(size) {
+    if (size == 0) {
+        throw std::invalid_argument("Batch size must be positive");
+    }
+    set_num_threads(num_threads);
+}
+
+void CHIP8Batch::set_num_threads(size_t threads) {
+    num_threads = std::max<size_t>(1, std::min(threads, machines.size()));
+}
+
+template <typename Fn>
+void CHIP8Batch::parallel_for(Fn&& fn) {
+    if (num_threads <= 1) {
+        for (auto& emulator : machines) {
+            fn(emulator);
+        }
+        return;
+    }
+
+    // Contiguous slices keep each worker on its own run of machines.
+    std::vector<std::thread> workers;
+    std::vector<std::exception_ptr> errors(num_threads);
+    size_t chunk = (machines.size() + num_threads - 1) / num_threads;
+    for (size_t t = 0; t < num_threads; ++t) {
+        size_t begin = t * chunk;
+        size_t end = std::min(begin + chunk, machines.size());
+        if (begin >= end) {
+            break;
+        }
+        workers.emplace_back([&, t, begin, end]() {
+            try {
+                for (size_t i = begin; i < end; ++i) {
+                    fn(machines[i]);
+                }
+            } catch (...) {
+                errors[t] = std::current_exception();
+            }
+        });
+    }
+    for (auto& worker : workers) {
+        worker.join();
+    }
+    for (auto& error : errors) {
+        if (error) {
+            std::rethrow_exception(error);
+        }
+    }
+}
+
+CHIP8Emulator& CHIP8Batch::machine(size_t index) {
+    if (index >= machines.size()) {
+        throw std::out_of_range("Machine index out of range");
+    }
+    return machines[index];
+}
+
+void CHIP8Batch::seed(uint32_t seed) {
+    for (size_t i = 0; i < machines.size(); ++i) {
+        machines[i].seed(seed + static_cast<uint32_t>(i));
+    }
+}
+
+void CHIP8Batch::set_engine(ExecutionEngine engine) {
+    for (auto& emulator : machines) {
+        emulator.set_engine(engine);
+    }
+}
+
+bool CHIP8Batch::load_rom(const std::string& rom_path) {
+    bool loaded = true;
+    for (auto& emulator : machines) {
+        loaded = emulator.load_rom(rom_path) && loaded;
+    }
+    return loaded;
+}
+
+bool CHIP8Batch::load_rom(size_t index, const std::string& rom_path) {
+    return machine(index).load_rom(rom_path);
+}
+
+void CHIP8Batch::set_inputs(const uint8_t* inputs, size_t inputs_size) {
+    if (inputs_size != machines.size() * KEY_COUNT) {
+        throw std::invalid_argument("Invalid input buffer size");
+    }
+    for (size_t i = 0; i < machines.size(); ++i) {
+        machines[i].set_input(inputs + i * KEY_COUNT, KEY_COUNT);
+    }
+}
+
+void CHIP8Batch::run_frames(size_t frames, size_t cycles_per_frame) {
+    parallel_for([&](CHIP8Emulator& emulator) {
+        emulator.run_frames(frames, cycles_per_frame);
+    });
+}
+
+void CHIP8Batch::get_frames(uint8_t* buffer, size_t buffer_size) const {
+    if (buffer_size != machines.size() * FRAME_SIZE) {
+        throw std::invalid_argument("Invalid buffer size");
+    }
+    for (size_t i = 0; i < machines.size(); ++i) {
+        machines[i].get_frame(buffer + i * FRAME_SIZE, FRAME_SIZE);
+    }
+}
+
+void CHIP8Batch::get_frames_packed(uint8_t* buffer, size_t buffer_size) const {
+    if (buffer_size != machines.size() * PACKED_FRAME_SIZE) {
+        throw std::invalid_argument("Invalid buffer size");
+    }
+    for (size_t i = 0; i < machines.size(); ++i) {
+        machines[i].get_frame_packed(buffer + i * PACKED_FRAME_SIZE, PACKED_FRAME_SIZE);
+    }
+}
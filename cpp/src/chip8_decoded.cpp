@@ -0,0 +1,247 @@
+// File: cpp/src/chip8_decoded.cpp
+
+// Cached execution engine: opcodes are decoded once into handler + operand
+// records and re-used until the memory they were decoded from is written.
+// Every handler must behave exactly like its case in execute_instruction.
+
+#include "chip8_emulator.hpp"
+#include <algorithm>
+#include <cstring>
+
+using Op = DecodedInstruction;
+
+struct CHIP8Ops {
+    static void nop(CHIP8Emulator&, const Op&) {}
+
+    static void cls(CHIP8Emulator& c, const Op&) {
+        std::fill(c.display.begin(), c.display.end(), 0);
+        c.mark_dirty(CHIP8Emulator::ALL_ROWS);
+    }
+    static void ret(CHIP8Emulator& c, const Op&) { c.PC = c.stack[--c.SP]; }
+    static void jp(CHIP8Emulator& c, const Op& op) { c.PC = op.nnn; }
+    static void call(CHIP8Emulator& c, const Op& op) {
+        c.stack[c.SP++] = c.PC;
+        c.PC = op.nnn;
+    }
+    static void se_byte(CHIP8Emulator& c, const Op& op) {
+        if (c.V[op.x] == op.nn) c.PC += 2;
+    }
+    static void sne_byte(CHIP8Emulator& c, const Op& op) {
+        if (c.V[op.x] != op.nn) c.PC += 2;
+    }
+    static void se_reg(CHIP8Emulator& c, const Op& op) {
+        if (c.V[op.x] == c.V[op.y]) c.PC += 2;
+    }
+    static void ld_byte(CHIP8Emulator& c, const Op& op) { c.V[op.x] = op.nn; }
+    static void add_byte(CHIP8Emulator& c, const Op& op) { c.V[op.x] += op.nn; }
+
+    static void ld_reg(CHIP8Emulator& c, const Op& op) { c.V[op.x] = c.V[op.y]; }
+    static void or_reg(CHIP8Emulator& c, const Op& op) { c.V[op.x] |= c.V[op.y]; }
+    static void and_reg(CHIP8Emulator& c, const Op& op) { c.V[op.x] &= c.V[op.y]; }
+    static void xor_reg(CHIP8Emulator& c, const Op& op) { c.V[op.x] ^= c.V[op.y]; }
+    static void add_reg(CHIP8Emulator& c, const Op& op) {
+        uint16_t sum = c.V[op.x] + c.V[op.y];
+        c.V[0xF] = (sum > 255) ? 1 : 0;
+        c.V[op.x] = sum & 0xFF;
+    }
+    static void sub_reg(CHIP8Emulator& c, const Op& op) {
+        c.V[0xF] = (c.V[op.x] > c.V[op.y]) ? 1 : 0;
+        c.V[op.x] -= c.V[op.y];
+    }
+    static void shr(CHIP8Emulator& c, const Op& op) {
+        c.V[0xF] = c.V[op.x] & 0x1;
+        c.V[op.x] >>= 1;
+    }
+    static void subn(CHIP8Emulator& c, const Op& op) {
+        c.V[0xF] = (c.V[op.y] > c.V[op.x]) ? 1 : 0;
+        c.V[op.x] = c.V[op.y] - c.V[op.x];
+    }
+    static void shl(CHIP8Emulator& c, const Op& op) {
+        c.V[0xF] = (c.V[op.x] & 0x80) >> 7;
+        c.V[op.x] <<= 1;
+    }
+
+    static void sne_reg(CHIP8Emulator& c, const Op& op) {
+        if (c.V[op.x] != c.V[op.y]) c.PC += 2;
+    }
+    static void ld_i(CHIP8Emulator& c, const Op& op) { c.I = op.nnn; }
+    static void jp_v0(CHIP8Emulator& c, const Op& op) { c.PC = op.nnn + c.V[0]; }
+    static void rnd(CHIP8Emulator& c, const Op& op) { c.V[op.x] = c.next_random() & op.nn; }
+
+    static void drw(CHIP8Emulator& c, const Op& op) {
+        uint8_t x = c.V[op.x];
+        uint8_t y = c.V[op.y];
+        c.V[0xF] = 0;
+        uint32_t rows = 0;
+        for (int row = 0; row < op.n; row++) {
+            uint8_t sprite_byte = c.memory[c.I + row];
+            for (int col = 0; col < 8; col++) {
+                if ((sprite_byte & (0x80 >> col)) != 0) {
+                    int index = (y + row) * CHIP8Emulator::SCREEN_WIDTH + (x + col);
+                    if (index < CHIP8Emulator::SCREEN_WIDTH * CHIP8Emulator::SCREEN_HEIGHT) {
+                        if (c.display[index]) {
+                            c.V[0xF] = 1;
+                        }
+                        c.display[index] ^= 0xFF;
+                        rows |= 1u << (index / CHIP8Emulator::SCREEN_WIDTH);
+                    }
+                }
+            }
+        }
+        if (rows) {
+            c.mark_dirty(rows);
+        }
+    }
+
+    static void skp(CHIP8Emulator& c, const Op& op) {
+        if (c.keypad[c.V[op.x]]) c.PC += 2;
+    }
+    static void sknp(CHIP8Emulator& c, const Op& op) {
+        if (!c.keypad[c.V[op.x]]) c.PC += 2;
+    }
+
+    static void ld_vx_dt(CHIP8Emulator& c, const Op& op) { c.V[op.x] = c.delay_timer; }
+    static void ld_key(CHIP8Emulator& c, const Op& op) {
+        for (int i = 0; i < 16; i++) {
+            if (c.keypad[i]) {
+                c.V[op.x] = i;
+                return;
+            }
+        }
+        c.PC -= 2; // Repeat this instruction
+    }
+    static void ld_dt(CHIP8Emulator& c, const Op& op) { c.delay_timer = c.V[op.x]; }
+    static void ld_st(CHIP8Emulator& c, const Op& op) { c.sound_timer = c.V[op.x]; }
+    static void add_i(CHIP8Emulator& c, const Op& op) { c.I += c.V[op.x]; }
+    static void ld_font(CHIP8Emulator& c, const Op& op) { c.I = c.V[op.x] * 5; }
+    static void ld_bcd(CHIP8Emulator& c, const Op& op) {
+        c.memory[c.I] = c.V[op.x] / 100;
+        c.memory[c.I + 1] = (c.V[op.x] / 10) % 10;
+        c.memory[c.I + 2] = c.V[op.x] % 10;
+        c.invalidate_decoded(c.I, 3);
+    }
+    static void ld_store(CHIP8Emulator& c, const Op& op) {
+        for (int i = 0; i <= op.x; i++)
+            c.memory[c.I + i] = c.V[i];
+        c.invalidate_decoded(c.I, op.x + 1);
+    }
+    static void ld_load(CHIP8Emulator& c, const Op& op) {
+        for (int i = 0; i <= op.x; i++)
+            c.V[i] = c.memory[c.I + i];
+    }
+
+    static Op::handler_type select(uint16_t opcode) {
+        switch (opcode & 0xF000) {
+            case 0x0000:
+                switch (opcode & 0x00FF) {
+                    case 0x00E0: return cls;
+                    case 0x00EE: return ret;
+                }
+                return nop;
+            case 0x1000: return jp;
+            case 0x2000: return call;
+            case 0x3000: return se_byte;
+            case 0x4000: return sne_byte;
+            case 0x5000: return se_reg;
+            case 0x6000: return ld_byte;
+            case 0x7000: return add_byte;
+            case 0x8000:
+                switch (opcode & 0x000F) {
+                    case 0x0000: return ld_reg;
+                    case 0x0001: return or_reg;
+                    case 0x0002: return and_reg;
+                    case 0x0003: return xor_reg;
+                    case 0x0004: return add_reg;
+                    case 0x0005: return sub_reg;
+                    case 0x0006: return shr;
+                    case 0x0007: return subn;
+                    case 0x000E: return shl;
+                }
+                return nop;
+            case 0x9000: return sne_reg;
+            case 0xA000: return ld_i;
+            case 0xB000: return jp_v0;
+            case 0xC000: return rnd;
+            case 0xD000: return drw;
+            case 0xE000:
+                switch (opcode & 0x00FF) {
+                    case 0x009E: return skp;
+                    case 0x00A1: return sknp;
+                }
+                return nop;
+            default: // 0xF000
+                switch (opcode & 0x00FF) {
+                    case 0x0007: return ld_vx_dt;
+                    case 0x000A: return ld_key;
+                    case 0x0015: return ld_dt;
+                    case 0x0018: return ld_st;
+                    case 0x001E: return add_i;
+                    case 0x0029: return ld_font;
+                    case 0x0033: return ld_bcd;
+                    case 0x0055: return ld_store;
+                    case 0x0065: return ld_load;
+                }
+                return nop;
+        }
+    }
+};
+
+void CHIP8Emulator::set_engine(ExecutionEngine new_engine) {
+    engine = new_engine;
+    if (engine == ExecutionEngine::Cached) {
+        decoded.assign(MEMORY_SIZE, DecodedInstruction{});
+    } else {
+        decoded.clear();
+        decoded.shrink_to_fit();
+    }
+}
+
+void CHIP8Emulator::decode(uint16_t address) {
+    uint16_t opcode = (memory[address] << 8) | memory[address + 1];
+    DecodedInstruction& op = decoded[address];
+    op.handler = CHIP8Ops::select(opcode);
+    op.nnn = opcode & 0x0FFF;
+    op.x = (opcode & 0x0F00) >> 8;
+    op.y = (opcode & 0x00F0) >> 4;
+    op.n = opcode & 0x000F;
+    op.nn = opcode & 0x00FF;
+}
+
+void CHIP8Emulator::invalidate_decoded(size_t address, size_t length) {
+    if (decoded.empty()) {
+        return;
+    }
+    // An opcode decoded at address - 1 also covers the first written byte
+    size_t begin = address > 0 ? address - 1 : 0;
+    size_t end = std::min(address + length, MEMORY_SIZE);
+    for (size_t i = begin; i < end; ++i) {
+        decoded[i].handler = nullptr;
+    }
+}
+
+void CHIP8Emulator::restore_memory(const uint8_t* source) {
+    if (decoded.empty()) {
+        std::copy(source, source + MEMORY_SIZE, memory.begin());
+        return;
+    }
+    // Snapshots of the same program mostly differ in a few variables, so rewinds and
+    // resets keep nearly all of the table instead of decoding everything again
+    constexpr size_t block = 64;
+    for (size_t start = 0; start < MEMORY_SIZE; start += block) {
+        if (std::memcmp(memory.data() + start, source + start, block) == 0) {
+            continue;
+        }
+        for (size_t i = start; i < start + block; ++i) {
+            if (memory[i] != source[i]) {
+                memory[i] = source[i];
+                invalidate_decoded(i, 1);
+            }
+        }
+    }
+}
+
+void CHIP8Emulator::clear_decoded() {
+    if (!decoded.empty()) {
+        decoded.assign(MEMORY_SIZE, DecodedInstruction{});
+    }
+}
@@ -5,11 +5,30 @@
 #include <stdexcept>
 #include <cstring>
 #include <random>
-#include <chrono>
+#include <algorithm>
 
 
-CHIP8Emulator::CHIP8Emulator() {
+CHIP8Emulator::CHIP8Emulator()
+    : timer_period(DEFAULT_TIMER_PERIOD), timer_phase(0), display_generation(0), dirty_rows(0), rewind_interval(0), frames_since_snapshot(0), engine(ExecutionEngine::Interpreter),
+      idle_skip(true), idle_skipped{}, profiling(false) {
     initialize();
+    seed(std::random_device{}());
+}
+
+void CHIP8Emulator::seed(uint32_t seed) {
+    // Scramble the seed so nearby seeds give unrelated sequences; xorshift needs a non-zero state.
+    rng_state = seed * 0x9E3779B9u + 0x7F4A7C15u;
+    if (rng_state == 0) {
+        rng_state = 1;
+    }
+}
+
+uint8_t CHIP8Emulator::next_random() {
+    // xorshift32: small enough to snapshot with the rest of the machine state.
+    rng_state ^= rng_state << 13;
+    rng_state ^= rng_state >> 17;
+    rng_state ^= rng_state << 5;
+    return static_cast<uint8_t>(rng_state >> 24);
 }
 
 void CHIP8Emulator::initialize() {
@@ -21,7 +40,9 @@ void CHIP8Emulator::initialize() {
     SP = 0;
     delay_timer = 0;
     sound_timer = 0;
-    std::fill(display.begin(), display.end(), false);
+    timer_phase = 0;
+    std::fill(display.begin(), display.end(), 0);
+    mark_dirty(ALL_ROWS);
     std::fill(keypad.begin(), keypad.end(), false);
 
     // Load fontset
@@ -60,25 +81,238 @@ bool CHIP8Emulator::load_rom(const std::string& rom_path) {
     }
 
     file.read(reinterpret_cast<char*>(memory.data() + 0x200), size);
+    clear_decoded();
     return true;
 }
 
 void CHIP8Emulator::step() {
-    execute_instruction();
-    if (delay_timer > 0) {
-        --delay_timer;
+    uint16_t pc = PC;
+    uint16_t opcode = profiling ? fetch_opcode(pc) : 0;
+    if (engine == ExecutionEngine::Cached) {
+        execute_decoded();
+    } else {
+        execute_instruction();
+    }
+    if (profiling) {
+        profile_executed(pc, opcode);
+    }
+    advance_timer();
+}
+
+void CHIP8Emulator::set_timer_period(size_t cycles) {
+    if (cycles == 0) {
+        throw std::invalid_argument("Timer period must be at least one cycle");
+    }
+    if (cycles != timer_period) {
+        timer_period = cycles;
+        timer_phase = 0;
+    }
+}
+
+void CHIP8Emulator::tick_timers(size_t ticks) {
+    delay_timer = ticks < delay_timer ? delay_timer - ticks : 0;
+    sound_timer = ticks < sound_timer ? sound_timer - ticks : 0;
+}
+
+void CHIP8Emulator::advance_timers(size_t cycles) {
+    timer_phase += cycles;
+    tick_timers(timer_phase / timer_period);
+    timer_phase %= timer_period;
+}
+
+template <ExecutionEngine Engine, bool Profile>
+void CHIP8Emulator::run_loop(size_t cycles) {
+    while (cycles > 0) {
+        uint16_t pc = PC;
+        // Fetched before executing: the instruction may overwrite itself
+        uint16_t opcode = Profile ? fetch_opcode(pc) : 0;
+        if (Engine == ExecutionEngine::Cached) {
+            execute_decoded();
+        } else {
+            execute_instruction();
+        }
+        if (Profile) {
+            profile_executed(pc, opcode);
+        }
+        advance_timer();
+        --cycles;
+        // Idle loops always end in a jump to themselves or backwards
+        if (idle_skip && PC <= pc && cycles > 0) {
+            cycles -= skip_idle(cycles);
+        }
+    }
+}
+
+void CHIP8Emulator::run_cycles(size_t cycles) {
+    if (profiling) {
+        if (engine == ExecutionEngine::Cached) {
+            run_loop<ExecutionEngine::Cached, true>(cycles);
+        } else {
+            run_loop<ExecutionEngine::Interpreter, true>(cycles);
+        }
+    } else if (engine == ExecutionEngine::Cached) {
+        run_loop<ExecutionEngine::Cached, false>(cycles);
+    } else {
+        run_loop<ExecutionEngine::Interpreter, false>(cycles);
+    }
+}
+
+size_t CHIP8Emulator::skip_idle(size_t budget) {
+    if (PC >= MEMORY_SIZE - 5) {
+        return 0;
+    }
+    uint16_t opcode = (memory[PC] << 8) | memory[PC + 1];
+
+    // JP to itself: only the timers change until the budget runs out.
+    // Fx0A with no key down: the keypad cannot change before the budget runs out either.
+    bool jump_self = opcode == (0x1000 | PC);
+    bool key_wait = (opcode & 0xF0FF) == 0xF00A &&
+                    std::none_of(keypad.begin(), keypad.end(), [](bool key) { return key; });
+    if (jump_self || key_wait) {
+        advance_timers(budget);
+        if (profiling) {
+            profile_skipped(PC, 1, budget);
+        }
+        idle_skipped[static_cast<size_t>(jump_self ? IdleLoop::JumpSelf : IdleLoop::KeyWait)] += budget;
+        return budget;
+    }
+
+    // Delay-timer poll: Fx07; a few idempotent instructions; SE Vx, 0; JP back.
+    // Each pass of `length` cycles reads DT and loops again iff it was non-zero.
+    if ((opcode & 0xF0FF) != 0xF007) {
+        return 0;
+    }
+    uint8_t x = (opcode & 0x0F00) >> 8;
+    auto fetch = [this](size_t address) { return static_cast<uint16_t>((memory[address] << 8) | memory[address + 1]); };
+    size_t length = 1;
+    int sound_position = -1;
+    uint8_t sound_register = 0;
+    for (size_t address = PC + 2;; address += 2, ++length) {
+        if (address + 3 >= MEMORY_SIZE || length > 5) {
+            return 0;
+        }
+        uint16_t op = fetch(address);
+        if (op == (0x3000 | (x << 8)) && fetch(address + 2) == (0x1000 | PC)) {
+            length += 2;
+            break;
+        }
+        // Loads that don't involve Vx repeat the same effect on every pass. Only skip once
+        // they already hold (one pass has run), so skipping leaves nothing else to apply.
+        uint8_t y = (op & 0x0F00) >> 8;
+        if ((op & 0xF0FF) == 0xF018 && y != x) {
+            sound_position = static_cast<int>(length);
+            sound_register = y;
+        } else if ((op & 0xF000) == 0x6000 && y != x) {
+            if (V[y] != (op & 0x00FF)) return 0;
+        } else if ((op & 0xF000) == 0xA000) {
+            if (I != (op & 0x0FFF)) return 0;
+        } else {
+            return 0;
+        }
+    }
+
+    // Timer ticks that land within the next n cycles. Pass k reads DT after k * length
+    // cycles, so the passes that still loop are those before DT * period - phase cycles.
+    auto ticks_within = [this](size_t n) { return (timer_phase + n) / timer_period; };
+    size_t looping = delay_timer == 0
+        ? 0 : (delay_timer * timer_period - timer_phase + length - 1) / length;
+    size_t passes = std::min<size_t>(looping, budget / length);
+    if (passes == 0) {
+        return 0;
+    }
+    // One pass has already run, so the loads are in their steady state; only Vx and the timers move.
+    size_t last = (passes - 1) * length;
+    V[x] = delay_timer - ticks_within(last);
+    uint8_t sound = 0;
+    if (sound_position >= 0) {
+        // The last pass set ST = Vy, which then ticks down for the rest of the pass
+        size_t remaining = ticks_within(passes * length) - ticks_within(last + sound_position);
+        sound = V[sound_register] > remaining ? V[sound_register] - remaining : 0;
+    }
+    advance_timers(length * passes);
+    if (sound_position >= 0) {
+        sound_timer = sound;
+    }
+    if (profiling) {
+        profile_skipped(PC, length, passes);
+    }
+    idle_skipped[static_cast<size_t>(IdleLoop::TimerWait)] += length * passes;
+    return length * passes;
+}
+
+uint64_t CHIP8Emulator::get_idle_cycles_skipped() const {
+    uint64_t total = 0;
+    for (auto count : idle_skipped) {
+        total += count;
+    }
+    return total;
+}
+
+void CHIP8Emulator::reset_idle_stats() {
+    std::fill(idle_skipped.begin(), idle_skipped.end(), 0);
+}
+
+void CHIP8Emulator::set_profiling(bool enabled) {
+    profiling = enabled;
+    if (enabled && profile.pc_hits.empty()) {
+        profile.pc_hits.assign(MEMORY_SIZE, 0);
     }
-    if (sound_timer > 0) {
-        --sound_timer;
+}
+
+void CHIP8Emulator::reset_profile() {
+    profile.opcode_classes.fill(0);
+    std::fill(profile.pc_hits.begin(), profile.pc_hits.end(), 0);
+    profile.draws = 0;
+    profile.clears = 0;
+    profile.key_wait_cycles = 0;
+}
+
+void CHIP8Emulator::profile_skipped(uint16_t start, size_t length, uint64_t passes) {
+    // Each of the `length` instructions from `start` on would have run `passes` times
+    for (size_t i = 0; i < length; ++i) {
+        uint16_t address = static_cast<uint16_t>(start + 2 * i);
+        uint16_t opcode = fetch_opcode(address);
+        profile.opcode_classes[opcode >> 12] += passes;
+        profile.pc_hits[address & (MEMORY_SIZE - 1)] += passes;
+        if ((opcode & 0xF0FF) == 0xF00A) {
+            profile.key_wait_cycles += passes;
+        }
     }
 }
 
+void CHIP8Emulator::run_frames(size_t frames, size_t cycles_per_frame) {
+    // A frame is one 60 Hz timer tick, however many cycles the clock speed gives it. The
+    // period only applies to this call, so run_cycles and step keep the caller's period.
+    const size_t period = timer_period;
+    if (cycles_per_frame != 0) {
+        timer_period = cycles_per_frame;
+    }
+    for (size_t i = 0; i < frames; ++i) {
+        run_cycles(cycles_per_frame);
+        if (rewind_interval != 0 && ++frames_since_snapshot >= rewind_interval) {
+            get_state(rewind_buffer.push(), STATE_SIZE);
+            frames_since_snapshot = 0;
+        }
+    }
+    timer_period = period;
+}
+
 void CHIP8Emulator::get_frame(uint8_t* buffer, size_t buffer_size) const {
     if (buffer_size != SCREEN_WIDTH * SCREEN_HEIGHT) {
         throw std::invalid_argument("Invalid buffer size");
     }
-    for (size_t i = 0; i < buffer_size; ++i) {
-        buffer[i] = display[i] ? 255 : 0;
+    std::memcpy(buffer, display.data(), buffer_size);
+}
+
+void CHIP8Emulator::get_frame_packed(uint8_t* buffer, size_t buffer_size) const {
+    if (buffer_size != PACKED_FRAME_SIZE) {
+        throw std::invalid_argument("Invalid buffer size");
+    }
+    for (size_t i = 0; i < PACKED_FRAME_SIZE; ++i) {
+        const uint8_t* pixels = display.data() + i * 8;
+        buffer[i] = static_cast<uint8_t>(
+            (pixels[0] & 0x80) | (pixels[1] & 0x40) | (pixels[2] & 0x20) | (pixels[3] & 0x10) |
+            (pixels[4] & 0x08) | (pixels[5] & 0x04) | (pixels[6] & 0x02) | (pixels[7] & 0x01));
     }
 }
 
@@ -89,56 +323,79 @@ void CHIP8Emulator::set_input(const std::vector<bool>& input_state) {
     std::copy(input_state.begin(), input_state.end(), keypad.begin());
 }
 
+void CHIP8Emulator::set_input(const uint8_t* input_state, size_t input_size) {
+    if (input_size != 16) {
+        throw std::invalid_argument("Invalid input state size");
+    }
+    for (size_t i = 0; i < 16; ++i) {
+        keypad[i] = input_state[i] != 0;
+    }
+}
+
 std::vector<uint8_t> CHIP8Emulator::get_state() const {
-    std::vector<uint8_t> state;
-    state.reserve(STATE_SIZE);
-    
-    state.insert(state.end(), memory.begin(), memory.end());
-    state.insert(state.end(), V.begin(), V.end());
-    state.push_back(I >> 8);
-    state.push_back(I & 0xFF);
-    state.push_back(PC >> 8);
-    state.push_back(PC & 0xFF);
+    std::vector<uint8_t> state(STATE_SIZE);
+    get_state(state.data(), state.size());
+    return state;
+}
+
+void CHIP8Emulator::get_state(uint8_t* buffer, size_t buffer_size) const {
+    if (buffer_size != STATE_SIZE) {
+        throw std::invalid_argument("Invalid buffer size");
+    }
+
+    uint8_t* out = buffer;
+    out = std::copy(memory.begin(), memory.end(), out);
+    out = std::copy(V.begin(), V.end(), out);
+    *out++ = I >> 8;
+    *out++ = I & 0xFF;
+    *out++ = PC >> 8;
+    *out++ = PC & 0xFF;
     for (auto s : stack) {
-        state.push_back(s >> 8);
-        state.push_back(s & 0xFF);
+        *out++ = s >> 8;
+        *out++ = s & 0xFF;
     }
-    state.push_back(SP);
-    state.push_back(delay_timer);
-    state.push_back(sound_timer);
-    
+    *out++ = SP;
+    *out++ = delay_timer;
+    *out++ = sound_timer;
+
     for (size_t i = 0; i < display.size(); i += 8) {
         uint8_t byte = 0;
         for (size_t j = 0; j < 8 && i + j < display.size(); ++j) {
             byte |= (display[i + j] ? 1 : 0) << j;
         }
-        state.push_back(byte);
+        *out++ = byte;
     }
-    
+
     uint16_t keypad_state = 0;
     for (size_t i = 0; i < 16; ++i) {
         keypad_state |= (keypad[i] ? 1 : 0) << i;
     }
-    state.push_back(keypad_state >> 8);
-    state.push_back(keypad_state & 0xFF);
-    
-    return state;
+    *out++ = keypad_state >> 8;
+    *out++ = keypad_state & 0xFF;
+
+    *out++ = rng_state >> 24;
+    *out++ = (rng_state >> 16) & 0xFF;
+    *out++ = (rng_state >> 8) & 0xFF;
+    *out++ = rng_state & 0xFF;
 }
 
 void CHIP8Emulator::set_state(const std::vector<uint8_t>& state) {
-size_t expected_size = MEMORY_SIZE + REGISTER_COUNT + 2 + 2 + STACK_SIZE * 2 + 1 + 1 + 1 + SCREEN_WIDTH * SCREEN_HEIGHT / 8 + 2;
-    if (state.size() != expected_size) {
+    set_state(state.data(), state.size());
+}
+
+void CHIP8Emulator::set_state(const uint8_t* state, size_t state_size) {
+    if (state_size != STATE_SIZE && state_size != LEGACY_STATE_SIZE) {
         throw std::invalid_argument("Invalid state size");
     }
 
     size_t offset = 0;
 
     // Restore memory
-    std::copy(state.begin() + offset, state.begin() + offset + MEMORY_SIZE, memory.begin());
+    restore_memory(state + offset);
     offset += MEMORY_SIZE;
 
     // Restore registers
-    std::copy(state.begin() + offset, state.begin() + offset + REGISTER_COUNT, V.begin());
+    std::copy(state + offset, state + offset + REGISTER_COUNT, V.begin());
     offset += REGISTER_COUNT;
 
     // Restore I
@@ -161,22 +418,58 @@ size_t expected_size = MEMORY_SIZE + REGISTER_COUNT + 2 + 2 + STACK_SIZE * 2 + 1
     // Restore timers
     delay_timer = state[offset++];
     sound_timer = state[offset++];
+    timer_phase = 0;
 
     // Restore display
     for (size_t i = 0; i < SCREEN_WIDTH * SCREEN_HEIGHT; i += 8) {
         uint8_t byte = state[offset++];
         for (size_t j = 0; j < 8 && i + j < display.size(); ++j) {
-            display[i + j] = (byte & (1 << j)) != 0;
+            display[i + j] = (byte & (1 << j)) ? 255 : 0;
         }
     }
+    mark_dirty(ALL_ROWS);
 
     // Restore keypad
     uint16_t keypad_state = (state[offset] << 8) | state[offset + 1];
     for (size_t i = 0; i < 16; ++i) {
         keypad[i] = (keypad_state & (1 << i)) != 0;
     }
+    offset += 2;
+
+    // Restore RNG (legacy snapshots keep the current generator)
+    if (state_size == STATE_SIZE) {
+        rng_state = (uint32_t(state[offset]) << 24) | (uint32_t(state[offset + 1]) << 16) |
+                    (uint32_t(state[offset + 2]) << 8) | uint32_t(state[offset + 3]);
+        if (rng_state == 0) {
+            rng_state = 1;
+        }
+    }
+}
+
+void CHIP8Emulator::enable_rewind(size_t depth, size_t interval) {
+    if (depth == 0 || interval == 0) {
+        throw std::invalid_argument("Rewind depth and interval must be positive");
+    }
+    rewind_buffer.reset(depth, STATE_SIZE);
+    rewind_interval = interval;
+    frames_since_snapshot = 0;
+}
+
+void CHIP8Emulator::disable_rewind() {
+    rewind_buffer.reset(0, STATE_SIZE);
+    rewind_interval = 0;
+    frames_since_snapshot = 0;
+}
+
+bool CHIP8Emulator::rewind(size_t snapshots) {
+    const uint8_t* snapshot = rewind_buffer.rewind(snapshots);
+    if (snapshot == nullptr) {
+        return false;
+    }
+    set_state(snapshot, STATE_SIZE);
+    frames_since_snapshot = 0;
+    return true;
 }
-   
 
 void CHIP8Emulator::execute_instruction() {
     // Fetch
@@ -188,7 +481,8 @@ void CHIP8Emulator::execute_instruction() {
         case 0x0000:
             switch (opcode & 0x00FF) {
                 case 0x00E0: // CLS
-                    std::fill(display.begin(), display.end(), false);
+                    std::fill(display.begin(), display.end(), 0);
+                    mark_dirty(ALL_ROWS);
                     break;
                 case 0x00EE: // RET
                     PC = stack[--SP];
@@ -282,11 +576,7 @@ void CHIP8Emulator::execute_instruction() {
             break;
 
         case 0xC000: // RND Vx, byte
-            {
-                static std::mt19937 rng(std::chrono::steady_clock::now().time_since_epoch().count());
-                static std::uniform_int_distribution<uint8_t> dist(0, 255);
-                V[(opcode & 0x0F00) >> 8] = dist(rng) & (opcode & 0x00FF);
-            }
+            V[(opcode & 0x0F00) >> 8] = next_random() & (opcode & 0x00FF);
             break;
 
         case 0xD000: // DRW Vx, Vy, nibble
@@ -295,6 +585,7 @@ void CHIP8Emulator::execute_instruction() {
                 uint8_t y = V[(opcode & 0x00F0) >> 4];
                 uint8_t height = opcode & 0x000F;
                 V[0xF] = 0;
+                uint32_t rows = 0;
 
                 for (int row = 0; row < height; row++) {
                     uint8_t sprite_byte = memory[I + row];
@@ -305,11 +596,15 @@ void CHIP8Emulator::execute_instruction() {
                                 if (display[index]) {
                                     V[0xF] = 1;
                                 }
-                                display[index] ^= true;
+                                display[index] ^= 0xFF;
+                                rows |= 1u << (index / SCREEN_WIDTH);
                             }
                         }
                     }
                 }
+                if (rows) {
+                    mark_dirty(rows);
+                }
             }
             break;
 
@@ -361,10 +656,12 @@ void CHIP8Emulator::execute_instruction() {
                     memory[I] = V[(opcode & 0x0F00) >> 8] / 100;
                     memory[I + 1] = (V[(opcode & 0x0F00) >> 8] / 10) % 10;
                     memory[I + 2] = V[(opcode & 0x0F00) >> 8] % 10;
+                    invalidate_decoded(I, 3);
                     break;
                 case 0x0055: // LD [I], Vx
                     for (int i = 0; i <= ((opcode & 0x0F00) >> 8); i++)
                         memory[I + i] = V[i];
+                    invalidate_decoded(I, ((opcode & 0x0F00) >> 8) + 1);
                     break;
                 case 0x0065: // LD Vx, [I]
                     for (int i = 0; i <= ((opcode & 0x0F00) >> 8); i++)
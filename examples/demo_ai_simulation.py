@@ -5,7 +5,7 @@ sys.path.append('src')
 import argparse
 from emulators.display_utils import PygameDisplay
 from emulators.simulate_emulator import EmulatorSimulator
-import time
+from emulators.frame_scheduler import FrameScheduler
 
 def run_ai_simulation(model_path, config_path="config.json"):
     simulator = EmulatorSimulator(model_path)
@@ -14,6 +14,9 @@ def run_ai_simulation(model_path, config_path="config.json"):
     display = PygameDisplay(64, 32, simulator.get_keys(), config_path)
     # simulator.set_display(display)
 
+    # Model steps can run long; late frames are then shown back to back until on schedule
+    scheduler = FrameScheduler(60, policy="catch_up")
+
     quit = False
     while not quit:
         # Handle input
@@ -24,11 +27,10 @@ def run_ai_simulation(model_path, config_path="config.json"):
         simulator.set_keys(keys)
         
         # Run a frame
-        simulator.step()
+        for _ in range(scheduler.wait()):
+            simulator.step()
         frame = simulator.get_frame()
         display.update(frame)
-        
-        time.sleep(1/60)  # Cap at 60 FPS
 
     display.close()
 
@@ -4,16 +4,19 @@ import sys
 sys.path.append('src')
 import argparse
 from emulators import CHIP8
-from emulators.display_utils import PygameDisplay
+from emulators.frame_scheduler import FrameScheduler, POLICIES
 import time
 
-def run_emulator_pygame(rom_path, config_path="config.json"):
+def run_emulator_pygame(rom_path, config_path="config.json", policy="skip", turbo=False):
+    from emulators.display_utils import PygameDisplay
+
     emulator = CHIP8(config_path)
     if not emulator.load_rom(rom_path):
         print(f"Failed to load ROM: {rom_path}")
         return
 
     display = PygameDisplay(emulator.screen_width, emulator.screen_height,emulator.get_key_map(), config_path)
+    scheduler = FrameScheduler(60, policy=policy, turbo=turbo)
     
     quit = False
     while not quit:
@@ -24,19 +27,45 @@ def run_emulator_pygame(rom_path, config_path="config.json"):
         keys = display.get_keys()
         emulator.set_keys(keys)
         
-        # Run a frame
+        # Run every frame that is due and show the last one
+        frames = scheduler.wait()
+        emulator.advance(frames - 1)
         frame = emulator.run_frame()
-        display.update(frame)
-        
-        time.sleep(1/60)  # Cap at 60 FPS
+        display.update(frame, emulator.take_dirty_rows())
 
     display.close()
 
+def run_emulator_headless(rom_path, num_frames, config_path="config.json", frames_per_call=60):
+    """Run unthrottled without a display, e.g. to check how fast a ROM can be emulated."""
+    emulator = CHIP8(config_path)
+    if not emulator.load_rom(rom_path):
+        print(f"Failed to load ROM: {rom_path}")
+        return
+
+    scheduler = FrameScheduler(60, turbo=True, turbo_frames=frames_per_call)
+    start = time.perf_counter()
+    remaining = num_frames
+    while remaining > 0:
+        frames = min(scheduler.wait(), remaining)
+        emulator.advance(frames)
+        remaining -= frames
+    elapsed = time.perf_counter() - start
+    print(f"Ran {num_frames} frames in {elapsed:.2f}s ({num_frames / elapsed:.0f} frames/s, "
+          f"{num_frames / 60 / elapsed:.0f}x real time)")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Run CHIP-8 ROM')
     parser.add_argument('--rom_path', type=str, required=True, help='Path to the ROM file')
     parser.add_argument('--config', type=str, default='config.json', help='Path to the configuration file')
+    parser.add_argument('--policy', type=str, default='skip', choices=POLICIES,
+                        help='When running late: skip drawing missed frames, or catch up drawing each one')
+    parser.add_argument('--turbo', action='store_true', help='Run as fast as possible instead of at 60 FPS')
+    parser.add_argument('--headless', type=int, default=0, metavar='FRAMES',
+                        help='Run this many frames unthrottled without a display and report the speed')
     args = parser.parse_args()
     
-    print("Running with Pygame display...")
-    run_emulator_pygame(args.rom_path, args.config)
\ No newline at end of file
+    if args.headless:
+        run_emulator_headless(args.rom_path, args.headless, args.config)
+    else:
+        print("Running with Pygame display...")
+        run_emulator_pygame(args.rom_path, args.config, args.policy, args.turbo)
\ No newline at end of file
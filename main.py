@@ -1,28 +1,25 @@
 # main.py
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data import DataLoader
 from models.simple_models import SimpleCNN
 from training.trainer import Trainer
-from data.capture import create_dataset
-from data.preprocessing import Preprocessor
+from data.capture import create_frame_store
+from data.datasets import EmulatorStreamDataset, FramePairDataset
 import os
 
 def main():
-    # Data capture and preprocessing
     rom_path = "chip8-roms/games/Airplane.ch8"
-    frames, states = create_dataset(rom_path, num_frames=100, sampling_rate=2)
 
-    preprocessor = Preprocessor(normalize=True, augment=True)
-    processed_frames = preprocessor.preprocess_dataset(frames)
+    # Training transitions are played live by emulators inside the DataLoader workers
+    train_dataset = EmulatorStreamDataset([rom_path], seeds=range(4), policy="sticky", batch_size=32,
+                                          num_batches=200)
+    train_loader = DataLoader(train_dataset, batch_size=None, num_workers=2)
 
-    processed_frames = processed_frames.reshape(-1, 1, 32, 64)
-    # Create dataset and dataloaders
-    X = processed_frames[:-1]  # Input frames
-    y = processed_frames[1:]   # Target frames (next frame prediction)
-    dataset = TensorDataset(torch.from_numpy(X), torch.from_numpy(y))
-    train_loader = DataLoader(dataset, batch_size=32, shuffle=True)
-    val_loader = DataLoader(dataset, batch_size=32)  # Using same data for simplicity
+    # A small fixed capture, stored on disk, is kept as the validation set
+    store_path = "data/airplane_frames"
+    create_frame_store(rom_path, store_path, num_frames=200, sampling_rate=2, input_policy="sticky", seed=100)
+    val_loader = DataLoader(FramePairDataset(store_path), batch_size=32)
     
     # Model, optimizer, and loss function
     model = SimpleCNN(input_channels=1, output_channels=1)  # Adjust channels as needed
@@ -37,7 +34,7 @@ def main():
     os.makedirs('models', exist_ok=True)
     model.save(f'models/simple_cnn_{trainer.logger.experiment_id}.pth')
     trainer.logger.log_artifact('model', f'models/simple_cnn_{trainer.logger.experiment_id}.pth')
-    trainer.logger.save()
+    trainer.logger.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
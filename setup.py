@@ -14,7 +14,8 @@ class GetPybindInclude(object):
 ext_modules = [
     Extension(
         'emulators.emulator_module',
-        ['cpp/bindings/emulator_bindings.cpp', 'cpp/src/chip8_emulator.cpp'],
+        ['cpp/bindings/emulator_bindings.cpp', 'cpp/src/chip8_emulator.cpp',
+         'cpp/src/chip8_decoded.cpp', 'cpp/src/chip8_batch.cpp'],
         include_dirs=[
             'cpp/include',
             GetPybindInclude(),
@@ -2,19 +2,29 @@
 
 import numpy as np
 from emulators.chip8_wrapper import CHIP8
+from data.frame_store import FrameStoreWriter
+from data.input_policies import make_input_policy
 
 class DataCapture:
-    def __init__(self, emulator, sampling_rate=1):
+    def __init__(self, emulator, sampling_rate=1, packed=False, state_store=None):
         self.emulator = emulator
         self.sampling_rate = sampling_rate
+        self.packed = packed
+        self.state_store = state_store
         self.frame_count = 0
 
     def capture_frame(self):
-        frame = self.emulator.get_display()
-        return np.array(frame, dtype=np.uint8).reshape((32, 64))
+        # get_display already returns a fresh (32, 64) uint8 array, so no extra copy is needed
+        if self.packed:
+            return self.emulator.get_display_packed()
+        return self.emulator.get_display()
 
     def capture_state(self):
-        return self.emulator.get_state()
+        # With a StateStore, states are delta-encoded into it and referenced by index
+        state = self.emulator.get_state()
+        if self.state_store is not None:
+            return self.state_store.append(state)
+        return state
 
     def run_and_capture(self, num_frames):
         frames = []
@@ -27,15 +37,42 @@ class DataCapture:
                 states.append(self.capture_state())
         return frames, states
 
-def create_dataset(rom_path, num_frames, sampling_rate=1):
+    def run_and_stream(self, num_frames, writer, input_policy=None):
+        """Like run_and_capture, but appends sampled frames to a FrameStoreWriter instead of RAM."""
+        captured = 0
+        for frame_index in range(num_frames):
+            keys = None
+            if input_policy is not None:
+                keys = input_policy(frame_index)
+                self.emulator.set_keys(keys.tolist())
+            self.emulator.run_frame()
+            self.frame_count += 1
+            if self.frame_count % self.sampling_rate == 0:
+                writer.append_emulator(self.emulator, keys)
+                captured += 1
+        return captured
+
+def create_dataset(rom_path, num_frames, sampling_rate=1, packed=False, state_store=None):
     emulator = CHIP8()
     emulator.load_rom(rom_path)
     
-    capturer = DataCapture(emulator, sampling_rate)
+    capturer = DataCapture(emulator, sampling_rate, packed, state_store)
     frames, states = capturer.run_and_capture(num_frames)
     
     return frames, states
 
+def create_frame_store(rom_path, store_path, num_frames, sampling_rate=1, packed=False,
+                       input_policy="none", seed=None, chunk_size=4096):
+    emulator = CHIP8(seed=seed)
+    emulator.load_rom(rom_path)
+
+    capturer = DataCapture(emulator, sampling_rate)
+    policy = make_input_policy(input_policy, seed=seed)
+    with FrameStoreWriter(store_path, packed=packed, chunk_size=chunk_size,
+                          state_size=emulator.state_size) as writer:
+        captured = capturer.run_and_stream(num_frames, writer, policy)
+    return captured
+
 # Example usage
 if __name__ == "__main__":
     rom_path = "chip8-roms/games/Airplane.ch8"
@@ -0,0 +1,121 @@
+# src/data/datasets.py
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset, IterableDataset, get_worker_info
+from data.frame_store import FrameStore
+from data.input_policies import make_input_policy
+from emulators.chip8_batch_wrapper import CHIP8Batch
+
+class FramePairDataset(Dataset):
+    """(frame_t, frame_t+1) next-frame pairs read lazily from a FrameStore.
+
+    Items match the layout main.py used with TensorDataset: two float32 tensors of
+    shape (1, 32, 64) normalized to [0, 1]. With `raw=True` items are the frames as
+    stored (uint8, possibly bit-packed), left for a BatchPreprocessor collate_fn.
+    """
+
+    def __init__(self, store, indices=None, raw=False):
+        self.store = store if isinstance(store, FrameStore) else FrameStore(store)
+        self.indices = self.store.pair_indices() if indices is None else np.asarray(indices)
+        self.raw = raw
+
+    def __len__(self):
+        return len(self.indices)
+
+    def _load(self, index):
+        frame = self.store.get_frame(index).astype(np.float32) / 255.0
+        return torch.from_numpy(frame).unsqueeze(0)
+
+    def __getitem__(self, i):
+        t = int(self.indices[i])
+        if self.raw:
+            return self.store.get_raw_frame(t), self.store.get_raw_frame(t + 1)
+        return self._load(t), self._load(t + 1)
+
+    def split(self, val_fraction=0.1, seed=0):
+        """Split into train and validation datasets over the same store."""
+        order = np.random.default_rng(seed).permutation(self.indices)
+        num_val = int(len(order) * val_fraction)
+        return (FramePairDataset(self.store, order[num_val:], self.raw),
+                FramePairDataset(self.store, order[:num_val], self.raw))
+
+class EmulatorStreamDataset(IterableDataset):
+    """Endless (frame_t, keys_t, frame_t+1) batches played live by CHIP-8 emulators.
+
+    Nothing is captured up front: each DataLoader worker builds its own CHIP8Batch of
+    `batch_size` machines inside __iter__, playing its share of the (ROM, seed) pairs
+    with the named input policy, and yields one batch per emulated step. Items are
+    already batches, so use ``DataLoader(dataset, batch_size=None, num_workers=...)``.
+
+    Frames are float32 tensors of shape (B, 1, 32, 64) in [0, 1], as in
+    FramePairDataset; keys are (B, 16) bool tensors. Every `episode_length` steps all
+    machines are reset to the freshly loaded ROM with new seeds. With `num_batches`
+    set, the workers together yield that many batches; otherwise iteration never ends.
+    """
+
+    def __init__(self, rom_paths, seeds=(0,), policy="random", batch_size=32, episode_length=1000,
+                 frame_skip=1, num_batches=None, config_path="config.json", policy_kwargs=None):
+        self.rom_paths = [rom_paths] if isinstance(rom_paths, str) else list(rom_paths)
+        self.seeds = list(seeds)
+        self.policy = policy
+        self.policy_kwargs = policy_kwargs or {}
+        self.batch_size = batch_size
+        self.episode_length = episode_length
+        self.frame_skip = frame_skip
+        self.num_batches = num_batches
+        self.config_path = config_path
+
+    def __len__(self):
+        if self.num_batches is None:
+            raise TypeError("EmulatorStreamDataset without num_batches has no length")
+        return self.num_batches
+
+    def _shard(self, worker_id, num_workers):
+        pairs = [(rom_path, seed) for rom_path in self.rom_paths for seed in self.seeds]
+        mine = pairs[worker_id::num_workers]
+        if not mine:
+            # More workers than pairs: replay a pair under a seed no other worker uses
+            rom_path, seed = pairs[worker_id % len(pairs)]
+            mine = [(rom_path, seed + worker_id * len(self.seeds))]
+        return mine
+
+    def __iter__(self):
+        info = get_worker_info()
+        worker_id, num_workers = (info.id, info.num_workers) if info is not None else (0, 1)
+        pairs = self._shard(worker_id, num_workers)
+        num_batches = None
+        if self.num_batches is not None:
+            num_batches = self.num_batches // num_workers + (worker_id < self.num_batches % num_workers)
+
+        assigned = [pairs[i % len(pairs)] for i in range(self.batch_size)]
+        emulators = CHIP8Batch(self.batch_size, self.config_path)
+        emulators.load_roms([rom_path for rom_path, _ in assigned])
+        initial_states = [emulators.get_state(i) for i in range(self.batch_size)]
+        policies = [
+            make_input_policy(self.policy, seed=np.random.SeedSequence([seed, worker_id, i]), **self.policy_kwargs)
+            for i, (_, seed) in enumerate(assigned)
+        ]
+        base_seed = int(np.random.SeedSequence([assigned[0][1], worker_id]).generate_state(1)[0])
+
+        keys = np.zeros((self.batch_size, 16), dtype=bool)
+        produced = episode = step = 0
+        while num_batches is None or produced < num_batches:
+            if step % self.episode_length == 0:
+                for i, state in enumerate(initial_states):
+                    emulators.set_state(i, state)
+                emulators.seed(base_seed + episode * self.batch_size)
+                episode += 1
+                current = emulators.run_frames(0, np.zeros_like(keys)).copy()
+            for i, policy in enumerate(policies):
+                keys[i] = policy(step)
+            following = emulators.run_frames(self.frame_skip, keys).copy()
+            yield self._to_tensor(current), torch.from_numpy(keys.copy()), self._to_tensor(following)
+            current = following
+            produced += 1
+            step += 1
+
+    @staticmethod
+    def _to_tensor(frames):
+        return torch.from_numpy(frames).unsqueeze(1).float().div_(255.0)
+
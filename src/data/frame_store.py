@@ -0,0 +1,183 @@
+# src/data/frame_store.py
+
+import json
+import os
+
+import numpy as np
+
+FRAME_SHAPE = (32, 64)
+PACKED_FRAME_SHAPE = (256,)
+META_FILE = "meta.json"
+
+def _chunk_path(path, name, chunk):
+    return os.path.join(path, f"{name}_{chunk:05d}.npy")
+
+class FrameStoreWriter:
+    """Appends frames, key inputs and states to a directory of fixed-size memory-mapped chunks.
+
+    Nothing is held in RAM beyond the current chunk's memory maps, and the metadata is
+    rewritten on every flush so a store remains readable up to the last flushed frame.
+    """
+
+    def __init__(self, path, packed=False, chunk_size=4096, state_size=None, flush_every=1024):
+        self.path = path
+        self.packed = packed
+        self.chunk_size = chunk_size
+        self.state_size = state_size
+        self.flush_every = flush_every
+        self.frame_shape = PACKED_FRAME_SHAPE if packed else FRAME_SHAPE
+        self.num_frames = 0
+        self.episode_starts = [0]
+        self._chunk = -1
+        self._frames = self._keys = self._states = None
+        os.makedirs(path, exist_ok=True)
+
+    def _open_chunk(self, chunk):
+        self._close_chunk()
+        self._chunk = chunk
+        self._frames = np.lib.format.open_memmap(_chunk_path(self.path, "frames", chunk), mode="w+",
+                                                 dtype=np.uint8, shape=(self.chunk_size,) + self.frame_shape)
+        self._keys = np.lib.format.open_memmap(_chunk_path(self.path, "keys", chunk), mode="w+",
+                                               dtype=bool, shape=(self.chunk_size, 16))
+        if self.state_size:
+            self._states = np.lib.format.open_memmap(_chunk_path(self.path, "states", chunk), mode="w+",
+                                                     dtype=np.uint8, shape=(self.chunk_size, self.state_size))
+
+    def _close_chunk(self):
+        for array in (self._frames, self._keys, self._states):
+            if array is not None:
+                array.flush()
+        self._frames = self._keys = self._states = None
+
+    def _next_slot(self):
+        chunk, row = divmod(self.num_frames, self.chunk_size)
+        if chunk != self._chunk:
+            self._open_chunk(chunk)
+        return row
+
+    def _advance(self):
+        self.num_frames += 1
+        if self.flush_every and self.num_frames % self.flush_every == 0:
+            self.flush()
+
+    def append(self, frame, keys=None, state=None):
+        row = self._next_slot()
+        frame = np.asarray(frame, dtype=np.uint8)
+        if self.packed and frame.shape == FRAME_SHAPE:
+            frame = np.packbits(frame > 0)
+        self._frames[row] = frame.reshape(self.frame_shape)
+        if keys is not None:
+            self._keys[row] = keys
+        if self._states is not None and state is not None:
+            self._states[row] = np.frombuffer(state, dtype=np.uint8)
+        self._advance()
+
+    def append_emulator(self, emulator, keys=None):
+        """Copy the emulator's current display and state straight into the memory-mapped chunk."""
+        row = self._next_slot()
+        if self.packed:
+            emulator.get_display_packed(self._frames[row])
+        else:
+            emulator.get_display_into(self._frames[row])
+        if keys is not None:
+            self._keys[row] = keys
+        if self._states is not None:
+            emulator.get_state_into(self._states[row])
+        self._advance()
+
+    def end_episode(self):
+        """Mark an emulator reset so (frame_t, frame_t+1) pairs never span two episodes."""
+        if self.num_frames != self.episode_starts[-1]:
+            self.episode_starts.append(self.num_frames)
+
+    def flush(self):
+        for array in (self._frames, self._keys, self._states):
+            if array is not None:
+                array.flush()
+        meta = {
+            "num_frames": self.num_frames,
+            "chunk_size": self.chunk_size,
+            "packed": self.packed,
+            "frame_shape": list(self.frame_shape),
+            "state_size": self.state_size,
+            "episode_starts": self.episode_starts,
+        }
+        tmp_path = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, META_FILE))
+
+    def close(self):
+        self.flush()
+        self._close_chunk()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class FrameStore:
+    """Read side of a FrameStoreWriter directory; chunks are memory-mapped on first access.
+
+    Open memory maps are dropped when pickled, so a store can be handed to DataLoader
+    worker processes and each worker maps the files itself.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE), "r") as f:
+            self.meta = json.load(f)
+        self.num_frames = self.meta["num_frames"]
+        self.chunk_size = self.meta["chunk_size"]
+        self.packed = self.meta["packed"]
+        self.episode_starts = self.meta["episode_starts"]
+        self._maps = {}
+
+    def __len__(self):
+        return self.num_frames
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_maps"] = {}
+        return state
+
+    def _map(self, name, chunk):
+        key = (name, chunk)
+        if key not in self._maps:
+            self._maps[key] = np.load(_chunk_path(self.path, name, chunk), mmap_mode="r")
+        return self._maps[key]
+
+    def _locate(self, index):
+        if index < 0:
+            index += self.num_frames
+        if not 0 <= index < self.num_frames:
+            raise IndexError(f"Frame index {index} out of range for store of {self.num_frames} frames")
+        return divmod(index, self.chunk_size)
+
+    def get_raw_frame(self, index):
+        """Frame exactly as stored: (32, 64) uint8, or (256,) uint8 when packed."""
+        chunk, row = self._locate(index)
+        return self._map("frames", chunk)[row]
+
+    def get_frame(self, index):
+        frame = self.get_raw_frame(index)
+        if self.packed:
+            return np.unpackbits(frame).reshape(FRAME_SHAPE) * np.uint8(255)
+        return np.array(frame)
+
+    def get_keys(self, index):
+        chunk, row = self._locate(index)
+        return np.array(self._map("keys", chunk)[row])
+
+    def get_state(self, index):
+        if not self.meta["state_size"]:
+            raise ValueError("This frame store was written without states")
+        chunk, row = self._locate(index)
+        return self._map("states", chunk)[row].tobytes()
+
+    def pair_indices(self):
+        """Indices t such that frames t and t+1 belong to the same episode."""
+        valid = np.ones(max(self.num_frames - 1, 0), dtype=bool)
+        valid[[start - 1 for start in self.episode_starts[1:] if start < self.num_frames]] = False
+        return np.flatnonzero(valid)
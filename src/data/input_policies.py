@@ -0,0 +1,56 @@
+# src/data/input_policies.py
+
+import numpy as np
+
+class InputPolicy:
+    """Produces the 16-key keypad state to apply before each emulated frame."""
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.keys = np.zeros(16, dtype=bool)
+
+    def __call__(self, frame_index):
+        return self.keys
+
+class NoInputPolicy(InputPolicy):
+    """Never presses any key."""
+
+class RandomInputPolicy(InputPolicy):
+    """Presses each key independently with probability `press_prob` every frame."""
+
+    def __init__(self, seed=None, press_prob=0.1):
+        super().__init__(seed)
+        self.press_prob = press_prob
+
+    def __call__(self, frame_index):
+        self.keys[:] = self.rng.random(16) < self.press_prob
+        return self.keys
+
+class StickyInputPolicy(InputPolicy):
+    """Holds a single random key (or nothing) for a random number of frames."""
+
+    def __init__(self, seed=None, min_hold=5, max_hold=30, idle_prob=0.3):
+        super().__init__(seed)
+        self.min_hold = min_hold
+        self.max_hold = max_hold
+        self.idle_prob = idle_prob
+        self.hold_until = 0
+
+    def __call__(self, frame_index):
+        if frame_index >= self.hold_until:
+            self.keys[:] = False
+            if self.rng.random() >= self.idle_prob:
+                self.keys[self.rng.integers(16)] = True
+            self.hold_until = frame_index + int(self.rng.integers(self.min_hold, self.max_hold + 1))
+        return self.keys
+
+INPUT_POLICIES = {
+    "none": NoInputPolicy,
+    "random": RandomInputPolicy,
+    "sticky": StickyInputPolicy,
+}
+
+def make_input_policy(name, seed=None, **kwargs):
+    if name not in INPUT_POLICIES:
+        raise ValueError(f"Unknown input policy '{name}', expected one of {sorted(INPUT_POLICIES)}")
+    return INPUT_POLICIES[name](seed=seed, **kwargs)
@@ -0,0 +1,158 @@
+# src/data/parallel_capture.py
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from emulators.chip8_wrapper import CHIP8
+from data.input_policies import INPUT_POLICIES, make_input_policy
+
+ROM_EXTENSIONS = (".ch8", ".c8")
+
+def find_roms(rom_dir, extensions=ROM_EXTENSIONS):
+    """Recursively list ROM files under `rom_dir`, sorted for stable job ordering."""
+    roms = []
+    for root, _, files in os.walk(rom_dir):
+        for name in files:
+            if name.lower().endswith(extensions):
+                roms.append(os.path.join(root, name))
+    return sorted(roms)
+
+def build_jobs(rom_paths, num_frames, seeds=(0,), policies=("random",), sampling_rate=1,
+               packed=False, config_path="config.json"):
+    """One job per (ROM, seed, input policy) combination."""
+    jobs = []
+    for rom_path in rom_paths:
+        rom_name = os.path.splitext(os.path.basename(rom_path))[0]
+        for seed in seeds:
+            for policy in policies:
+                jobs.append({
+                    "shard": f"{len(jobs):05d}_{rom_name}_{policy}_s{seed}.npz",
+                    "rom_path": rom_path,
+                    "seed": seed,
+                    "policy": policy,
+                    "num_frames": num_frames,
+                    "sampling_rate": sampling_rate,
+                    "packed": packed,
+                    "config_path": config_path,
+                })
+    return jobs
+
+def failed_entry(job, error):
+    entry = {key: job[key] for key in ("shard", "rom_path", "seed", "policy", "packed")}
+    entry.update(num_samples=0, error=error)
+    return entry
+
+def capture_job(job, output_dir):
+    """Play one ROM with one input policy and write its frames, keys and states to a shard."""
+    start = time.perf_counter()
+    entry = {key: job[key] for key in ("shard", "rom_path", "seed", "policy", "packed")}
+
+    emulator = CHIP8(job["config_path"], seed=job["seed"])
+    if not emulator.load_rom(job["rom_path"]):
+        return failed_entry(job, "failed to load ROM")
+    policy = make_input_policy(job["policy"], seed=job["seed"])
+
+    num_samples = job["num_frames"] // job["sampling_rate"]
+    frame_shape = (256,) if job["packed"] else (emulator.screen_height, emulator.screen_width)
+    frames = np.zeros((num_samples,) + frame_shape, dtype=np.uint8)
+    keys = np.zeros((num_samples, 16), dtype=bool)
+    states = np.zeros((num_samples, emulator.state_size), dtype=np.uint8)
+
+    captured = 0
+    for frame_index in range(num_samples * job["sampling_rate"]):
+        frame_keys = policy(frame_index)
+        emulator.set_keys(frame_keys.tolist())
+        emulator.run_frames(1)
+        if (frame_index + 1) % job["sampling_rate"] == 0:
+            if job["packed"]:
+                emulator.get_display_packed(frames[captured])
+            else:
+                emulator.get_display_into(frames[captured])
+            keys[captured] = frame_keys
+            emulator.get_state_into(states[captured])
+            captured += 1
+
+    np.savez(os.path.join(output_dir, job["shard"]),
+             frames=frames[:captured], keys=keys[:captured], states=states[:captured])
+    entry["num_samples"] = captured
+    entry["seconds"] = time.perf_counter() - start
+    return entry
+
+def parallel_capture(rom_paths, output_dir, num_frames, seeds=(0,), policies=("random",),
+                     sampling_rate=1, packed=False, num_workers=None, config_path="config.json",
+                     progress=None):
+    """Spread capture jobs across a process pool and write one shard per job plus a manifest.
+
+    A job that raises, or whose worker dies, is recorded in the manifest with its error
+    instead of aborting the capture. `progress(done, total, entry)` is called as each
+    job finishes.
+    """
+    if isinstance(rom_paths, str):
+        rom_paths = find_roms(rom_paths)
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = build_jobs(rom_paths, num_frames, seeds, policies, sampling_rate, packed, config_path)
+
+    start = time.perf_counter()
+    shards = []
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = {executor.submit(capture_job, job, output_dir): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                entry = future.result()
+            except Exception as e:
+                # Includes BrokenProcessPool: a crashed worker fails its job and any still queued
+                entry = failed_entry(futures[future], f"{type(e).__name__}: {e}")
+            shards.append(entry)
+            if progress is not None:
+                progress(len(shards), len(jobs), entry)
+
+    shards.sort(key=lambda entry: entry["shard"])
+    manifest = {
+        "num_frames": num_frames,
+        "sampling_rate": sampling_rate,
+        "packed": packed,
+        "total_samples": sum(entry["num_samples"] for entry in shards),
+        "failed": [entry["shard"] for entry in shards if "error" in entry],
+        "seconds": time.perf_counter() - start,
+        "shards": shards,
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def load_shard(output_dir, entry):
+    with np.load(os.path.join(output_dir, entry["shard"])) as shard:
+        return shard["frames"], shard["keys"], shard["states"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture CHIP-8 datasets from many ROMs in parallel")
+    parser.add_argument("--rom_dir", type=str, required=True, help="Directory searched recursively for ROMs")
+    parser.add_argument("--output_dir", type=str, required=True, help="Directory for shards and manifest.json")
+    parser.add_argument("--num_frames", type=int, default=1000, help="Frames to emulate per job")
+    parser.add_argument("--sampling_rate", type=int, default=1, help="Capture every Nth frame")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0], help="Emulator and policy seeds")
+    parser.add_argument("--policies", type=str, nargs="+", default=["random"], choices=sorted(INPUT_POLICIES),
+                        help="Input policies to play each ROM with")
+    parser.add_argument("--packed", action="store_true", help="Store 256-byte bit-packed frames")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--config", type=str, default="config.json", help="Path to the configuration file")
+    args = parser.parse_args()
+
+    def report(done, total, entry):
+        status = entry.get("error", "ok")
+        print(f"[{done}/{total}] {entry['shard']}: {entry['num_samples']} samples ({status})")
+
+    manifest = parallel_capture(args.rom_dir, args.output_dir, args.num_frames, args.seeds, args.policies,
+                                args.sampling_rate, args.packed, args.workers, args.config, progress=report)
+    rate = manifest["total_samples"] / max(manifest["seconds"], 1e-9)
+    print(f"Captured {manifest['total_samples']} samples from {len(manifest['shards'])} jobs "
+          f"in {manifest['seconds']:.1f}s ({rate:.0f} samples/s)")
+    if manifest["failed"]:
+        print(f"{len(manifest['failed'])} job(s) failed: " + ", ".join(manifest["failed"]))
+
+if __name__ == "__main__":
+    main()
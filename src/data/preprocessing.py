@@ -2,6 +2,9 @@
 
 import numpy as np
 
+FRAME_SHAPE = (32, 64)
+PACKED_SIZE = FRAME_SHAPE[0] * FRAME_SHAPE[1] // 8
+
 def normalize_frame(frame):
     """Normalize the frame data to range [0, 1]"""
     return frame.astype(np.float32) / 255.0
@@ -10,20 +13,163 @@ def augment_frame(frame):
     """Apply simple data augmentation (horizontal flip)"""
     return np.fliplr(frame)
 
+def unpack_frames(packed, out=None):
+    """(N, 256) bit-packed frames -> (N, 32, 64) uint8 frames of 0/255."""
+    packed = np.asarray(packed, dtype=np.uint8).reshape(-1, PACKED_SIZE)
+    if out is None:
+        out = np.empty((len(packed),) + FRAME_SHAPE, dtype=np.uint8)
+    np.multiply(np.unpackbits(packed, axis=1).reshape(out.shape), np.uint8(255), out=out)
+    return out
+
+def as_frames(frames):
+    """Accept (N, 32, 64) frames or (N, 256) packed bitmaps; return (N, 32, 64) uint8."""
+    frames = np.asarray(frames)
+    if frames.shape[-1] == PACKED_SIZE and frames.shape[-2:] != FRAME_SHAPE:
+        return unpack_frames(frames)
+    return frames.reshape((-1,) + FRAME_SHAPE)
+
+def normalize_frames(frames, dtype=np.float32, out=None):
+    """Scale uint8 frames to [0, 1] in one pass, writing into `out` when given."""
+    if out is None:
+        out = np.empty(frames.shape, dtype=dtype)
+    np.multiply(frames, out.dtype.type(1.0 / 255.0), out=out, casting="unsafe")
+    return out
+
+class BatchAugmenter:
+    """Random per-sample flips, shifts and pixel noise applied to a whole batch at once.
+
+    Geometric changes are applied identically to `frames` and `targets`, so
+    (frame_t, frame_t+1) pairs stay consistent; pixel noise only corrupts the inputs.
+    Shifts wrap around the screen edges like CHIP-8 sprites do.
+    """
+
+    def __init__(self, flip_prob=0.5, max_shift=0, noise_prob=0.0, seed=None):
+        self.flip_prob = flip_prob
+        self.max_shift = max_shift
+        self.noise_prob = noise_prob
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self._worker_id = None
+
+    def reseed_for_worker(self):
+        """Give each DataLoader worker its own stream instead of a forked copy of one."""
+        try:
+            from torch.utils.data import get_worker_info
+        except ImportError:
+            return
+        info = get_worker_info()
+        if info is not None and info.id != self._worker_id:
+            self._worker_id = info.id
+            self.rng = np.random.default_rng([info.seed, 0 if self.seed is None else self.seed])
+
+    def _flip(self, batch, mask):
+        batch[mask] = batch[mask][:, :, ::-1]
+
+    def _shift(self, batches, dy, dx):
+        # Few distinct offsets: roll each group of samples sharing one instead of gathering per pixel
+        span = 2 * self.max_shift + 1
+        offsets = (dy + self.max_shift) * span + (dx + self.max_shift)
+        shifted = [np.empty_like(batch) for batch in batches]
+        for offset in np.unique(offsets):
+            mask = offsets == offset
+            shift = (int(offset) // span - self.max_shift, int(offset) % span - self.max_shift)
+            for batch, out in zip(batches, shifted):
+                out[mask] = np.roll(batch[mask], shift, axis=(1, 2))
+        return shifted
+
+    def __call__(self, frames, targets=None):
+        """Augment (N, 32, 64) arrays in place where possible; returns (frames, targets)."""
+        n = len(frames)
+        if self.flip_prob:
+            mask = self.rng.random(n) < self.flip_prob
+            self._flip(frames, mask)
+            if targets is not None:
+                self._flip(targets, mask)
+        if self.max_shift:
+            dy, dx = self.rng.integers(-self.max_shift, self.max_shift + 1, size=(2, n))
+            if targets is None:
+                frames, = self._shift([frames], dy, dx)
+            else:
+                frames, targets = self._shift([frames, targets], dy, dx)
+        if self.noise_prob:
+            # Same distribution as an independent coin per pixel, without drawing one per pixel
+            flat = frames.reshape(-1)
+            count = self.rng.binomial(flat.size, self.noise_prob)
+            noisy = self.rng.choice(flat.size, count, replace=False)
+            if frames.dtype == np.uint8:
+                flat[noisy] ^= 255
+            else:
+                flat[noisy] = 1 - flat[noisy]
+        return frames, targets
+
+class BatchPreprocessor:
+    """Unpack, augment and normalize whole batches; usable offline or as a DataLoader collate_fn.
+
+    As a collate_fn it takes a list of (frame, next_frame) or (frame, keys, next_frame)
+    items holding uint8 frames or packed bitmaps (e.g. FramePairDataset(raw=True)) and
+    returns float tensors of shape (N, 1, 32, 64).
+    """
+
+    def __init__(self, normalize=True, dtype=np.float32, augmenter=None):
+        self.normalize = normalize
+        self.dtype = np.dtype(dtype)
+        self.augmenter = augmenter
+
+    @staticmethod
+    def _writable(frames, source):
+        """`frames` if it may be modified in place, or a copy while it still views the caller's `source`."""
+        if isinstance(source, np.ndarray) and np.may_share_memory(frames, source):
+            return frames.copy()
+        return frames
+
+    def __call__(self, frames, targets=None):
+        """Process (N, 32, 64) or (N, 256) arrays; returns frames, or (frames, targets) if given."""
+        source_frames, source_targets = frames, targets
+        frames = as_frames(frames)
+        targets = None if targets is None else as_frames(targets)
+        if self.augmenter is not None:
+            # Augmentation works in place: only arrays still backed by the caller's are copied,
+            # not ones just built by unpacking or by collate's stacking
+            frames = self._writable(frames, source_frames)
+            targets = None if targets is None else self._writable(targets, source_targets)
+            frames, targets = self.augmenter(frames, targets)
+        if self.normalize:
+            frames = normalize_frames(frames, self.dtype)
+            targets = None if targets is None else normalize_frames(targets, self.dtype)
+        return frames if targets is None else (frames, targets)
+
+    def collate(self, batch):
+        import torch
+
+        if self.augmenter is not None:
+            self.augmenter.reseed_for_worker()
+        columns = list(zip(*batch))
+        frames = np.stack([np.asarray(item) for item in columns[0]])
+        targets = np.stack([np.asarray(item) for item in columns[-1]])
+        frames, targets = self(frames, targets)
+        result = [torch.from_numpy(frames).unsqueeze(1)]
+        if len(columns) == 3:
+            result.append(torch.from_numpy(np.stack([np.asarray(keys) for keys in columns[1]])))
+        result.append(torch.from_numpy(targets).unsqueeze(1))
+        return tuple(result)
+
 class Preprocessor:
-    def __init__(self, normalize=True, augment=False):
+    def __init__(self, normalize=True, augment=False, seed=None):
         self.normalize = normalize
         self.augment = augment
+        self.rng = np.random.default_rng(seed)
+        self._batch = BatchPreprocessor(normalize, augmenter=BatchAugmenter(seed=seed) if augment else None)
 
     def preprocess_frame(self, frame):
         if self.normalize:
             frame = normalize_frame(frame)
-        if self.augment:
+        # Flip half of the frames; flipping every frame would just mirror the dataset
+        if self.augment and self.rng.random() < 0.5:
             frame = augment_frame(frame)
         return frame
 
     def preprocess_dataset(self, frames):
-        return np.array([self.preprocess_frame(frame) for frame in frames])
+        return self._batch(np.asarray(frames))
 
 # Example usage
 if __name__ == "__main__":
@@ -38,4 +184,4 @@ if __name__ == "__main__":
     print(f"Preprocessed {len(processed_frames)} frames")
     print(f"Sample frame shape: {processed_frames[0].shape}")
     print(f"Sample frame min value: {processed_frames[0].min()}")
-    print(f"Sample frame max value: {processed_frames[0].max()}")
\ No newline at end of file
+    print(f"Sample frame max value: {processed_frames[0].max()}")
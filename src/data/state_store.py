@@ -0,0 +1,136 @@
+# src/data/state_store.py
+
+import numpy as np
+
+KEYFRAME = 0
+DELTA = 1
+
+class StateStore:
+    """Compact storage for long sequences of equally sized emulator states.
+
+    States are split into fixed-size pages. Every `keyframe_interval`-th state is a
+    keyframe listing all of its pages; the others only list the pages that changed
+    since the previous state. Pages are content-addressed, so identical pages (the
+    font, the ROM, unchanged RAM) are stored once no matter how often they occur.
+    """
+
+    def __init__(self, page_size=64, keyframe_interval=256):
+        self.page_size = page_size
+        self.keyframe_interval = keyframe_interval
+        self.state_size = None
+        self.pages = []
+        self._page_ids = {}
+        self._kinds = []
+        self._page_indices = []
+        self._entry_page_ids = []
+        self._previous = None
+        self._cache_index = None
+        self._cache_ids = None
+
+    def __len__(self):
+        return len(self._kinds)
+
+    def _split(self, state):
+        padded = bytes(state) + bytes(-len(state) % self.page_size)
+        return [padded[i:i + self.page_size] for i in range(0, len(padded), self.page_size)]
+
+    def _page_id(self, page):
+        page_id = self._page_ids.get(page)
+        if page_id is None:
+            page_id = len(self.pages)
+            self.pages.append(page)
+            self._page_ids[page] = page_id
+        return page_id
+
+    def append(self, state):
+        """Add a state and return its index."""
+        if self.state_size is None:
+            self.state_size = len(state)
+        elif len(state) != self.state_size:
+            raise ValueError(f"Expected a state of {self.state_size} bytes, got {len(state)}")
+
+        pages = self._split(state)
+        if len(self) % self.keyframe_interval == 0:
+            kind = KEYFRAME
+            indices = np.arange(len(pages), dtype=np.uint16)
+        else:
+            kind = DELTA
+            indices = np.array([i for i, page in enumerate(pages) if page != self._previous[i]], dtype=np.uint16)
+
+        self._kinds.append(kind)
+        self._page_indices.append(indices)
+        self._entry_page_ids.append(np.array([self._page_id(pages[i]) for i in indices], dtype=np.uint32))
+        self._previous = pages
+        return len(self) - 1
+
+    def extend(self, states):
+        for state in states:
+            self.append(state)
+
+    def _page_table(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(f"State index {index} out of range for store of {len(self)} states")
+        keyframe = index - index % self.keyframe_interval
+        # Sequential reads continue from the last reconstructed state instead of the keyframe
+        if self._cache_index is not None and keyframe <= self._cache_index <= index:
+            start, ids = self._cache_index + 1, self._cache_ids.copy()
+        else:
+            start, ids = keyframe + 1, self._entry_page_ids[keyframe].copy()
+        for entry in range(start, index + 1):
+            ids[self._page_indices[entry]] = self._entry_page_ids[entry]
+        self._cache_index, self._cache_ids = index, ids
+        return ids
+
+    def get(self, index):
+        """Reconstruct state `index` as bytes."""
+        if index < 0:
+            index += len(self)
+        ids = self._page_table(index)
+        return b"".join(self.pages[page_id] for page_id in ids)[:self.state_size]
+
+    def __getitem__(self, index):
+        return self.get(index)
+
+    @property
+    def nbytes(self):
+        """Approximate storage used by pages and page tables."""
+        tables = sum(indices.nbytes + ids.nbytes for indices, ids in zip(self._page_indices, self._entry_page_ids))
+        return len(self.pages) * self.page_size + tables
+
+    @property
+    def compression_ratio(self):
+        if not len(self):
+            return 1.0
+        return len(self) * self.state_size / max(self.nbytes, 1)
+
+    def save(self, path):
+        """Write the store to `path` exactly as given (numpy would otherwise append .npz to it)."""
+        counts = np.array([len(indices) for indices in self._page_indices], dtype=np.int64)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                page_size=self.page_size,
+                keyframe_interval=self.keyframe_interval,
+                state_size=self.state_size or 0,
+                pages=np.frombuffer(b"".join(self.pages), dtype=np.uint8).reshape(-1, self.page_size),
+                kinds=np.array(self._kinds, dtype=np.uint8),
+                counts=counts,
+                page_indices=np.concatenate(self._page_indices) if self._page_indices else np.zeros(0, np.uint16),
+                page_ids=np.concatenate(self._entry_page_ids) if self._entry_page_ids else np.zeros(0, np.uint32),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            store = cls(int(data["page_size"]), int(data["keyframe_interval"]))
+            store.state_size = int(data["state_size"]) or None
+            store.pages = [page.tobytes() for page in data["pages"]]
+            store._page_ids = {page: i for i, page in enumerate(store.pages)}
+            store._kinds = data["kinds"].tolist()
+            offsets = np.concatenate([[0], np.cumsum(data["counts"])])
+            page_indices, page_ids = data["page_indices"], data["page_ids"]
+            store._page_indices = [page_indices[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+            store._entry_page_ids = [page_ids[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+        if len(store):
+            store._previous = store._split(store.get(len(store) - 1))
+        return store
@@ -1,4 +1,7 @@
 # File: src/emulators/__init__.py
 
 from .base_wrapper import BaseEmulator
-from .chip8_wrapper import CHIP8
\ No newline at end of file
+from .chip8_wrapper import CHIP8
+from .chip8_batch_wrapper import CHIP8Batch
+from .chip8_env import CHIP8Env
+from .vector_env import SubprocVectorEnv, SyncVectorEnv, make_vector_env
@@ -0,0 +1,115 @@
+# File: src/emulators/chip8_batch_wrapper.py
+
+import numpy as np
+from typing import List, Optional, Sequence
+from .emulator_module import CHIP8Batch as _CHIP8Batch
+from .config import Config
+from .chip8_wrapper import ENGINES
+
+class CHIP8Batch:
+    """N independent CHIP-8 machines stepped together in one native call.
+
+    All displays are written into a single preallocated (N, 32, 64) uint8
+    buffer which is overwritten in place on every ``run_frame``.
+    """
+
+    def __init__(self, num_emulators: int, config_path="config.json", num_threads: int = 1,
+                 seed: Optional[int] = None):
+        self._batch = _CHIP8Batch(num_emulators, num_threads)
+        self.num_emulators = num_emulators
+        self.screen_width = 64
+        self.screen_height = 32
+        self.config = Config(config_path)
+        self.clock_speed = self.config.get("clock_speed")
+        self.keys = np.zeros((num_emulators, 16), dtype=bool)
+        self.frames = np.zeros((num_emulators, self.screen_height, self.screen_width), dtype=np.uint8)
+        self.set_engine(self.config.get("execution_engine"))
+        if seed is not None:
+            self.seed(seed)
+
+    @property
+    def cycles_per_frame(self) -> int:
+        """CPU cycles per 60 Hz frame at the configured clock speed; at least one, as for CHIP8."""
+        return max(self.clock_speed // 60, 1)
+
+    def set_engine(self, engine: str) -> None:
+        self._batch.set_engine(ENGINES[engine])
+
+    def seed(self, seed: int) -> None:
+        """Seed emulator ``i`` with ``seed + i``."""
+        self._batch.seed(seed & 0xFFFFFFFF)
+
+    def __len__(self) -> int:
+        return self.num_emulators
+
+    @property
+    def num_threads(self) -> int:
+        return self._batch.num_threads
+
+    @num_threads.setter
+    def num_threads(self, value: int) -> None:
+        self._batch.num_threads = value
+
+    def load_rom(self, rom_path: str) -> bool:
+        return self._batch.load_rom(rom_path)
+
+    def load_roms(self, rom_paths: Sequence[str]) -> List[bool]:
+        if len(rom_paths) != self.num_emulators:
+            raise ValueError(f"Expected {self.num_emulators} ROM paths, got {len(rom_paths)}")
+        return [self._batch.load_rom(i, path) for i, path in enumerate(rom_paths)]
+
+    def set_keys(self, keys: np.ndarray) -> None:
+        keys = np.asarray(keys, dtype=bool)
+        if keys.shape != self.keys.shape:
+            raise ValueError(f"Keys must have shape {self.keys.shape}")
+        self.keys[...] = keys
+
+    def get_displays(self) -> np.ndarray:
+        return self.frames
+
+    def get_displays_packed(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is None:
+            out = np.empty((self.num_emulators, 256), dtype=np.uint8)
+        self._batch.get_frames_packed(out)
+        return out
+
+    def get_state(self, index: int) -> bytes:
+        return self._batch.machine(index).get_state()
+
+    def set_state(self, index: int, state: bytes) -> None:
+        self._batch.machine(index).set_state(state)
+
+    def get_idle_stats(self) -> dict:
+        """Cycles fast-forwarded by idle detection, summed over all emulators."""
+        totals = {}
+        for i in range(self.num_emulators):
+            for name, count in self._batch.machine(i).get_idle_skipped().items():
+                totals[name] = totals.get(name, 0) + count
+        return totals
+
+    def set_profiling(self, enabled: bool) -> None:
+        for i in range(self.num_emulators):
+            self._batch.machine(i).profiling = enabled
+
+    def get_profile(self, index: Optional[int] = None) -> dict:
+        """Execution profile of emulator ``index``, or summed over all emulators (see CHIP8.get_profile)."""
+        if index is not None:
+            return self._batch.machine(index).get_profile()
+        totals = self._batch.machine(0).get_profile()
+        for i in range(1, self.num_emulators):
+            for name, count in self._batch.machine(i).get_profile().items():
+                totals[name] += count
+        return totals
+
+    def reset_profile(self) -> None:
+        for i in range(self.num_emulators):
+            self._batch.machine(i).reset_profile()
+
+    def run_frame(self, keys: Optional[np.ndarray] = None) -> np.ndarray:
+        return self.run_frames(1, keys)
+
+    def run_frames(self, num_frames: int, keys: Optional[np.ndarray] = None) -> np.ndarray:
+        if keys is not None:
+            self.set_keys(keys)
+        self._batch.step(self.keys, self.frames, self.cycles_per_frame, num_frames)
+        return self.frames
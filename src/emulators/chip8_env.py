@@ -0,0 +1,125 @@
+# File: src/emulators/chip8_env.py
+
+from typing import Callable, Optional
+
+import numpy as np
+from .chip8_wrapper import CHIP8
+
+def key_actions(key_map: Optional[dict] = None) -> np.ndarray:
+    """(1 + 16, 16) keypad masks: action 0 presses nothing, action i + 1 the i-th key of `key_map`.
+
+    Keys follow the key map's keyboard layout order (1 2 3 4 / q w e r / ...), so action
+    numbers line up with the keys a human player would use.
+    """
+    key_map = CHIP8.get_key_map() if key_map is None else key_map
+    actions = np.zeros((len(key_map) + 1, 16), dtype=bool)
+    for action, key in enumerate(key_map.values(), start=1):
+        actions[action, key] = True
+    return actions
+
+class CHIP8Env:
+    """Gym-style environment around one CHIP8.
+
+    Observations are (32, 64) uint8 frames. An action is an index into `actions`, a
+    (num_actions, 16) array of keypad masks (key_actions() by default; pass a smaller
+    set such as key_actions()[[0, 5, 7]] to restrict a game to the keys it uses). Each
+    step holds the action's keys for `frame_skip` frames; with `max_pool` the
+    observation is the pixel-wise max of the last two, which removes the flicker of
+    sprites that are erased and redrawn every frame.
+
+    CHIP-8 games expose no score or game-over signal, so `reward_fn(env)` and
+    `done_fn(env)` may supply them (return 0 / never terminate otherwise), and
+    `max_episode_steps` truncates episodes. Every reset restores the state right after
+    the ROM was loaded and reseeds the emulator's RNG from the env's own generator. With
+    `autoreset`, a finished episode resets inside step(); the last frame of the old
+    episode is returned in info["final_observation"].
+
+    Observations are written into one buffer (`out` if given, e.g. a slice of a
+    vector env's shared memory); with copy=False reset/step return that buffer itself.
+    """
+
+    def __init__(self, rom_path: str, config_path="config.json", frame_skip: int = 4, max_pool: bool = False,
+                 max_episode_steps: Optional[int] = None, actions: Optional[np.ndarray] = None,
+                 reward_fn: Optional[Callable] = None, done_fn: Optional[Callable] = None,
+                 autoreset: bool = False, seed: Optional[int] = None, out: Optional[np.ndarray] = None,
+                 copy: bool = True):
+        if frame_skip < 1:
+            raise ValueError("frame_skip must be at least 1")
+        self.emulator = CHIP8(config_path)
+        if not self.emulator.load_rom(rom_path):
+            raise ValueError(f"Failed to load ROM: {rom_path}")
+        self.rom_path = rom_path
+        self._initial_state = self.emulator.get_state()
+
+        self.actions = key_actions() if actions is None else np.asarray(actions, dtype=bool)
+        self._action_keys = [mask.tolist() for mask in self.actions]
+        self.num_actions = len(self.actions)
+        self.observation_shape = (self.emulator.screen_height, self.emulator.screen_width)
+
+        self.frame_skip = frame_skip
+        self.max_pool = max_pool and frame_skip > 1
+        self.max_episode_steps = max_episode_steps
+        self.reward_fn = reward_fn
+        self.done_fn = done_fn
+        self.autoreset = autoreset
+        self.copy = copy
+        self.observation = np.zeros(self.observation_shape, dtype=np.uint8) if out is None else out
+        self._previous = np.zeros(self.observation_shape, dtype=np.uint8)
+        self.np_random = np.random.default_rng(seed)
+        self.episode_steps = 0
+        self.episode_return = 0.0
+
+    @property
+    def action_space(self):
+        from gymnasium import spaces
+        return spaces.Discrete(self.num_actions)
+
+    @property
+    def observation_space(self):
+        from gymnasium import spaces
+        return spaces.Box(0, 255, self.observation_shape, dtype=np.uint8)
+
+    def _result(self):
+        return self.observation.copy() if self.copy else self.observation
+
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None):
+        if seed is not None:
+            self.np_random = np.random.default_rng(seed)
+        self.emulator.set_state(self._initial_state)
+        # The snapshot holds the RNG state too; reseed so episodes are not replays of each other
+        self.emulator.seed(int(self.np_random.integers(2**32)))
+        self.emulator.set_keys(self._action_keys[0])
+        self.emulator.get_display_into(self.observation)
+        self.episode_steps = 0
+        self.episode_return = 0.0
+        return self._result(), {}
+
+    def step(self, action: int):
+        self.emulator.set_keys(self._action_keys[action])
+        if self.max_pool:
+            self.emulator.advance(self.frame_skip - 1)
+            self.emulator.get_display_into(self._previous)
+            self.emulator.advance(1)
+            self.emulator.get_display_into(self.observation)
+            np.maximum(self.observation, self._previous, out=self.observation)
+        else:
+            self.emulator.advance(self.frame_skip)
+            self.emulator.get_display_into(self.observation)
+
+        self.episode_steps += 1
+        reward = float(self.reward_fn(self)) if self.reward_fn is not None else 0.0
+        self.episode_return += reward
+        terminated = bool(self.done_fn(self)) if self.done_fn is not None else False
+        truncated = self.max_episode_steps is not None and self.episode_steps >= self.max_episode_steps
+        info = {}
+        if self.autoreset and (terminated or truncated):
+            info["final_observation"] = self.observation.copy()
+            info["episode"] = {"return": self.episode_return, "length": self.episode_steps}
+            self.reset()
+        return self._result(), reward, terminated, truncated, info
+
+    def render(self) -> np.ndarray:
+        return self.emulator.get_display()
+
+    def close(self) -> None:
+        pass
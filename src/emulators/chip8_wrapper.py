@@ -1,19 +1,37 @@
 # File: src/emulators/chip8.py
 
 import numpy as np
-from typing import List
+from typing import List, Optional
 from .base_wrapper import BaseEmulator
-from .emulator_module import CHIP8Emulator as _CHIP8Emulator
+from .emulator_module import CHIP8Emulator as _CHIP8Emulator, ExecutionEngine
 import os
 from .config import Config
 
+ENGINES = {
+    "interpreter": ExecutionEngine.INTERPRETER,
+    "cached": ExecutionEngine.CACHED,
+}
+
 class CHIP8(BaseEmulator):
-    def __init__(self,config_path="config.json"):
+    def __init__(self,config_path="config.json", seed: Optional[int] = None):
         self._emulator = _CHIP8Emulator()
         self.screen_width = 64
         self.screen_height = 32
         self.config = Config(config_path)
         self.clock_speed = self.config.get("clock_speed")
+        # Delay/sound timers run at 60 Hz whatever the clock speed, also for single steps
+        self._emulator.timer_period = self.cycles_per_frame
+        self.set_engine(self.config.get("execution_engine"))
+        if seed is not None:
+            self.seed(seed)
+
+    def set_engine(self, engine: str) -> None:
+        """Select the execution engine: 'interpreter' or 'cached' (pre-decoded opcodes)."""
+        self._emulator.engine = ENGINES[engine]
+
+    def seed(self, seed: int) -> None:
+        """Seed this instance's RND generator so runs can be reproduced."""
+        self._emulator.seed(seed & 0xFFFFFFFF)
        
 
     def load_rom(self, rom_path: str) -> bool:
@@ -26,16 +44,49 @@ class CHIP8(BaseEmulator):
         frame = self._emulator.get_frame()
         return frame.reshape((self.screen_height, self.screen_width))
 
+    def get_display_view(self) -> np.ndarray:
+        """Read-only (32, 64) view of the emulator's display that updates in place."""
+        return self._emulator.frame_view()
+
+    def get_display_into(self, out: np.ndarray) -> np.ndarray:
+        self._emulator.get_frame_into(out)
+        return out
+
+    def get_display_packed(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Display packed to 256 bytes, 1 bit per pixel (``np.unpackbits`` order)."""
+        if out is None:
+            return self._emulator.get_frame_packed()
+        self._emulator.get_frame_packed_into(out)
+        return out
+
+    @property
+    def display_generation(self) -> int:
+        """Counter bumped whenever the display may have changed; unchanged means the frame is identical."""
+        return self._emulator.display_generation
+
+    def take_dirty_rows(self) -> int:
+        """Bitmask of display rows (bit r = row r) changed since the previous call, then clears it."""
+        return self._emulator.take_dirty_rows()
+
     def set_keys(self, keys: List[bool]) -> None:
         if len(keys) != 16:
             raise ValueError("Keys must be a list of 16 boolean values")
         self._emulator.set_input(keys)
 
     def get_state(self) -> bytes:
-        return bytes(self._emulator.get_state())
+        return self._emulator.get_state()
+
+    def get_state_into(self, out) -> None:
+        """Write the state into a preallocated writable buffer of ``state_size`` bytes."""
+        self._emulator.get_state_into(out)
 
     def set_state(self, state: bytes) -> None:
-        self._emulator.set_state(list(state))
+        # Any bytes-like object (bytes, bytearray, memoryview, uint8 array) is read in place
+        self._emulator.set_state(state)
+
+    @property
+    def state_size(self) -> int:
+        return _CHIP8Emulator.STATE_SIZE
 
     def save_state(self, filepath):
         state = self.get_state()
@@ -50,11 +101,61 @@ class CHIP8(BaseEmulator):
         self.set_state(state)
         return True
 
+    @property
+    def cycles_per_frame(self) -> int:
+        """CPU cycles per 60 Hz frame (and per timer tick) at the configured clock speed."""
+        return max(self.clock_speed // 60, 1)
+
     def run_frame(self) -> np.ndarray:
-        for _ in range( self.clock_speed // 60):  # Assuming 600Hz CPU clock and 60Hz display refresh
-            self.step()
+        self._emulator.run_frames(1, self.cycles_per_frame)
+        return self.get_display()
+
+    def advance(self, num_frames: int = 1) -> None:
+        """Run frames without copying the display out."""
+        self._emulator.run_frames(num_frames, self.cycles_per_frame)
+
+    def run_frames(self, num_frames: int) -> np.ndarray:
+        self._emulator.run_frames(num_frames, self.cycles_per_frame)
         return self.get_display()
     
+    def enable_rewind(self, depth: int, interval: int = 1) -> None:
+        """Keep the last ``depth`` snapshots, one every ``interval`` frames, in a native ring buffer."""
+        self._emulator.enable_rewind(depth, interval)
+
+    def disable_rewind(self) -> None:
+        self._emulator.disable_rewind()
+
+    def rewind(self, snapshots: int = 1) -> bool:
+        """Restore the snapshot ``snapshots`` entries back (1 = most recent), dropping newer ones."""
+        return self._emulator.rewind(snapshots)
+
+    def rewind_available(self) -> int:
+        return self._emulator.rewind_available()
+
+    def set_idle_skip(self, enabled: bool) -> None:
+        """Toggle fast-forwarding of idle loops (jump-to-self, Fx0A waits, delay-timer polls)."""
+        self._emulator.idle_skip = enabled
+
+    def get_idle_stats(self) -> dict:
+        """Cycles fast-forwarded so far, per idle pattern."""
+        return self._emulator.get_idle_skipped()
+
+    def reset_idle_stats(self) -> None:
+        self._emulator.reset_idle_stats()
+
+    def set_profiling(self, enabled: bool) -> None:
+        """Toggle execution counting; while off, the native loop runs without it."""
+        self._emulator.profiling = enabled
+
+    def get_profile(self) -> dict:
+        """Counts since the last reset: 'opcode_classes' (16,) by opcode high nibble and
+        'pc_hits' (4096,) per address as uint64 arrays, plus 'draws', 'clears' and
+        'key_wait_cycles' (cycles in Fx0A with no key). Idle-skipped cycles are included."""
+        return self._emulator.get_profile()
+
+    def reset_profile(self) -> None:
+        self._emulator.reset_profile()
+
     def debug_display(self) -> str:
         frame = self.get_display()
         return '\n'.join([''.join(['#' if pixel else '.' for pixel in row]) for row in frame])
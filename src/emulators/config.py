@@ -8,7 +8,14 @@ DEFAULT_CONFIG = {
     "display_scale": 10,
     "background_color": [0, 0, 0],
     "foreground_color": [255, 255, 255],
-    "sound_enabled": True
+    "sound_enabled": True,
+    "execution_engine": "interpreter",
+    "inference_backend": "eager",
+    "inference_threads": 0,
+    "inference_interop_threads": 0,
+    "inference_channels_last": False,
+    "inference_max_batch": 64,
+    "inference_max_wait_ms": 2
 }
 
 class Config:
@@ -4,6 +4,84 @@ import numpy as np
 import pygame
 from .config import Config
 
+ALL_ROWS = 0xFFFFFFFF
+
+def make_palette(bg_color, fg_color):
+    """256 colors from background (0) to foreground (255); model outputs in between show as shades."""
+    bg = np.asarray(bg_color, dtype=np.float64)
+    fg = np.asarray(fg_color, dtype=np.float64)
+    ramp = np.linspace(0.0, 1.0, 256)[:, None]
+    return [tuple(color) for color in np.rint(bg + (fg - bg) * ramp).astype(int)]
+
+def dirty_row_runs(dirty_rows, height):
+    """(start, stop) ranges of consecutive rows set in a take_dirty_rows() mask."""
+    runs = []
+    row = 0
+    while row < height:
+        if dirty_rows >> row & 1:
+            start = row
+            while row < height and dirty_rows >> row & 1:
+                row += 1
+            runs.append((start, row))
+        else:
+            row += 1
+    return runs
+
+class FrameRenderer:
+    """Draws (height, width) uint8 frames into one region of a target surface.
+
+    Pixel values index an 8-bit palette (see make_palette), so no RGB frame is built:
+    the frame is blit_array'd into a persistent paletted surface at native size,
+    converted to the target's pixel format there, and scaled straight into a
+    subsurface of the target. Only bands of dirty rows are converted and scaled, and
+    draw() returns the target rects it touched for pygame.display.update.
+    """
+
+    def __init__(self, target, position, width, height, scale, bg_color, fg_color):
+        self.target = target
+        self.x, self.y = position
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.rect = pygame.Rect(self.x, self.y, width * scale, height * scale)
+        self._indexed = pygame.Surface((width, height), 0, 8)
+        self._indexed.set_palette(make_palette(bg_color, fg_color))
+        self._converted = pygame.Surface((width, height), 0, target)
+        # (start, stop) -> (source band, target band); subsurfaces share pixels with their parents
+        self._bands = {}
+        self._overlays = []
+
+    def add_overlay(self, surface, offset=(0, 0)):
+        """Keep `surface` (e.g. a rendered label) drawn on top wherever the frame is redrawn under it."""
+        self._overlays.append((surface, surface.get_rect(topleft=(self.x + offset[0], self.y + offset[1]))))
+
+    def _band(self, start, stop):
+        band = self._bands.get((start, stop))
+        if band is None:
+            source = self._converted.subsurface((0, start, self.width, stop - start))
+            target = self.target.subsurface(
+                (self.x, self.y + start * self.scale, self.rect.width, (stop - start) * self.scale))
+            band = self._bands[(start, stop)] = (source, target)
+        return band
+
+    def draw(self, frame, dirty_rows=None):
+        """Draw the rows of `frame` set in `dirty_rows` (None redraws all); returns the changed rects."""
+        runs = dirty_row_runs(ALL_ROWS if dirty_rows is None else dirty_rows, self.height)
+        if not runs:
+            return []
+
+        pygame.surfarray.blit_array(self._indexed, np.asarray(frame).T)
+        rects = []
+        for start, stop in runs:
+            source, target = self._band(start, stop)
+            self._converted.blit(self._indexed, (0, start), source.get_offset() + source.get_size())
+            pygame.transform.scale(source, target.get_size(), target)
+            rects.append(target.get_rect(topleft=target.get_abs_offset()))
+        for surface, rect in self._overlays:
+            if rect.collidelist(rects) != -1:
+                self.target.blit(surface, rect)
+        return rects
+
 class PygameDisplay:
     def __init__(self, width, height,key_map, config_path="config.json"):
         self.config = Config(config_path)
@@ -17,15 +95,13 @@ class PygameDisplay:
         self.key_map = key_map
         self.bg_color = self.config.get("background_color")
         self.fg_color = self.config.get("foreground_color")
+        self.renderer = FrameRenderer(self.screen, (0, 0), width, height, self.scale, self.bg_color, self.fg_color)
 
-    def update(self, frame):
-        frame_surface = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-        frame_surface[frame == 255] = self.fg_color
-        frame_surface[frame == 0] = self.bg_color
-        surface = pygame.surfarray.make_surface(frame_surface.transpose(1, 0, 2))
-        scaled_surface = pygame.transform.scale(surface, (self.width * self.scale, self.height * self.scale))
-        self.screen.blit(scaled_surface, (0, 0))
-        pygame.display.flip()
+    def update(self, frame, dirty_rows=None):
+        """Draw `frame`; `dirty_rows` is a CHIP8.take_dirty_rows() mask, and 0 skips the redraw."""
+        rects = self.renderer.draw(frame, dirty_rows)
+        if rects:
+            pygame.display.update(rects)
 
     def check_quit(self):
         for event in pygame.event.get():
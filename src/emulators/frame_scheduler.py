@@ -0,0 +1,92 @@
+# File: src/emulators/frame_scheduler.py
+
+import time
+
+POLICIES = ("catch_up", "skip")
+
+class FrameScheduler:
+    """Fixed-timestep pacing shared by the 60 Hz front ends.
+
+    Frame n is due at start + n / fps. Deadlines are absolute, so the time spent
+    emulating and drawing a frame is absorbed by a shorter sleep instead of adding to
+    it, and rounding errors do not accumulate the way repeated sleep(1/60) calls do.
+
+    Each call to wait() blocks until the next frame is due and returns how many
+    emulated frames to run before presenting one. When the loop falls behind:
+
+    - "catch_up" returns 1 without sleeping until the schedule is met again, so
+      every frame is still presented, just back to back.
+    - "skip" returns every frame that is due at once; the caller runs them and
+      presents only the last, keeping emulated time locked to wall time.
+
+    Either way, falling more than `max_lag` frames behind (a stall, a debugger pause)
+    restarts the schedule from now rather than replaying the backlog; those frames
+    are counted in `dropped`.
+
+    With turbo=True nothing sleeps: wait() returns `turbo_frames` immediately, for
+    headless bulk runs as fast as the emulator goes.
+    """
+
+    def __init__(self, fps=60, policy="catch_up", max_lag=5, turbo=False, turbo_frames=1, clock=time.perf_counter,
+                 sleep=time.sleep):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown frame policy {policy!r}; expected one of {POLICIES}")
+        self.fps = fps
+        self.period = 1.0 / fps
+        self.policy = policy
+        self.max_lag = max_lag
+        self.turbo = turbo
+        self.turbo_frames = turbo_frames
+        self.clock = clock
+        self.sleep = sleep
+        self.reset()
+
+    def reset(self):
+        """Restart the schedule; the first wait() returns immediately."""
+        self.start = None
+        self.frame = 0
+        self.presented = 0
+        self.emulated = 0
+        self.dropped = 0
+
+    def wait(self):
+        """Block until the next frame is due; return the number of frames to emulate."""
+        if self.turbo:
+            return self._count(self.turbo_frames)
+        now = self.clock()
+        if self.start is None:
+            self.start = now
+            return self._count(1)
+
+        # Frame k is due at start + k * period; self.frame is the next one
+        deadline = self.start + self.frame * self.period
+        if now < deadline:
+            self.sleep(deadline - now)
+            return self._count(1)
+
+        # Late: every frame whose deadline has passed, this one included
+        behind = int((now - self.start) / self.period) - self.frame + 1
+        if behind > self.max_lag:
+            # Too far behind to be worth replaying; resume the schedule from now
+            self.dropped += behind - 1
+            self.start = now - self.frame * self.period
+            return self._count(1)
+        if self.policy == "skip":
+            return self._count(behind)
+        return self._count(1)
+
+    def _count(self, frames):
+        self.frame += frames
+        self.emulated += frames
+        self.presented += 1
+        return frames
+
+    def get_stats(self):
+        elapsed = self.clock() - self.start if self.start is not None else 0.0
+        return {
+            "presented": self.presented,
+            "emulated": self.emulated,
+            "dropped": self.dropped,
+            "fps": self.presented / elapsed if elapsed else 0.0,
+            "emulated_fps": self.emulated / elapsed if elapsed else 0.0,
+        }
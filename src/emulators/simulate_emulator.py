@@ -2,15 +2,19 @@
 
 import torch
 import numpy as np
-from models.simple_models import SimpleCNN
+from models.optimize import load_inference_model, set_threads
+from .config import Config
 
 class EmulatorSimulator:
     def __init__(self, model_path, config_path="config.json"):
+        self.config = Config(config_path)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = SimpleCNN(input_channels=1, output_channels=1)
-        self.model.load(model_path)
-        self.model.to(self.device)
-        self.model.eval()
+        # Either a SimpleCNN state dict or an artifact written by models/optimize.py
+        backend = self.config.get("inference_backend")
+        if backend == "int8":
+            self.device = torch.device("cpu")
+        set_threads(self.config.get("inference_threads"), self.config.get("inference_interop_threads"))
+        self.model = load_inference_model(model_path, backend, self.device, self.config.get("inference_channels_last"))
 
         self.current_frame = None
         self.display = None
@@ -40,6 +44,47 @@ class EmulatorSimulator:
         
         self.current_frame = predicted_frame.cpu().numpy()
 
+    def predict(self, frames):
+        """Predict the next frame for a batch of (N, 32, 64) uint8 frames in one forward pass."""
+        frames = np.asarray(frames, dtype=np.uint8)
+        with torch.no_grad():
+            input_tensor = torch.from_numpy(frames).to(self.device).float().div_(255.0).unsqueeze(1)
+            predicted = self.model(input_tensor)
+        return predicted.squeeze(1).clamp_(0, 1).mul_(255).to(torch.uint8).cpu().numpy()
+
+    def rollout(self, n_steps, keys_sequence=None, out=None):
+        """Run the model autoregressively for `n_steps` frames without leaving the device.
+
+        The state stays a tensor on the model's device and each prediction is clamped and
+        quantized straight into one (n_steps, 32, 64) uint8 buffer, which on CPU is `out`
+        itself; there is no per-step NumPy conversion. `keys_sequence` gives the keypad
+        state for each step (SimpleCNN does not condition on keys yet). The rollout
+        continues from, and leaves, the current frame. Returns the uint8 buffer.
+        """
+        if keys_sequence is not None and len(keys_sequence) != n_steps:
+            raise ValueError(f"Expected {n_steps} key states, got {len(keys_sequence)}")
+        shape = (n_steps, self.screen_height, self.screen_width)
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape != shape or out.dtype != np.uint8:
+            raise ValueError(f"Output buffer must be a uint8 array of shape {shape}")
+
+        host_frames = torch.from_numpy(out)
+        frames = host_frames if self.device.type == "cpu" else torch.empty(shape, dtype=torch.uint8, device=self.device)
+        with torch.inference_mode():
+            state = torch.from_numpy(self.current_frame).to(self.device, torch.float32)
+            scratch = torch.empty(shape[1:], dtype=torch.float32, device=self.device)
+            for step in range(n_steps):
+                if keys_sequence is not None:
+                    self.keys = keys_sequence[step]
+                state = self.model(state)
+                torch.clamp(state[0, 0], 0, 1, out=scratch)
+                frames[step].copy_(scratch.mul_(255))
+            if frames is not host_frames:
+                host_frames.copy_(frames)
+            self.current_frame = state.cpu().numpy()
+        return out
+
     def get_frame(self):
         return (self.current_frame.squeeze() * 255).astype(np.uint8)
 
@@ -0,0 +1,271 @@
+# File: src/emulators/vector_env.py
+
+import multiprocessing as mp
+import traceback
+from typing import Optional, Sequence, Union
+
+import numpy as np
+from .chip8_env import CHIP8Env
+
+# name -> (dtype, per-env shape) of the arrays a vector env steps into
+BUFFERS = {
+    "observations": (np.uint8, (32, 64)),
+    "final_observations": (np.uint8, (32, 64)),
+    "actions": (np.int64, ()),
+    "rewards": (np.float64, ()),
+    "terminated": (np.bool_, ()),
+    "truncated": (np.bool_, ()),
+    "episode_returns": (np.float64, ()),
+    "episode_lengths": (np.int64, ()),
+    "seeds": (np.int64, ()),
+}
+
+def _views(raw_buffers, num_envs):
+    """Numpy views over raw buffers (anything exposing the buffer protocol), keyed as in BUFFERS."""
+    return {name: np.frombuffer(raw_buffers[name], dtype=dtype).reshape((num_envs,) + shape)
+            for name, (dtype, shape) in BUFFERS.items()}
+
+def _env_kwargs(env_kwargs, rom_paths, index):
+    kwargs = dict(env_kwargs)
+    kwargs["rom_path"] = rom_paths[index]
+    if kwargs.get("seed") is not None:
+        kwargs["seed"] = kwargs["seed"] + index
+    return kwargs
+
+def _make_envs(env_kwargs, rom_paths, indices, buffers):
+    return [CHIP8Env(**_env_kwargs(env_kwargs, rom_paths, i), autoreset=False, copy=False,
+                     out=buffers["observations"][i]) for i in indices]
+
+def _reset_slice(envs, indices, buffers):
+    for env, i in zip(envs, indices):
+        seed = int(buffers["seeds"][i])
+        env.reset(seed=seed if seed >= 0 else None)
+
+def _step_slice(envs, indices, buffers):
+    """Step `envs` (the envs at `indices`) with the actions in `buffers`, resetting finished ones."""
+    actions = buffers["actions"]
+    rewards = buffers["rewards"]
+    terminated = buffers["terminated"]
+    truncated = buffers["truncated"]
+    for env, i in zip(envs, indices):
+        _, rewards[i], terminated[i], truncated[i], _ = env.step(actions[i])
+        if terminated[i] or truncated[i]:
+            buffers["final_observations"][i] = env.observation
+            buffers["episode_returns"][i] = env.episode_return
+            buffers["episode_lengths"][i] = env.episode_steps
+            env.reset()
+
+def _worker(pipe, parent_pipe, env_kwargs, rom_paths, indices, raw_buffers, num_envs):
+    """Subprocess loop: owns the envs at `indices` and steps them on b"step" commands."""
+    parent_pipe.close()
+    buffers = _views(raw_buffers, num_envs)
+    try:
+        envs = _make_envs(env_kwargs, rom_paths, indices, buffers)
+        pipe.send_bytes(b"ready")
+        while True:
+            command = pipe.recv_bytes()
+            if command == b"step":
+                _step_slice(envs, indices, buffers)
+            elif command == b"reset":
+                _reset_slice(envs, indices, buffers)
+            elif command == b"close":
+                break
+            pipe.send_bytes(b"ok")
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        pipe.send_bytes(b"error:" + traceback.format_exc().encode())
+    finally:
+        pipe.close()
+
+class VectorEnv:
+    """Steps `num_envs` CHIP8Envs together.
+
+    reset() returns (observations, infos) and step(actions) returns (observations,
+    rewards, terminated, truncated, infos) with a leading num_envs axis on each array.
+    Finished episodes reset automatically: the observation returned for them is the
+    first of the next episode, infos["final_observation"][i] holds the last frame of
+    the old one (valid where infos["_final_observation"][i]), and
+    infos["episode_return"] / infos["episode_length"] its totals.
+
+    step() is step_async(actions) followed by step_wait(); calling the two separately
+    lets the caller work (e.g. run the policy on the previous batch) while the envs
+    advance. Results live in buffers that the next step overwrites; with copy=False
+    they are returned as views of those buffers instead of copies.
+
+    Environment options (frame_skip, max_pool, max_episode_steps, actions, reward_fn,
+    done_fn, config_path) are passed through to every CHIP8Env. `rom_path` is one path
+    or one per env, and env i is seeded with seed + i.
+    """
+
+    def __init__(self, rom_path: Union[str, Sequence[str]], num_envs: int, seed: Optional[int] = None,
+                 copy: bool = True, **env_kwargs):
+        self.num_envs = num_envs
+        self.rom_paths = [rom_path] * num_envs if isinstance(rom_path, str) else list(rom_path)
+        if len(self.rom_paths) != num_envs:
+            raise ValueError(f"Expected {num_envs} ROM paths, got {len(self.rom_paths)}")
+        self.env_kwargs = dict(env_kwargs, seed=seed)
+        self.copy = copy
+        self._waiting = False
+
+    def _allocate(self, allocator):
+        self._raw_buffers = {name: allocator(dtype, self.num_envs * int(np.prod(shape, dtype=np.int64)))
+                             for name, (dtype, shape) in BUFFERS.items()}
+        self.buffers = _views(self._raw_buffers, self.num_envs)
+
+    def _out(self, array):
+        return array.copy() if self.copy else array
+
+    def reset(self, seed: Optional[Union[int, Sequence[int]]] = None, options: Optional[dict] = None):
+        """Reset every env; `seed` reseeds them (an int seeds env i with seed + i)."""
+        if self._waiting:
+            self.step_wait()
+        seeds = self.buffers["seeds"]
+        if seed is None:
+            seeds[:] = -1
+        elif np.isscalar(seed):
+            seeds[:] = seed + np.arange(self.num_envs)
+        else:
+            seeds[:] = seed
+        self._reset()
+        return self._out(self.buffers["observations"]), {}
+
+    def step_async(self, actions) -> None:
+        if self._waiting:
+            raise RuntimeError("step_async called while a step is still in flight; call step_wait first")
+        self.buffers["actions"][:] = actions
+        self._waiting = True
+        self._step_async()
+
+    def step_wait(self):
+        if not self._waiting:
+            raise RuntimeError("step_wait called without a pending step_async")
+        self._step_wait()
+        self._waiting = False
+        buffers = self.buffers
+        done = buffers["terminated"] | buffers["truncated"]
+        infos = {}
+        if done.any():
+            infos = {
+                "final_observation": self._out(buffers["final_observations"]),
+                "_final_observation": done,
+                "episode_return": np.where(done, buffers["episode_returns"], 0.0),
+                "episode_length": np.where(done, buffers["episode_lengths"], 0),
+            }
+        return (self._out(buffers["observations"]), self._out(buffers["rewards"]),
+                self._out(buffers["terminated"]), self._out(buffers["truncated"]), infos)
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class SyncVectorEnv(VectorEnv):
+    """VectorEnv that steps every env in the calling process; for debugging and small runs."""
+
+    def __init__(self, rom_path, num_envs: int, seed: Optional[int] = None, copy: bool = True, **env_kwargs):
+        super().__init__(rom_path, num_envs, seed, copy, **env_kwargs)
+        self._allocate(lambda dtype, size: np.zeros(size, dtype=dtype))
+        self._indices = range(num_envs)
+        self.envs = _make_envs(self.env_kwargs, self.rom_paths, self._indices, self.buffers)
+
+    def _reset(self):
+        _reset_slice(self.envs, self._indices, self.buffers)
+
+    def _step_async(self):
+        pass
+
+    def _step_wait(self):
+        _step_slice(self.envs, self._indices, self.buffers)
+
+    def close(self) -> None:
+        for env in self.envs:
+            env.close()
+
+class SubprocVectorEnv(VectorEnv):
+    """VectorEnv whose envs are split into contiguous slices, one per worker process.
+
+    Observations, actions, rewards and flags live in shared memory allocated by the
+    parent: workers step their slice in place and the parent reads the results
+    directly, so a step sends only a few command bytes per worker and nothing is
+    pickled. Env options (reward_fn, done_fn, ...) are pickled once, at start-up, so
+    they must be module-level functions.
+    """
+
+    def __init__(self, rom_path, num_envs: int, num_workers: Optional[int] = None, seed: Optional[int] = None,
+                 copy: bool = True, start_method: Optional[str] = None, **env_kwargs):
+        super().__init__(rom_path, num_envs, seed, copy, **env_kwargs)
+        self.num_workers = max(1, min(num_workers or mp.cpu_count(), num_envs))
+        context = mp.get_context(start_method)
+        self._allocate(lambda dtype, size: context.RawArray("b", size * np.dtype(dtype).itemsize))
+
+        self._pipes = []
+        self._processes = []
+        self.closed = False
+        for indices in np.array_split(np.arange(num_envs), self.num_workers):
+            parent_pipe, child_pipe = context.Pipe()
+            process = context.Process(
+                target=_worker, daemon=True,
+                args=(child_pipe, parent_pipe, self.env_kwargs, self.rom_paths, indices.tolist(),
+                      self._raw_buffers, num_envs))
+            process.start()
+            child_pipe.close()
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+        self._receive()
+
+    def _send(self, command: bytes) -> None:
+        for pipe in self._pipes:
+            pipe.send_bytes(command)
+
+    def _receive(self) -> None:
+        errors = []
+        for pipe in self._pipes:
+            try:
+                reply = pipe.recv_bytes()
+            except EOFError:
+                reply = b"error:worker exited unexpectedly"
+            if reply.startswith(b"error:"):
+                errors.append(reply[len(b"error:"):].decode())
+        if errors:
+            self.close()
+            raise RuntimeError("CHIP8Env worker failed:\n" + "\n".join(errors))
+
+    def _reset(self):
+        self._send(b"reset")
+        self._receive()
+
+    def _step_async(self):
+        self._send(b"step")
+
+    def _step_wait(self):
+        self._receive()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        for pipe in self._pipes:
+            try:
+                pipe.send_bytes(b"close")
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        for pipe in self._pipes:
+            pipe.close()
+
+def make_vector_env(rom_path, num_envs: int, asynchronous: bool = True, **kwargs) -> VectorEnv:
+    """SubprocVectorEnv (one worker per core by default) or, with asynchronous=False, SyncVectorEnv."""
+    if asynchronous:
+        return SubprocVectorEnv(rom_path, num_envs, **kwargs)
+    kwargs.pop("num_workers", None)
+    kwargs.pop("start_method", None)
+    return SyncVectorEnv(rom_path, num_envs, **kwargs)
@@ -0,0 +1,264 @@
+# src/experiment_tracking/StreamingLogger.py
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+def _encode(record):
+    # Metrics are often numpy/torch scalars; anything else unknown is stored as its repr
+    return json.dumps(record, separators=(",", ":"),
+                      default=lambda value: value.item() if hasattr(value, "item") else repr(value))
+
+class StreamingLogger:
+    """Logger-compatible experiment log written as append-only JSON lines.
+
+    Records are buffered and appended as one chunk every `flush_every` records or
+    `flush_interval` seconds (from a background thread, so a quiet run still gets
+    flushed), and on save()/close(). Memory use is bounded by the buffer, a crash
+    loses at most one unflushed chunk, and nothing already written is rewritten.
+
+    Each flushed chunk also appends one line to `<log>.idx` with its byte range,
+    the metric names it contains and its step range, so MetricReader can seek
+    straight to the chunks a query needs.
+    """
+
+    def __init__(self, log_dir, experiment_id=None, flush_every=256, flush_interval=5.0, fsync=True):
+        self.log_dir = log_dir
+        os.makedirs(log_dir, exist_ok=True)
+        self.experiment_id = experiment_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.log_file = os.path.join(log_dir, f"experiment_{self.experiment_id}.jsonl")
+        self.index_file = self.log_file + ".idx"
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.data = None
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = open(self.log_file, "ab")
+        if self._file.tell() and not self._ends_with_newline():
+            # A crash left half a line behind; terminate it so it does not swallow the next record
+            self._file.write(b"\n")
+        self._index = open(self.index_file, "a")
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _ends_with_newline(self):
+        with open(self.log_file, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def log_metric(self, name, value, step):
+        self._append({"name": name, "step": step, "value": value, "time": time.time()})
+
+    def log_parameter(self, name, value):
+        self._append({"parameter": name, "value": value})
+
+    def log_artifact(self, name, file_path):
+        self._append({"artifact": name, "path": file_path})
+
+    def _append(self, record):
+        with self._lock:
+            if self._file.closed:
+                raise ValueError(f"Experiment log {self.log_file} is closed")
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.flush_every
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            if not records or self._file.closed:
+                return
+            chunk = "".join(_encode(record) + "\n" for record in records).encode()
+            offset = self._file.tell()
+            self._file.write(chunk)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+            # The index is written after the data it points at, so it never references bytes
+            # that are not on disk; readers scan anything past the last indexed chunk directly
+            steps = [record["step"] for record in records if "name" in record]
+            entry = {
+                "offset": offset,
+                "length": len(chunk),
+                "names": sorted({record["name"] for record in records if "name" in record}),
+                "min_step": min(steps) if steps else None,
+                "max_step": max(steps) if steps else None,
+                "other": len(steps) < len(records),
+            }
+            self._index.write(_encode(entry) + "\n")
+            self._index.flush()
+
+    def save(self):
+        self.flush()
+
+    def close(self):
+        """Flush, mark the log finished (ends MetricReader.tail) and release the files."""
+        if self._closed.is_set():
+            return
+        self._append({"closed": time.time()})
+        self._closed.set()
+        self.flush()
+        with self._lock:
+            self._file.close()
+            self._index.close()
+        atexit.unregister(self.close)
+
+    def load(self, experiment_id):
+        """Read a whole experiment back into the `data` layout used by Logger."""
+        reader = MetricReader.for_experiment(self.log_dir, experiment_id)
+        self.data = {
+            "metrics": [{key: record[key] for key in ("name", "value", "step")} for record in reader.read()],
+            "parameters": reader.parameters(),
+            "artifacts": reader.artifacts(),
+        }
+        return self.data
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+class MetricReader:
+    """Query and follow a StreamingLogger log without loading all of it."""
+
+    def __init__(self, log_file):
+        self.log_file = log_file
+        self.index_file = log_file + ".idx"
+
+    @classmethod
+    def for_experiment(cls, log_dir, experiment_id):
+        return cls(os.path.join(log_dir, f"experiment_{experiment_id}.jsonl"))
+
+    @staticmethod
+    def list_experiments(log_dir):
+        """Ids of the StreamingLogger logs in `log_dir`."""
+        if not os.path.isdir(log_dir):
+            return []
+        return sorted(name[len("experiment_"):-len(".jsonl")] for name in os.listdir(log_dir)
+                      if name.startswith("experiment_") and name.endswith(".jsonl"))
+
+    def _chunks(self):
+        """Index entries whose bytes are fully on disk, plus the offset where indexing stops."""
+        size = os.path.getsize(self.log_file)
+        chunks = []
+        end = 0
+        if os.path.exists(self.index_file):
+            with open(self.index_file) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn final line from an interrupted write
+                        break
+                    if entry["offset"] + entry["length"] > size:
+                        break
+                    chunks.append(entry)
+                    end = entry["offset"] + entry["length"]
+        return chunks, end
+
+    @staticmethod
+    def _parse(data, names=None):
+        keys = None if names is None else [b'"name":' + json.dumps(name).encode() for name in names]
+        for line in data.splitlines():
+            # Cheap byte test first: most lines of a mixed chunk are skipped without json.loads
+            if keys is not None and not any(key in line for key in keys):
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+    def _scan(self, wanted, names=None):
+        """Parsed records from chunks for which `wanted(entry)` is true, and the unindexed tail."""
+        chunks, end = self._chunks()
+        with open(self.log_file, "rb") as f:
+            for entry in chunks:
+                if wanted(entry):
+                    f.seek(entry["offset"])
+                    yield from self._parse(f.read(entry["length"]), names)
+            f.seek(end)
+            tail = f.read()
+        # Only complete lines; a partially written last line is ignored
+        yield from self._parse(tail[:tail.rfind(b"\n") + 1], names)
+
+    def read(self, names=None, start=None, stop=None):
+        """Metric records, optionally limited to `names` and start <= step < stop."""
+        if isinstance(names, str):
+            names = [names]
+        wanted_names = None if names is None else set(names)
+
+        def wanted(entry):
+            if wanted_names is not None and wanted_names.isdisjoint(entry["names"]):
+                return False
+            if entry["min_step"] is None:
+                return False
+            if start is not None and entry["max_step"] < start:
+                return False
+            return stop is None or entry["min_step"] < stop
+
+        for record in self._scan(wanted, names):
+            if "name" not in record or (wanted_names is not None and record["name"] not in wanted_names):
+                continue
+            if (start is None or record["step"] >= start) and (stop is None or record["step"] < stop):
+                yield record
+
+    def series(self, name, start=None, stop=None):
+        """(steps, values) lists for one metric."""
+        records = list(self.read([name], start, stop))
+        return [record["step"] for record in records], [record["value"] for record in records]
+
+    def parameters(self):
+        return {record["parameter"]: record["value"]
+                for record in self._scan(lambda entry: entry["other"]) if "parameter" in record}
+
+    def artifacts(self):
+        return [{"name": record["artifact"], "path": record["path"]}
+                for record in self._scan(lambda entry: entry["other"]) if "artifact" in record]
+
+    def tail(self, names=None, from_start=True, poll_interval=0.5, stop_event=None, idle_timeout=None):
+        """Yield metric records as they are flushed, until the log is closed or `stop_event` is set.
+
+        With `idle_timeout`, also stop once the log has not grown for that many seconds
+        (including while waiting for it to be created), so an abandoned run cannot keep
+        a follower polling forever.
+        """
+        if isinstance(names, str):
+            names = [names]
+        last_growth = time.monotonic()
+
+        def idle():
+            if idle_timeout is not None and time.monotonic() - last_growth >= idle_timeout:
+                return True
+            if stop_event is not None:
+                return stop_event.wait(poll_interval)
+            time.sleep(poll_interval)
+            return False
+
+        while not os.path.exists(self.log_file):
+            if idle():
+                return
+        with open(self.log_file, "rb") as f:
+            if not from_start:
+                f.seek(0, os.SEEK_END)
+            pending = b""
+            while True:
+                data = f.read()
+                if data:
+                    last_growth = time.monotonic()
+                    pending += data
+                    complete = pending.rfind(b"\n") + 1
+                    lines, pending = pending[:complete], pending[complete:]
+                    for record in self._parse(lines):
+                        if "closed" in record:
+                            return
+                        if "name" in record and (names is None or record["name"] in names):
+                            yield record
+                    continue
+                if idle():
+                    return
@@ -7,48 +7,43 @@ import pygame
 import numpy as np
 from emulators import CHIP8
 from emulators.simulate_emulator import EmulatorSimulator
-import time
+from emulators.frame_scheduler import FrameScheduler
+from emulators.display_utils import FrameRenderer
 from emulators.config import Config
 
 class SideBySideDisplay:
-    def __init__(self, width, height, scale=10,config_path="config.json"):
+    """Frames shown next to each other in one window, one FrameRenderer per pane."""
+
+    def __init__(self, width, height, scale=10,config_path="config.json", labels=("CHIP-8", "AI Simulation")):
         self.config = Config(config_path)
         self.width = width
         self.height = height
         self.scale = scale
         pygame.init()
-        self.screen = pygame.display.set_mode((width * 2 * scale, height * scale))
+        self.screen = pygame.display.set_mode((width * len(labels) * scale, height * scale))
         pygame.display.set_caption("CHIP-8 vs AI Simulation")
         self.font = pygame.font.Font(None, 24)
         self.bg_color = self.config.get("background_color")
         self.fg_color = self.config.get("foreground_color")
-
-    def update(self, chip8_frame, ai_frame):
-        self.screen.fill((0, 0, 0))
-
-        # Display CHIP-8 frame
-        frame_surface = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-        frame_surface[chip8_frame == 255] = self.fg_color
-        frame_surface[chip8_frame == 0] = self.bg_color
-        surface = pygame.surfarray.make_surface(frame_surface.transpose(1, 0, 2))
-        scaled_surface = pygame.transform.scale(surface, (self.width * self.scale, self.height * self.scale))
-        self.screen.blit(scaled_surface, (0, 0))
-
-        # Display AI frame
-        ai_frame_surface = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-        ai_frame_surface[ai_frame == 255] = self.fg_color
-        ai_frame_surface[ai_frame == 0] = self.bg_color
-        ai_surface = pygame.surfarray.make_surface(ai_frame_surface.transpose(1, 0, 2))
-        ai_scaled_surface = pygame.transform.scale(ai_surface, (self.width * self.scale, self.height * self.scale))
-        self.screen.blit(ai_scaled_surface, (self.width * self.scale, 0))
-
-        # Add labels
-        chip8_label = self.font.render("CHIP-8", True, (255, 255, 255))
-        ai_label = self.font.render("AI Simulation", True, (255, 255, 255))
-        self.screen.blit(chip8_label, (10, 10))
-        self.screen.blit(ai_label, (self.width * self.scale + 10, 10))
-
-        pygame.display.flip()
+        self.panes = []
+        for index, label in enumerate(labels):
+            pane = FrameRenderer(self.screen, (index * width * scale, 0), width, height, scale,
+                                 self.bg_color, self.fg_color)
+            pane.add_overlay(self.font.render(label, True, (255, 255, 255)), (10, 10))
+            self.panes.append(pane)
+
+    def update_panes(self, frames, dirty_masks=None):
+        """Redraw each pane's dirty rows; a mask of 0 skips the pane and None redraws it fully."""
+        if dirty_masks is None:
+            dirty_masks = [None] * len(frames)
+        updated = []
+        for pane, frame, dirty_rows in zip(self.panes, frames, dirty_masks):
+            updated.extend(pane.draw(frame, dirty_rows))
+        if updated:
+            pygame.display.update(updated)
+
+    def update(self, chip8_frame, ai_frame, chip8_dirty=None, ai_dirty=None):
+        self.update_panes((chip8_frame, ai_frame), (chip8_dirty, ai_dirty))
 
     def handle_input(self):
         for event in pygame.event.get():
@@ -75,6 +70,8 @@ def run_comparison(rom_path, model_path, config_path, sync_interval):
     ai_simulator = EmulatorSimulator(model_path, config_path)
 
     display = SideBySideDisplay(chip8.screen_width, chip8.screen_height)
+    # Both sides must see the same frames to stay comparable, so late frames are caught up, not skipped
+    scheduler = FrameScheduler(60, policy="catch_up")
 
     frame_count = 0
     quit = False
@@ -82,6 +79,7 @@ def run_comparison(rom_path, model_path, config_path, sync_interval):
         # Handle input
         quit = display.handle_input()
         keys = display.get_keys()
+        scheduler.wait()
 
         # Update CHIP-8 emulator
         chip8.set_keys(keys)
@@ -96,11 +94,10 @@ def run_comparison(rom_path, model_path, config_path, sync_interval):
         if sync_interval > 0 and frame_count % sync_interval == 0:
             ai_simulator.set_frame(chip8_frame)
 
-        # Display frames
-        display.update(chip8_frame, ai_frame)
+        # Display frames; the CHIP-8 pane is only redrawn when something was drawn on it
+        display.update(chip8_frame, ai_frame, chip8.take_dirty_rows())
 
         frame_count += 1
-        time.sleep(1/60)  # Cap at 60 FPS
 
     display.close()
 
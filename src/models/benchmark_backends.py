@@ -0,0 +1,81 @@
+# src/models/benchmark_backends.py
+
+import argparse
+import copy
+import json
+import time
+
+import numpy as np
+import torch
+from models.optimize import BACKENDS, example_input, optimize_model, set_threads, synthetic_frames
+from models.simple_models import SimpleCNN
+
+def benchmark_model(model, batch_sizes=(1, 8, 64), warmup=10, iterations=100):
+    """Median/p95 latency per forward pass and frames/sec for each batch size."""
+    results = []
+    with torch.inference_mode():
+        for batch_size in batch_sizes:
+            inputs = example_input(batch_size)
+            inputs[:, :, ::3, ::5] = 1.0
+            for _ in range(warmup):
+                model(inputs)
+            timings = np.empty(iterations)
+            for i in range(iterations):
+                start = time.perf_counter()
+                model(inputs)
+                timings[i] = time.perf_counter() - start
+            results.append({
+                "batch_size": batch_size,
+                "latency_ms_p50": float(np.median(timings) * 1e3),
+                "latency_ms_p95": float(np.percentile(timings, 95) * 1e3),
+                "frames_per_sec": float(batch_size / np.median(timings)),
+            })
+    return results
+
+def benchmark_backends(model, backends=BACKENDS, batch_sizes=(1, 8, 64), channels_last=False,
+                       warmup=10, iterations=100, calibration_frames=None):
+    """Timings per backend; int8 calibrates on `calibration_frames`, or seeded synthetic frames."""
+    if calibration_frames is None:
+        calibration_frames = synthetic_frames()
+    report = {}
+    for backend in backends:
+        start = time.perf_counter()
+        optimized = optimize_model(copy.deepcopy(model), backend, channels_last, calibration_frames)
+        prepare_seconds = time.perf_counter() - start
+        report[backend] = {
+            "prepare_seconds": prepare_seconds,
+            "results": benchmark_model(optimized, batch_sizes, warmup, iterations),
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SimpleCNN CPU inference backends")
+    parser.add_argument("--model_path", type=str, default=None, help="SimpleCNN state dict (random weights if omitted)")
+    parser.add_argument("--backends", type=str, nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0 = PyTorch default)")
+    parser.add_argument("--channels_last", action="store_true")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--json", type=str, default=None, help="Also write the report to this file")
+    args = parser.parse_args()
+
+    set_threads(args.threads)
+    model = SimpleCNN(input_channels=1, output_channels=1)
+    if args.model_path:
+        model.load_state_dict(torch.load(args.model_path, map_location="cpu"))
+
+    report = benchmark_backends(model, args.backends, args.batch_sizes, args.channels_last,
+                                args.warmup, args.iterations)
+    print(f"{'backend':<12} {'batch':>5} {'p50 ms':>9} {'p95 ms':>9} {'frames/s':>11}")
+    for backend, entry in report.items():
+        for result in entry["results"]:
+            print(f"{backend:<12} {result['batch_size']:>5} {result['latency_ms_p50']:>9.3f} "
+                  f"{result['latency_ms_p95']:>9.3f} {result['frames_per_sec']:>11.0f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"threads": torch.get_num_threads(), "channels_last": args.channels_last,
+                       "backends": report}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
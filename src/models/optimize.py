@@ -0,0 +1,133 @@
+# src/models/optimize.py
+
+import argparse
+
+import numpy as np
+import torch
+from models.simple_models import SimpleCNN
+
+# eager:       the fp32 module as trained
+# torchscript: traced, frozen and optimized for inference; saved as a TorchScript archive
+# compile:     torch.compile at load time (cannot be saved ahead of time)
+# int8:        static post-training quantization of the convolutions, calibrated on real
+#              frames and saved as a TorchScript archive. Dynamic quantization only covers
+#              Linear/RNN layers, so it would leave SimpleCNN untouched.
+BACKENDS = ("eager", "torchscript", "compile", "int8")
+FRAME_SHAPE = (32, 64)
+
+def set_threads(num_threads=0, interop_threads=0):
+    """Pin PyTorch's CPU thread pools; 0 keeps the PyTorch default."""
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            # Can only be set before the first parallel work in the process
+            pass
+
+def example_input(batch_size=1):
+    return torch.zeros((batch_size, 1) + FRAME_SHAPE, dtype=torch.float32)
+
+def synthetic_frames(num_frames=256, seed=0):
+    """Seeded sparse random bitmaps; only fit for timing int8 models, not for calibrating real ones."""
+    rng = np.random.default_rng(seed)
+    return (rng.random((num_frames,) + FRAME_SHAPE) < 0.1).astype(np.uint8) * 255
+
+def calibration_batches(frames, batch_size=32):
+    """Float batches for int8 calibration from (N, 32, 64) uint8 frames."""
+    frames = torch.from_numpy(np.asarray(frames, dtype=np.uint8)).float().div_(255.0).unsqueeze(1)
+    return list(torch.split(frames, batch_size))
+
+def quantize_int8(model, calibration_frames):
+    """Statically quantize `model`, calibrating activation ranges on `calibration_frames`."""
+    if calibration_frames is None or len(calibration_frames) == 0:
+        raise ValueError("int8 quantization needs calibration frames (e.g. captured frames from a FrameStore)")
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    engine = "x86" if "x86" in torch.backends.quantized.supported_engines else "fbgemm"
+    torch.backends.quantized.engine = engine
+    prepared = prepare_fx(model.eval(), get_default_qconfig_mapping(engine), example_inputs=(example_input(),))
+    with torch.no_grad():
+        for batch in calibration_batches(calibration_frames):
+            prepared(batch)
+    return convert_fx(prepared)
+
+def optimize_model(model, backend="eager", channels_last=False, calibration_frames=None):
+    """Return an inference-ready version of `model` for `backend` (see BACKENDS)."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend {backend!r}; expected one of {BACKENDS}")
+    model = model.eval()
+    if channels_last:
+        model = model.to(memory_format=torch.channels_last)
+    if backend == "eager":
+        return model
+    if backend == "compile":
+        return torch.compile(model)
+    if backend == "int8":
+        model = quantize_int8(model, calibration_frames)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example_input())
+        return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+
+def export_model(model_path, output_path, backend="torchscript", channels_last=False, calibration_frames=None):
+    """Write a TorchScript artifact that EmulatorSimulator can load without the model class."""
+    if backend not in ("torchscript", "int8"):
+        raise ValueError(f"Backend {backend!r} has no ahead-of-time artifact; use 'torchscript' or 'int8'")
+    model = SimpleCNN(input_channels=1, output_channels=1)
+    model.load(model_path)
+    optimized = optimize_model(model, backend, channels_last, calibration_frames)
+    torch.jit.save(optimized, output_path)
+    return output_path
+
+def load_inference_model(model_path, backend="eager", device="cpu", channels_last=False, calibration_frames=None):
+    """Load a TorchScript artifact as-is, or a SimpleCNN state dict optimized for `backend`.
+
+    A state dict is only quantized for the int8 backend when `calibration_frames` are
+    given; otherwise load an artifact exported with `--backend int8`, so every load runs
+    the same quantized model.
+    """
+    try:
+        model = torch.jit.load(model_path, map_location=device)
+    except RuntimeError:
+        model = None
+    if model is not None:
+        return model.eval()
+
+    model = SimpleCNN(input_channels=1, output_channels=1)
+    model.load_state_dict(torch.load(model_path, map_location=device))
+    model.to(device)
+    if backend == "int8" and torch.device(device).type != "cpu":
+        raise ValueError("The int8 backend only runs on CPU")
+    if backend == "int8" and calibration_frames is None:
+        raise ValueError(f"{model_path} is a state dict; export an int8 artifact with "
+                         "`python -m models.optimize --backend int8 --calibration_store ...` "
+                         "or pass calibration_frames")
+    return optimize_model(model, backend, channels_last, calibration_frames)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export an optimized SimpleCNN inference artifact")
+    parser.add_argument("--model_path", type=str, required=True, help="Trained SimpleCNN state dict")
+    parser.add_argument("--output", type=str, required=True, help="Path for the TorchScript artifact")
+    parser.add_argument("--backend", type=str, default="torchscript", choices=["torchscript", "int8"])
+    parser.add_argument("--channels_last", action="store_true", help="Use channels_last weights")
+    parser.add_argument("--calibration_store", type=str, default=None,
+                        help="FrameStore directory with frames for int8 calibration")
+    parser.add_argument("--calibration_frames", type=int, default=512, help="Frames to calibrate on")
+    args = parser.parse_args()
+    if args.backend == "int8" and not args.calibration_store:
+        parser.error("--backend int8 needs --calibration_store to calibrate on")
+
+    calibration_frames = None
+    if args.calibration_store:
+        from data.frame_store import FrameStore
+        store = FrameStore(args.calibration_store)
+        count = min(args.calibration_frames, len(store))
+        calibration_frames = np.stack([store.get_frame(i) for i in range(count)])
+
+    export_model(args.model_path, args.output, args.backend, args.channels_last, calibration_frames)
+    print(f"Wrote {args.backend} artifact to {args.output}")
+
+if __name__ == "__main__":
+    main()
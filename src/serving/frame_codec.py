@@ -0,0 +1,180 @@
+# src/serving/frame_codec.py
+
+"""Binary frame messages for streaming CHIP-8 and model displays over a WebSocket.
+
+One message carries every stream that changed since the previous message:
+
+    message := version:u8 sequence:u32 count:u8 stream{count}
+    stream  := id:u8 flags:u8 length:u16 payload[length]
+
+All integers are little-endian. The payload is a frame of 256 bytes (1 bit per
+pixel, row-major, most significant bit first -- ``np.packbits`` order) or, with
+the GRAY flag, 2048 bytes (one byte per pixel). With DELTA it is XOR-ed against
+the previous frame of the same stream, and with RLE every run of zero bytes is
+replaced by ``0x00 n`` (1 <= n <= 255). Streams whose delta is empty are left
+out. The matching browser decoder is static/js/frame_codec.js.
+"""
+
+import struct
+
+import numpy as np
+
+VERSION = 1
+DELTA = 1
+RLE = 2
+GRAY = 4
+
+FRAME_SHAPE = (32, 64)
+PACKED_SIZE = 256
+GRAY_SIZE = FRAME_SHAPE[0] * FRAME_SHAPE[1]
+
+_HEADER = struct.Struct("<BIB")
+_STREAM = struct.Struct("<BBH")
+
+def pack_frame(frame, threshold=128):
+    """(32, 64) uint8 frame -> 256-byte bitmap; 256-byte inputs are assumed packed already."""
+    frame = np.asarray(frame, dtype=np.uint8)
+    if frame.size == PACKED_SIZE:
+        return frame.reshape(PACKED_SIZE)
+    return np.packbits(frame.reshape(GRAY_SIZE) >= threshold)
+
+def unpack_frame(packed):
+    return np.unpackbits(np.asarray(packed, dtype=np.uint8)).reshape(FRAME_SHAPE) * np.uint8(255)
+
+def rle_encode(data):
+    """Replace each run of zero bytes with 0x00 followed by its length (split at 255)."""
+    data = np.asarray(data, dtype=np.uint8)
+    zero = np.concatenate(([False], data == 0, [False]))
+    edges = np.flatnonzero(zero[1:] != zero[:-1])
+    out = bytearray()
+    position = 0
+    for start, end in zip(edges[0::2], edges[1::2]):
+        out += data[position:start].tobytes()
+        for run in range(end - start, 0, -255):
+            out += bytes((0, min(run, 255)))
+        position = end
+    out += data[position:].tobytes()
+    return bytes(out)
+
+def rle_decode(payload, size):
+    out = np.zeros(size, dtype=np.uint8)
+    i = position = 0
+    while i < len(payload):
+        if payload[i] == 0:
+            position += payload[i + 1]
+            i += 2
+        else:
+            out[position] = payload[i]
+            position += 1
+            i += 1
+    return out
+
+class FrameEncoder:
+    """Builds frame messages, keeping the last frame sent per stream as the delta base.
+
+    A keyframe (full frames for every stream) is sent every `keyframe_interval`
+    messages and after request_keyframe(), so viewers that join late resynchronize.
+    """
+
+    def __init__(self, keyframe_interval=60, rle=True, grayscale=False):
+        self.keyframe_interval = keyframe_interval
+        self.rle = rle
+        self.grayscale = grayscale
+        self.sequence = 0
+        self._previous = {}
+        self._keyframe_requested = True
+
+    def request_keyframe(self):
+        self._keyframe_requested = True
+
+    def reset(self):
+        self._previous.clear()
+        self.request_keyframe()
+
+    def _raw(self, frame):
+        frame = np.asarray(frame, dtype=np.uint8)
+        if self.grayscale and frame.size == GRAY_SIZE:
+            return frame.reshape(GRAY_SIZE), GRAY
+        return pack_frame(frame), 0
+
+    def encode(self, frames):
+        """Encode {stream id: frame} into one message; frames are (32, 64) or packed (256,)."""
+        keyframe = self._keyframe_requested or (self.keyframe_interval and
+                                                self.sequence % self.keyframe_interval == 0)
+        self._keyframe_requested = False
+
+        streams = []
+        for stream_id, frame in frames.items():
+            raw, flags = self._raw(frame)
+            previous = self._previous.get(stream_id)
+            payload = raw
+            if not keyframe and previous is not None and previous.size == raw.size:
+                payload = np.bitwise_xor(raw, previous)
+                if not payload.any():
+                    continue
+                flags |= DELTA
+            self._previous[stream_id] = raw.copy()
+            streams.append(self._stream(stream_id, flags, payload))
+
+        message = _HEADER.pack(VERSION, self.sequence & 0xFFFFFFFF, len(streams)) + b"".join(streams)
+        self.sequence += 1
+        return message
+
+    def keyframe(self):
+        """Full copies of the last frame sent on every stream, without advancing the encoder.
+
+        Lets one viewer that missed deltas resynchronize while the others keep getting deltas.
+        """
+        streams = [self._stream(stream_id, GRAY if raw.size == GRAY_SIZE else 0, raw)
+                   for stream_id, raw in self._previous.items()]
+        return _HEADER.pack(VERSION, (self.sequence - 1) & 0xFFFFFFFF, len(streams)) + b"".join(streams)
+
+    def _stream(self, stream_id, flags, payload):
+        data = payload.tobytes()
+        if self.rle:
+            compressed = rle_encode(payload)
+            if len(compressed) < len(data):
+                data, flags = compressed, flags | RLE
+        return _STREAM.pack(stream_id, flags, len(data)) + data
+
+class FrameDecoder:
+    """Python counterpart of the browser decoder, for tests and tooling."""
+
+    def __init__(self):
+        self._previous = {}
+
+    def decode(self, message):
+        """Return (sequence, {stream id: (32, 64) uint8 frame}) for the streams in `message`.
+
+        Deltas for a stream with no base yet are skipped; wait for the next keyframe.
+        """
+        version, sequence, count = _HEADER.unpack_from(message, 0)
+        if version != VERSION:
+            raise ValueError(f"Unsupported frame message version {version}")
+        offset = _HEADER.size
+        frames = {}
+        for _ in range(count):
+            stream_id, flags, length = _STREAM.unpack_from(message, offset)
+            offset += _STREAM.size
+            payload = message[offset:offset + length]
+            offset += length
+
+            size = GRAY_SIZE if flags & GRAY else PACKED_SIZE
+            raw = rle_decode(payload, size) if flags & RLE else np.frombuffer(payload, dtype=np.uint8).copy()
+            if flags & DELTA:
+                previous = self._previous.get(stream_id)
+                if previous is None or previous.size != size:
+                    continue
+                raw ^= previous
+            self._previous[stream_id] = raw
+            frames[stream_id] = raw.reshape(FRAME_SHAPE) if flags & GRAY else unpack_frame(raw)
+        return sequence, frames
+
+def encode_png(frame):
+    """A (32, 64) uint8 frame as PNG bytes, for snapshots rather than the live stream."""
+    import io
+    from PIL import Image
+
+    buffered = io.BytesIO()
+    Image.fromarray(frame).save(buffered, format="PNG")
+    return buffered.getvalue()
@@ -0,0 +1,167 @@
+# src/serving/inference.py
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+from emulators.config import Config
+from emulators.simulate_emulator import EmulatorSimulator
+
+class _ModelWorker:
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.requests = queue.Queue()
+        self.thread = None
+        self.batches = 0
+        self.frames = 0
+
+class InferenceService:
+    """Coalesces next-frame predictions for the same checkpoint into batched forward passes.
+
+    Requests are queued per model. Each model's worker thread takes the first waiting
+    request, keeps collecting for up to `max_wait` seconds or until `max_batch` frames
+    are queued, runs EmulatorSimulator.predict once over the batch and resolves every
+    request's Future with its own (32, 64) uint8 frame. Both limits default to
+    `inference_max_batch` and `inference_max_wait_ms` from the config.
+    """
+
+    def __init__(self, max_batch=None, max_wait=None, config_path="config.json"):
+        config = Config(config_path)
+        self.max_batch = max_batch or config.get("inference_max_batch")
+        self.max_wait = max_wait if max_wait is not None else config.get("inference_max_wait_ms") / 1000.0
+        self.config_path = config_path
+        self._workers = {}
+        self._lock = threading.Lock()
+
+    def load(self, model_path):
+        """Load `model_path` once and start its worker; later calls return the same simulator."""
+        with self._lock:
+            worker = self._workers.get(model_path)
+            if worker is None:
+                worker = _ModelWorker(EmulatorSimulator(model_path, self.config_path))
+                worker.thread = threading.Thread(target=self._run, args=(worker,), daemon=True)
+                worker.thread.start()
+                self._workers[model_path] = worker
+        return worker.simulator
+
+    def _worker(self, model_path):
+        with self._lock:
+            worker = self._workers.get(model_path)
+        if worker is None:
+            self.load(model_path)
+            with self._lock:
+                worker = self._workers[model_path]
+        return worker
+
+    def submit(self, model_path, frame):
+        """Queue one (32, 64) uint8 frame; the Future resolves to the predicted next frame."""
+        future = Future()
+        self._worker(model_path).requests.put((np.asarray(frame, dtype=np.uint8), future))
+        return future
+
+    def submit_many(self, model_path, frames):
+        worker = self._worker(model_path)
+        futures = []
+        for frame in frames:
+            future = Future()
+            worker.requests.put((np.asarray(frame, dtype=np.uint8), future))
+            futures.append(future)
+        return futures
+
+    def predict(self, model_path, frame, timeout=None):
+        return self.submit(model_path, frame).result(timeout)
+
+    def stream(self, model_path):
+        """An EmulatorSimulator-like handle whose steps are batched with every other stream."""
+        self.load(model_path)
+        return SimulatorStream(self, model_path)
+
+    def get_stats(self):
+        with self._lock:
+            workers = dict(self._workers)
+        return {
+            model_path: {
+                "batches": worker.batches,
+                "frames": worker.frames,
+                "mean_batch": worker.frames / worker.batches if worker.batches else 0.0,
+            }
+            for model_path, worker in workers.items()
+        }
+
+    def close(self):
+        with self._lock:
+            workers, self._workers = list(self._workers.values()), {}
+        for worker in workers:
+            worker.requests.put(None)
+        for worker in workers:
+            worker.thread.join()
+
+    def _run(self, worker):
+        while True:
+            request = worker.requests.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.perf_counter() + self.max_wait
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    remaining = deadline - time.perf_counter()
+                    request = worker.requests.get(timeout=remaining) if remaining > 0 else worker.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+
+            try:
+                predictions = worker.simulator.predict(np.stack([frame for frame, _ in batch]))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), prediction in zip(batch, predictions):
+                    future.set_result(prediction)
+            worker.batches += 1
+            worker.frames += len(batch)
+            if stopping:
+                return
+
+class SimulatorStream:
+    """Per-stream state for one model driven through an InferenceService.
+
+    Mirrors EmulatorSimulator's set_frame/step/get_frame/run_frame, but the frame kept
+    between steps is the uint8 prediction rather than the raw float output.
+    """
+
+    def __init__(self, service, model_path, screen_height=32, screen_width=64):
+        self.service = service
+        self.model_path = model_path
+        self.screen_height = screen_height
+        self.screen_width = screen_width
+        self.keys = [False] * 16
+        self.reset()
+
+    def reset(self):
+        self.frame = np.zeros((self.screen_height, self.screen_width), dtype=np.uint8)
+
+    def set_frame(self, frame):
+        if frame.shape != (self.screen_height, self.screen_width):
+            raise ValueError(f"Frame shape should be ({self.screen_height}, {self.screen_width})")
+        self.frame = np.asarray(frame, dtype=np.uint8)
+
+    def set_keys(self, keys):
+        self.keys = keys
+
+    def step(self):
+        self.frame = self.service.predict(self.model_path, self.frame)
+
+    def get_frame(self):
+        return self.frame
+
+    def run_frame(self):
+        self.step()
+        return self.get_frame()
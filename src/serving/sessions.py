@@ -0,0 +1,253 @@
+# src/serving/sessions.py
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+from emulators import CHIP8
+from emulators.frame_scheduler import FrameScheduler
+from serving.frame_codec import FrameEncoder
+from serving.inference import InferenceService
+
+class Session:
+    """One emulator, the model streams compared against it, and the clients watching it."""
+
+    def __init__(self, session_id, rom_path, model_paths, config_path="config.json"):
+        self.session_id = session_id
+        self.rom_path = rom_path
+        self.model_paths = list(model_paths)
+        self.emulator = CHIP8(config_path)
+        if not self.emulator.load_rom(rom_path):
+            raise ValueError(f"Failed to load ROM: {rom_path}")
+        # Stream 0 is the emulator; model i is stream i + 1
+        self.stream_names = ["CHIP-8"] + self.model_paths
+        self.encoder = FrameEncoder()
+        self.last_frame = np.zeros((self.emulator.screen_height, self.emulator.screen_width), dtype=np.uint8)
+        self.last_generation = None
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        # client id -> messages sent but not yet acknowledged
+        self.viewers = {}
+        # Clients that missed a delta and must be sent a keyframe next
+        self.lagging = set()
+        self._keys = None
+        self.lock = threading.Lock()
+
+    def set_keys(self, keys):
+        """Queue a keypad state; it is applied at the start of the next tick."""
+        if not isinstance(keys, (list, tuple)) or len(keys) != 16:
+            raise ValueError("Keys must be a list of 16 boolean values")
+        self._keys = [bool(key) for key in keys]
+
+    def apply_keys(self):
+        keys, self._keys = self._keys, None
+        if keys is not None:
+            self.emulator.set_keys(keys)
+
+    def describe(self):
+        return {
+            "session_id": self.session_id,
+            "rom_path": self.rom_path,
+            "streams": self.stream_names,
+            "viewers": len(self.viewers),
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+        }
+
+class SessionManager:
+    """Runs every active session from one scheduler thread.
+
+    Each tick applies queued inputs, steps all emulators (stepping releases the GIL, so
+    `num_workers` threads overlap), and submits the sessions whose display changed to
+    the InferenceService, which batches them per model. The resulting frames wait in a
+    pending map holding the latest frames of each session until the encoder thread sends
+    them to every viewer through `send(event, data, to, callback)`. A viewer with
+    `max_in_flight` unacknowledged messages has frames dropped until it catches up,
+    then gets a keyframe.
+    """
+
+    def __init__(self, send, config_path="config.json", fps=60, num_workers=4, max_in_flight=4, inference=None):
+        self.send = send
+        self.config_path = config_path
+        self.fps = fps
+        self.num_workers = num_workers
+        self.max_in_flight = max_in_flight
+        self.sessions = {}
+        self.inference = inference or InferenceService(config_path=config_path)
+        self.tick_seconds = 0.0
+        self._lock = threading.Lock()
+        # session id -> (session, frames) not yet encoded; newer ticks replace older frames
+        self._pending = {}
+        self._pending_ready = threading.Condition()
+        self._executor = ThreadPoolExecutor(num_workers) if num_workers > 1 else None
+        self._threads = []
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._threads = [threading.Thread(target=target, daemon=True) for target in (self._run, self._encode)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        with self._pending_ready:
+            self._running = False
+            self._pending_ready.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def create_session(self, rom_path, model_paths=()):
+        model_paths = [path for path in model_paths if path]
+        # Sessions comparing against the same checkpoint share one loaded model
+        for model_path in model_paths:
+            self.inference.load(model_path)
+        session = Session(uuid.uuid4().hex[:12], rom_path, model_paths, self.config_path)
+        with self._lock:
+            self.sessions[session.session_id] = session
+        return session
+
+    def stop_session(self, session_id):
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        for client in list(session.viewers):
+            self.send("session_stopped", {"session_id": session_id}, to=client)
+        return True
+
+    def get(self, session_id):
+        with self._lock:
+            return self.sessions.get(session_id)
+
+    def list_sessions(self):
+        with self._lock:
+            return [session.describe() for session in self.sessions.values()]
+
+    def watch(self, session_id, client):
+        """Subscribe `client` and send it the current frames, if any have been encoded yet."""
+        session = self.get(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            session.viewers[client] = 0
+            if session.encoder.sequence:
+                session.viewers[client] = 1
+                self.send("frame_data", session.encoder.keyframe(), to=client,
+                          callback=partial(self._acknowledge, session, client))
+        return session
+
+    def unwatch(self, client):
+        with self._lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            with session.lock:
+                session.viewers.pop(client, None)
+                session.lagging.discard(client)
+
+    def request_keyframe(self, session_id, client):
+        session = self.get(session_id)
+        if session is not None:
+            with session.lock:
+                session.lagging.add(client)
+
+    def _advance(self, sessions, frames=1):
+        for session in sessions:
+            session.emulator.advance(frames)
+
+    def tick(self, frames=1):
+        """Advance every session `frames` frames, then infer, encode and publish once."""
+        with self._lock:
+            sessions = list(self.sessions.values())
+        if not sessions:
+            return
+        start = time.perf_counter()
+
+        for session in sessions:
+            session.apply_keys()
+        if self._executor is None:
+            self._advance(sessions, frames)
+        else:
+            chunk = -(-len(sessions) // self.num_workers)
+            list(self._executor.map(partial(self._advance, frames=frames),
+                                    [sessions[i:i + chunk] for i in range(0, len(sessions), chunk)]))
+
+        changed = []
+        for session in sessions:
+            generation = session.emulator.display_generation
+            if generation != session.last_generation:
+                session.last_generation = generation
+                session.last_frame = session.emulator.get_display()
+                changed.append((session, {0: session.last_frame}))
+
+        # Every changed session is submitted at once, so each model sees them as one batch
+        by_model = {}
+        for session, streams in changed:
+            for stream_id, model_path in enumerate(session.model_paths, start=1):
+                by_model.setdefault(model_path, []).append((streams, stream_id, session.last_frame))
+        submitted = [(requests, self.inference.submit_many(model_path, [frame for _, _, frame in requests]))
+                     for model_path, requests in by_model.items()]
+        for requests, futures in submitted:
+            for (streams, stream_id, _), future in zip(requests, futures):
+                streams[stream_id] = future.result()
+
+        if changed:
+            self._publish(changed)
+        self.tick_seconds = time.perf_counter() - start
+
+    def _publish(self, changed):
+        # While the encoder is behind, a session's newer frames replace its pending ones, so
+        # only intermediate frames are skipped and the latest frame of every session is sent.
+        # Deltas are taken against the last frame actually encoded, so skipping is safe.
+        with self._pending_ready:
+            for session, streams in changed:
+                self._pending[session.session_id] = (session, streams)
+            self._pending_ready.notify()
+
+    def _run(self):
+        # When a tick runs long, the next one advances the sessions by every frame that is
+        # due, so games keep real-time speed and only the intermediate frames go unsent
+        scheduler = FrameScheduler(self.fps, policy="skip")
+        while self._running:
+            self.tick(scheduler.wait())
+
+    def _encode(self):
+        while True:
+            with self._pending_ready:
+                while self._running and not self._pending:
+                    self._pending_ready.wait()
+                if not self._running:
+                    break
+                pending, self._pending = self._pending, {}
+            for session, streams in pending.values():
+                with session.lock:
+                    message = session.encoder.encode(streams)
+                    self._deliver(session, message)
+
+    def _deliver(self, session, message):
+        keyframe = None
+        for client, in_flight in list(session.viewers.items()):
+            if in_flight >= self.max_in_flight:
+                session.lagging.add(client)
+                session.frames_dropped += 1
+                continue
+            if client in session.lagging:
+                if keyframe is None:
+                    keyframe = session.encoder.keyframe()
+                payload = keyframe
+                session.lagging.discard(client)
+            else:
+                payload = message
+            session.viewers[client] = in_flight + 1
+            session.frames_sent += 1
+            self.send("frame_data", payload, to=client, callback=partial(self._acknowledge, session, client))
+
+    def _acknowledge(self, session, client, *args):
+        with session.lock:
+            if client in session.viewers:
+                session.viewers[client] = max(session.viewers[client] - 1, 0)
@@ -0,0 +1,94 @@
+# src/training/profiling.py
+import os
+import resource
+import sys
+import time
+from contextlib import nullcontext
+
+import torch
+
+PHASES = ("data_wait", "transfer", "forward", "backward", "optimizer")
+
+class StepTimer:
+    """Accumulates wall time per training-step phase and samples seen over one epoch.
+
+    CUDA work is asynchronous, so on a CUDA device each phase synchronizes before it is
+    timed; otherwise the cost would show up in whichever phase next waits on the GPU.
+    """
+
+    def __init__(self, device='cpu'):
+        self.device = torch.device(device)
+        self.sync = self.device.type == 'cuda'
+        self.reset()
+
+    def reset(self):
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.last = dict.fromkeys(PHASES, 0.0)
+        self.steps = 0
+        self.samples = 0
+        self.started = time.perf_counter()
+        self._mark = self.started
+        if self.sync:
+            torch.cuda.reset_peak_memory_stats(self.device)
+
+    def start(self):
+        """Restart the clock; time until the next lap is charged to that lap's phase."""
+        self._mark = time.perf_counter()
+
+    def lap(self, phase):
+        """Charge the time since the previous lap (or start) to `phase`."""
+        if self.sync and phase != "data_wait":
+            torch.cuda.synchronize(self.device)
+        now = time.perf_counter()
+        self.last[phase] = now - self._mark
+        self.totals[phase] += self.last[phase]
+        self._mark = now
+
+    def step(self, batch_size):
+        self.steps += 1
+        self.samples += batch_size
+
+    def peak_memory_mb(self):
+        """Peak CUDA memory allocated this epoch, or the process's peak RSS on CPU."""
+        if self.sync:
+            return torch.cuda.max_memory_allocated(self.device) / 2**20
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        steps = max(self.steps, 1)
+        step_time = sum(self.totals.values())
+        summary = {f"{phase}_ms": total / steps * 1000.0 for phase, total in self.totals.items()}
+        summary["step_ms"] = step_time / steps * 1000.0
+        summary["data_wait_fraction"] = self.totals["data_wait"] / step_time if step_time else 0.0
+        summary["samples_per_sec"] = self.samples / elapsed if elapsed else 0.0
+        summary["peak_memory_mb"] = self.peak_memory_mb()
+        return summary
+
+def create_profiler(steps, trace_dir):
+    """A torch.profiler over the global training steps in `steps` (e.g. range(10, 15)).
+
+    One step before the window is used as profiler warmup. Chrome traces are written
+    to `trace_dir` and can be opened in TensorBoard or chrome://tracing.
+    """
+    steps = range(steps.start, steps.stop) if isinstance(steps, range) else range(*steps)
+    if len(steps) == 0:
+        raise ValueError("profile_steps must cover at least one step")
+    warmup = 1 if steps.start > 0 else 0
+    os.makedirs(trace_dir, exist_ok=True)
+    activities = [torch.profiler.ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(torch.profiler.ProfilerActivity.CUDA)
+    return torch.profiler.profile(
+        activities=activities,
+        schedule=torch.profiler.schedule(wait=steps.start - warmup, warmup=warmup, active=len(steps), repeat=1),
+        on_trace_ready=torch.profiler.tensorboard_trace_handler(trace_dir),
+        record_shapes=True,
+        profile_memory=True,
+    )
+
+def record(name, profiler):
+    """Label a region in the profiler trace; free when no profiler is running."""
+    return torch.profiler.record_function(name) if profiler is not None else nullcontext()
@@ -1,51 +1,115 @@
 # src/training/trainer.py
+import os
 import torch
 from torch.utils.data import DataLoader
-from experiment_tracking.Logger import Logger
+from experiment_tracking.StreamingLogger import StreamingLogger
+from training.profiling import StepTimer, create_profiler, record
 
 class Trainer:
-    def __init__(self, model, optimizer, criterion, device='cuda' if torch.cuda.is_available() else 'cpu'):
+    def __init__(self, model, optimizer, criterion, device='cuda' if torch.cuda.is_available() else 'cpu',
+                 profile_steps=None, log_interval=0, log_dir='experiments'):
+        """`profile_steps` (e.g. range(10, 15)) runs torch.profiler over those global training
+        steps; `log_interval` > 0 also logs per-step timings every that many steps."""
         self.model = model
         self.optimizer = optimizer
         self.criterion = criterion
         self.device = device
-        self.logger = Logger('experiments')
+        self.logger = StreamingLogger(log_dir)
+        self.profile_steps = profile_steps
+        self.log_interval = log_interval
+        self.timer = StepTimer(device)
+        self.global_step = 0
+        self.profiler = None
     
     def train(self, train_loader, val_loader, epochs):
         self.model.to(self.device)
-        for epoch in range(epochs):
-            train_loss = self._train_epoch(train_loader)
-            val_loss = self._validate(val_loader)
-            
-            self.logger.log_metric('train_loss', train_loss, epoch)
-            self.logger.log_metric('val_loss', val_loss, epoch)
-            
-            print(f'Epoch {epoch+1}/{epochs}, Train Loss: {train_loss:.4f}, Val Loss: {val_loss:.4f}')
+        self.logger.log_parameter('device', str(self.device))
+        if self.profile_steps is not None:
+            trace_dir = os.path.join(self.logger.log_dir, f"profile_{self.logger.experiment_id}")
+            self.profiler = create_profiler(self.profile_steps, trace_dir)
+            self.profiler.start()
+            self.logger.log_artifact('profiler_traces', trace_dir)
+        try:
+            for epoch in range(epochs):
+                train_loss = self._train_epoch(train_loader)
+                throughput = self.timer.summary()
+                val_loss = self._validate(val_loader)
+                
+                self.logger.log_metric('train_loss', train_loss, epoch)
+                self.logger.log_metric('val_loss', val_loss, epoch)
+                for name, value in throughput.items():
+                    self.logger.log_metric(name, value, epoch)
+                
+                print(f'Epoch {epoch+1}/{epochs}, Train Loss: {train_loss:.4f}, Val Loss: {val_loss:.4f}, '
+                      f'{throughput["samples_per_sec"]:.0f} samples/s, '
+                      f'data wait {throughput["data_wait_fraction"]:.0%}, '
+                      f'peak mem {throughput["peak_memory_mb"]:.0f} MB')
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+                self.profiler = None
     
     def _train_epoch(self, train_loader):
         self.model.train()
         total_loss = 0.0
-        for batch in train_loader:
-            inputs, targets = batch
-            inputs, targets = inputs.to(self.device), targets.to(self.device)
+        num_batches = 0
+        timer, profiler = self.timer, self.profiler
+        timer.reset()
+        batches = iter(train_loader)
+        timer.start()
+        while True:
+            with record("data_wait", profiler):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            timer.lap("data_wait")
+            # (frame, next_frame) pairs or (frame, keys, next_frame) transitions
+            inputs, targets = batch[0], batch[-1]
+            with record("transfer", profiler):
+                inputs, targets = inputs.to(self.device), targets.to(self.device)
+            timer.lap("transfer")
             
             self.optimizer.zero_grad()
-            outputs = self.model(inputs)
-            loss = self.criterion(outputs, targets)
-            loss.backward()
-            self.optimizer.step()
+            with record("forward", profiler):
+                outputs = self.model(inputs)
+                loss = self.criterion(outputs, targets)
+            timer.lap("forward")
+            with record("backward", profiler):
+                loss.backward()
+            timer.lap("backward")
+            with record("optimizer", profiler):
+                self.optimizer.step()
+            timer.lap("optimizer")
             
             total_loss += loss.item()
-        return total_loss / len(train_loader)
+            num_batches += 1
+            timer.step(inputs.size(0))
+            self._log_step(loss)
+            if profiler is not None:
+                profiler.step()
+            self.global_step += 1
+            # Time spent logging and stepping the profiler is not charged to the next batch
+            timer.start()
+        return total_loss / max(num_batches, 1)
+
+    def _log_step(self, loss):
+        if not self.log_interval or self.global_step % self.log_interval:
+            return
+        step = self.global_step
+        self.logger.log_metric('step_loss', loss.item(), step)
+        for phase, seconds in self.timer.last.items():
+            self.logger.log_metric(f'step_{phase}_ms', seconds * 1000.0, step)
     
     def _validate(self, val_loader):
         self.model.eval()
         total_loss = 0.0
+        num_batches = 0
         with torch.no_grad():
             for batch in val_loader:
-                inputs, targets = batch
+                inputs, targets = batch[0], batch[-1]
                 inputs, targets = inputs.to(self.device), targets.to(self.device)
                 outputs = self.model(inputs)
                 loss = self.criterion(outputs, targets)
                 total_loss += loss.item()
-        return total_loss / len(val_loader)
\ No newline at end of file
+                num_batches += 1
+        return total_loss / max(num_batches, 1)
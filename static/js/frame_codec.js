@@ -0,0 +1,99 @@
+// File: static/js/frame_codec.js
+
+// Decoder for the binary frame messages built by src/serving/frame_codec.py:
+//   message := version:u8 sequence:u32 count:u8 stream{count}
+//   stream  := id:u8 flags:u8 length:u16 payload[length]   (little-endian)
+
+const FRAME_WIDTH = 64;
+const FRAME_HEIGHT = 32;
+const FRAME_VERSION = 1;
+const FRAME_DELTA = 1;
+const FRAME_RLE = 2;
+const FRAME_GRAY = 4;
+const PACKED_SIZE = FRAME_WIDTH * FRAME_HEIGHT / 8;
+const GRAY_SIZE = FRAME_WIDTH * FRAME_HEIGHT;
+
+function rleDecode(payload, size) {
+    const out = new Uint8Array(size);
+    let position = 0;
+    for (let i = 0; i < payload.length; ) {
+        if (payload[i] === 0) {
+            position += payload[i + 1];
+            i += 2;
+        } else {
+            out[position++] = payload[i++];
+        }
+    }
+    return out;
+}
+
+class FrameDecoder {
+    constructor() {
+        this.previous = new Map();
+        this.needsKeyframe = false;
+    }
+
+    // Returns {sequence, frames: Map(stream id -> Uint8Array of 2048 pixel intensities)}.
+    // A delta without a base sets needsKeyframe so the caller can ask the server for one.
+    decode(buffer) {
+        const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer);
+        const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+        if (view.getUint8(0) !== FRAME_VERSION) {
+            throw new Error(`Unsupported frame message version ${view.getUint8(0)}`);
+        }
+        const sequence = view.getUint32(1, true);
+        const count = view.getUint8(5);
+        const frames = new Map();
+        let offset = 6;
+        for (let s = 0; s < count; s++) {
+            const id = view.getUint8(offset);
+            const flags = view.getUint8(offset + 1);
+            const length = view.getUint16(offset + 2, true);
+            const payload = bytes.subarray(offset + 4, offset + 4 + length);
+            offset += 4 + length;
+
+            const size = (flags & FRAME_GRAY) ? GRAY_SIZE : PACKED_SIZE;
+            const raw = (flags & FRAME_RLE) ? rleDecode(payload, size) : payload.slice();
+            if (flags & FRAME_DELTA) {
+                const previous = this.previous.get(id);
+                if (!previous || previous.length !== size) {
+                    this.needsKeyframe = true;
+                    continue;
+                }
+                for (let i = 0; i < size; i++) {
+                    raw[i] ^= previous[i];
+                }
+            }
+            this.previous.set(id, raw);
+            frames.set(id, (flags & FRAME_GRAY) ? raw : unpackFrame(raw));
+        }
+        return {sequence, frames};
+    }
+}
+
+function unpackFrame(packed) {
+    const pixels = new Uint8Array(GRAY_SIZE);
+    for (let i = 0; i < PACKED_SIZE; i++) {
+        const byte = packed[i];
+        for (let bit = 0; bit < 8; bit++) {
+            pixels[i * 8 + bit] = (byte & (0x80 >> bit)) ? 255 : 0;
+        }
+    }
+    return pixels;
+}
+
+// Writes 0-255 intensities into a 64x32 canvas, reusing one ImageData per canvas.
+function drawFrame(canvas, pixels, foreground = [255, 255, 255], background = [0, 0, 0]) {
+    if (!canvas.frameImage) {
+        canvas.frameImage = canvas.getContext('2d').createImageData(FRAME_WIDTH, FRAME_HEIGHT);
+    }
+    const data = canvas.frameImage.data;
+    for (let i = 0; i < GRAY_SIZE; i++) {
+        const t = pixels[i] / 255;
+        data[i * 4] = background[0] + (foreground[0] - background[0]) * t;
+        data[i * 4 + 1] = background[1] + (foreground[1] - background[1]) * t;
+        data[i * 4 + 2] = background[2] + (foreground[2] - background[2]) * t;
+        data[i * 4 + 3] = 255;
+    }
+    canvas.getContext('2d').putImageData(canvas.frameImage, 0, 0);
+}
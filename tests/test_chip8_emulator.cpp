@@ -1,6 +1,7 @@
 #define CATCH_CONFIG_MAIN
 #include "catch.hpp"
 #include "chip8_emulator.hpp"
+#include "chip8_batch.hpp"
 
 TEST_CASE("CHIP8Emulator initialization", "[chip8]") {
     CHIP8Emulator emulator;
@@ -51,4 +52,495 @@ TEST_CASE("CHIP8Emulator instruction execution", "[chip8]") {
             REQUIRE(state[i] == 0);
         }
     }
-}
\ No newline at end of file
+}
+
+static void load_program(CHIP8Emulator& emulator, const std::vector<uint8_t>& program) {
+    std::vector<uint8_t> state = emulator.get_state();
+    std::copy(program.begin(), program.end(), state.begin() + 0x200);
+    emulator.set_state(state);
+    emulator.seed(0);
+}
+
+TEST_CASE("CHIP8Emulator native multi-cycle execution", "[chip8][run]") {
+    // V0 = 1; DT = V0 + 200; loop: V1 += 1; V0 += V1; JP loop
+    const std::vector<uint8_t> program = {
+        0x60, 0x01, 0x62, 0xC8, 0x82, 0x04, 0xF2, 0x15,
+        0x71, 0x01, 0x80, 0x14, 0x12, 0x08
+    };
+
+    SECTION("run_cycles matches repeated step calls") {
+        CHIP8Emulator stepped;
+        CHIP8Emulator batched;
+        load_program(stepped, program);
+        load_program(batched, program);
+
+        for (int i = 0; i < 1000; ++i) {
+            stepped.step();
+        }
+        batched.run_cycles(1000);
+
+        REQUIRE(stepped.get_state() == batched.get_state());
+    }
+
+    SECTION("run_frames runs frames * cycles_per_frame cycles") {
+        CHIP8Emulator cycles;
+        CHIP8Emulator frames;
+        load_program(cycles, program);
+        load_program(frames, program);
+
+        // run_frames ticks the timers once per frame
+        cycles.set_timer_period(9);
+        cycles.run_cycles(7 * 9);
+        frames.run_frames(7, 9);
+
+        REQUIRE(cycles.get_state() == frames.get_state());
+    }
+}
+
+TEST_CASE("CHIP8Batch steps machines independently", "[chip8][batch]") {
+    // Wait for key 5, then draw the font glyph for 5 at (0, 0) and idle.
+    const std::vector<uint8_t> program = {
+        0x60, 0x00, 0x61, 0x00, 0x62, 0x05, 0xE2, 0x9E,
+        0x12, 0x06, 0xF2, 0x29, 0xD0, 0x15, 0x12, 0x0E
+    };
+    const size_t machines = 4;
+    const size_t frame_size = CHIP8Batch::FRAME_SIZE;
+
+    std::vector<uint8_t> inputs(machines * CHIP8Batch::KEY_COUNT, 0);
+    inputs[1 * CHIP8Batch::KEY_COUNT + 5] = 1;
+    inputs[3 * CHIP8Batch::KEY_COUNT + 5] = 1;
+
+    auto run_batch = [&](size_t threads) {
+        CHIP8Batch batch(machines, threads);
+        for (size_t i = 0; i < machines; ++i) {
+            load_program(batch.machine(i), program);
+        }
+        batch.set_inputs(inputs.data(), inputs.size());
+        batch.run_frames(3, 10);
+        std::vector<uint8_t> frames(machines * frame_size);
+        batch.get_frames(frames.data(), frames.size());
+        return frames;
+    };
+
+    std::vector<uint8_t> frames = run_batch(1);
+
+    SECTION("Each machine matches a standalone emulator") {
+        for (size_t i = 0; i < machines; ++i) {
+            CHIP8Emulator emulator;
+            load_program(emulator, program);
+            emulator.set_input(inputs.data() + i * CHIP8Batch::KEY_COUNT, CHIP8Batch::KEY_COUNT);
+            emulator.run_frames(3, 10);
+            std::vector<uint8_t> expected(frame_size);
+            emulator.get_frame(expected.data(), expected.size());
+
+            INFO("Machine " << i << " diverged from standalone emulator");
+            REQUIRE(std::equal(expected.begin(), expected.end(), frames.begin() + i * frame_size));
+        }
+        REQUIRE(frames[1 * frame_size] == 255);
+        REQUIRE(frames[0 * frame_size] == 0);
+    }
+
+    SECTION("Threaded stepping matches single-threaded stepping") {
+        REQUIRE(run_batch(3) == frames);
+    }
+
+    SECTION("Mismatched buffers are rejected") {
+        CHIP8Batch batch(machines);
+        std::vector<uint8_t> short_inputs(CHIP8Batch::KEY_COUNT);
+        REQUIRE_THROWS_AS(batch.set_inputs(short_inputs.data(), short_inputs.size()), std::invalid_argument);
+    }
+}
+
+TEST_CASE("CHIP8Emulator frame access", "[chip8][frame]") {
+    // Draw the font glyph for 0 at (3, 2).
+    const std::vector<uint8_t> program = {
+        0x60, 0x03, 0x61, 0x02, 0x62, 0x00, 0xF2, 0x29, 0xD0, 0x15
+    };
+    CHIP8Emulator emulator;
+    load_program(emulator, program);
+    emulator.run_cycles(5);
+
+    std::vector<uint8_t> frame(CHIP8Emulator::SCREEN_WIDTH * CHIP8Emulator::SCREEN_HEIGHT);
+    emulator.get_frame(frame.data(), frame.size());
+
+    SECTION("frame_data exposes the same pixels as get_frame") {
+        REQUIRE(std::equal(frame.begin(), frame.end(), emulator.frame_data()));
+        REQUIRE(frame[2 * CHIP8Emulator::SCREEN_WIDTH + 3] == 255);
+        REQUIRE(frame[2 * CHIP8Emulator::SCREEN_WIDTH + 2] == 0);
+    }
+
+    SECTION("Packed frame is 1 bit per pixel, most significant bit first") {
+        std::vector<uint8_t> packed(CHIP8Emulator::PACKED_FRAME_SIZE);
+        emulator.get_frame_packed(packed.data(), packed.size());
+        for (size_t i = 0; i < frame.size(); ++i) {
+            bool bit = (packed[i / 8] >> (7 - i % 8)) & 1;
+            INFO("Pixel " << i << " differs in packed frame");
+            REQUIRE(bit == (frame[i] == 255));
+        }
+        std::vector<uint8_t> wrong_size(CHIP8Emulator::PACKED_FRAME_SIZE + 1);
+        REQUIRE_THROWS_AS(emulator.get_frame_packed(wrong_size.data(), wrong_size.size()), std::invalid_argument);
+    }
+}
+
+TEST_CASE("CHIP8Emulator snapshots and rewind", "[chip8][state]") {
+    // V0 = 1; loop: V1 += 1; V0 += V1; JP loop
+    const std::vector<uint8_t> program = {
+        0x60, 0x01, 0x71, 0x01, 0x80, 0x14, 0x12, 0x02
+    };
+    CHIP8Emulator emulator;
+    load_program(emulator, program);
+
+    SECTION("Buffer snapshots match vector snapshots") {
+        emulator.run_cycles(25);
+        std::vector<uint8_t> buffer(CHIP8Emulator::STATE_SIZE);
+        emulator.get_state(buffer.data(), buffer.size());
+        REQUIRE(buffer == emulator.get_state());
+
+        CHIP8Emulator restored;
+        restored.set_state(buffer.data(), buffer.size());
+        REQUIRE(restored.get_state() == buffer);
+        REQUIRE_THROWS_AS(restored.set_state(buffer.data(), buffer.size() - 1), std::invalid_argument);
+    }
+
+    SECTION("Rewind restores earlier frames from the ring") {
+        emulator.enable_rewind(4, 2);
+        std::vector<std::vector<uint8_t>> frames;
+        for (int i = 0; i < 12; ++i) {
+            emulator.run_frames(1, 5);
+            frames.push_back(emulator.get_state());
+        }
+        // Snapshots are taken after frames 2, 4, ..., 12; only the last four are kept.
+        REQUIRE(emulator.rewind_available() == 4);
+        REQUIRE_FALSE(emulator.rewind(5));
+
+        REQUIRE(emulator.rewind(2));
+        REQUIRE(emulator.get_state() == frames[9]);
+        REQUIRE(emulator.rewind_available() == 3);
+
+        REQUIRE(emulator.rewind(3));
+        REQUIRE(emulator.get_state() == frames[5]);
+        REQUIRE(emulator.rewind_available() == 1);
+    }
+}
+
+TEST_CASE("CHIP8Emulator per-instance RNG", "[chip8][rng]") {
+    // loop: V0 = RND & 0xFF; V1 += V0; JP loop
+    const std::vector<uint8_t> program = {
+        0xC0, 0xFF, 0x81, 0x04, 0x12, 0x00
+    };
+    auto run = [&](uint32_t seed, size_t cycles) {
+        CHIP8Emulator emulator;
+        load_program(emulator, program);
+        emulator.seed(seed);
+        emulator.run_cycles(cycles);
+        return emulator.get_state();
+    };
+
+    SECTION("Equal seeds give identical runs") {
+        REQUIRE(run(1234, 300) == run(1234, 300));
+        REQUIRE(run(1234, 300) != run(1235, 300));
+    }
+
+    SECTION("Restoring a snapshot also restores the generator") {
+        CHIP8Emulator emulator;
+        load_program(emulator, program);
+        emulator.seed(99);
+        emulator.run_cycles(30);
+        std::vector<uint8_t> snapshot = emulator.get_state();
+        emulator.run_cycles(90);
+        std::vector<uint8_t> expected = emulator.get_state();
+
+        CHIP8Emulator other;
+        other.seed(7);
+        other.set_state(snapshot);
+        other.run_cycles(90);
+        REQUIRE(other.get_state() == expected);
+    }
+}
+
+TEST_CASE("CHIP8Emulator cached engine matches the interpreter", "[chip8][engine]") {
+    auto compare = [](const std::vector<uint8_t>& program, size_t cycles) {
+        CHIP8Emulator interpreted;
+        CHIP8Emulator cached;
+        load_program(interpreted, program);
+        load_program(cached, program);
+        cached.set_engine(ExecutionEngine::Cached);
+        for (size_t i = 0; i < cycles; ++i) {
+            interpreted.step();
+            cached.step();
+            INFO("States diverged after cycle " << i);
+            REQUIRE(interpreted.get_state() == cached.get_state());
+        }
+    };
+
+    SECTION("Arithmetic, random numbers, BCD and drawing") {
+        compare({
+            0x60, 0x05, 0x61, 0xFB, 0x80, 0x14, 0x80, 0x15, 0x80, 0x16, 0x80, 0x1E,
+            0x80, 0x17, 0xC2, 0x3F, 0xA3, 0x00, 0xF2, 0x33, 0xF2, 0x65, 0xF0, 0x29,
+            0xD2, 0x05, 0x72, 0x07, 0x12, 0x00
+        }, 500);
+    }
+
+    SECTION("Self-modifying code invalidates decoded instructions") {
+        // Loop on V2 += 1 until V2 == 5, then rewrite that instruction to V3 += 2 with Fx55.
+        std::vector<uint8_t> program = {
+            0xA2, 0x08, 0x60, 0x73, 0x61, 0x02, 0x12, 0x08,
+            0x72, 0x01, 0x32, 0x05, 0x12, 0x08, 0xF1, 0x55, 0x12, 0x08
+        };
+        compare(program, 200);
+
+        CHIP8Emulator cached;
+        load_program(cached, program);
+        cached.set_engine(ExecutionEngine::Cached);
+        cached.run_cycles(200);
+        std::vector<uint8_t> state = cached.get_state();
+        REQUIRE(state[CHIP8Emulator::MEMORY_SIZE + 2] == 5);
+        REQUIRE(state[CHIP8Emulator::MEMORY_SIZE + 3] > 0);
+    }
+
+    SECTION("Restoring a snapshot re-decodes only the code it changes") {
+        // Decode one program, then restore a snapshot holding another at the same addresses
+        // (V0 = 0x73 differs from the first program's 0x60 0x05 only in its second byte)
+        const std::vector<uint8_t> first = {0x60, 0x05, 0x61, 0xFB, 0x80, 0x14, 0x72, 0x07, 0x12, 0x00};
+        const std::vector<uint8_t> second = {0x60, 0x73, 0x61, 0x02, 0x80, 0x15, 0x72, 0x03, 0xA3, 0x00, 0xF2, 0x33, 0x12, 0x00};
+        CHIP8Emulator interpreted;
+        CHIP8Emulator cached;
+        cached.set_engine(ExecutionEngine::Cached);
+        load_program(cached, first);
+        cached.run_cycles(50);
+        load_program(interpreted, second);
+        cached.set_state(interpreted.get_state());
+        for (size_t i = 0; i < 100; ++i) {
+            interpreted.step();
+            cached.step();
+            INFO("States diverged after cycle " << i);
+            REQUIRE(interpreted.get_state() == cached.get_state());
+        }
+    }
+}
+
+TEST_CASE("CHIP8Emulator idle loop fast-forward", "[chip8][idle]") {
+    // Timer periods that do and don't divide the loop lengths, including one tick per cycle
+    const size_t timer_period = GENERATE(1, 4, 10);
+    auto compare = [timer_period](const std::vector<uint8_t>& program, const std::vector<uint8_t>& keys,
+                                  size_t frames, size_t cycles_per_frame, ExecutionEngine engine) {
+        CHIP8Emulator reference;
+        CHIP8Emulator skipping;
+        load_program(reference, program);
+        load_program(skipping, program);
+        reference.set_timer_period(timer_period);
+        skipping.set_timer_period(timer_period);
+        reference.set_idle_skip(false);
+        reference.set_engine(engine);
+        skipping.set_engine(engine);
+        reference.set_input(keys.data(), keys.size());
+        skipping.set_input(keys.data(), keys.size());
+        for (size_t i = 0; i < frames; ++i) {
+            reference.run_cycles(cycles_per_frame);
+            skipping.run_cycles(cycles_per_frame);
+            INFO("States diverged after frame " << i);
+            REQUIRE(reference.get_state() == skipping.get_state());
+        }
+        REQUIRE(reference.get_idle_cycles_skipped() == 0);
+        return skipping.get_idle_skipped();
+    };
+    const std::vector<uint8_t> no_keys(16, 0);
+    const auto engine = GENERATE(ExecutionEngine::Interpreter, ExecutionEngine::Cached);
+
+    SECTION("Jump to self") {
+        // DT = ST = 200; JP self
+        auto skipped = compare({0x60, 0xC8, 0xF0, 0x15, 0xF0, 0x18, 0x12, 0x06}, no_keys, 20, 9, engine);
+        REQUIRE(skipped[static_cast<size_t>(IdleLoop::JumpSelf)] > 0);
+    }
+
+    SECTION("Waiting for a key") {
+        // DT = 100; V1 = K; V2 = 1
+        const std::vector<uint8_t> program = {0x60, 0x64, 0xF0, 0x15, 0xF1, 0x0A, 0x62, 0x01, 0x12, 0x08};
+        auto skipped = compare(program, no_keys, 20, 9, engine);
+        REQUIRE(skipped[static_cast<size_t>(IdleLoop::KeyWait)] > 0);
+
+        std::vector<uint8_t> keys(16, 0);
+        keys[7] = 1;
+        skipped = compare(program, keys, 5, 9, engine);
+        REQUIRE(skipped[static_cast<size_t>(IdleLoop::KeyWait)] == 0);
+    }
+
+    SECTION("Polling the delay timer") {
+        // Repeatedly: DT = V5 += 37; wait until DT reads 0; V6 += 1
+        const std::vector<uint8_t> program = {
+            0x75, 0x25, 0xF5, 0x15, 0xF3, 0x07, 0x33, 0x00, 0x12, 0x04, 0x76, 0x01, 0x12, 0x00
+        };
+        auto skipped = compare(program, no_keys, 200, 7, engine);
+        REQUIRE(skipped[static_cast<size_t>(IdleLoop::TimerWait)] > 0);
+    }
+
+    SECTION("Polling the delay timer with loads in the loop") {
+        // Repeatedly: DT = V5 += 29; V1 = 9; wait until DT reads 0 while I = 0x300, ST = V1; V6 += 1
+        const std::vector<uint8_t> program = {
+            0x75, 0x1D, 0xF5, 0x15, 0x61, 0x09, 0xF3, 0x07, 0xA3, 0x00, 0xF1, 0x18,
+            0x33, 0x00, 0x12, 0x06, 0x76, 0x01, 0x12, 0x00
+        };
+        auto skipped = compare(program, no_keys, 200, 11, engine);
+        REQUIRE(skipped[static_cast<size_t>(IdleLoop::TimerWait)] > 0);
+    }
+}
+
+TEST_CASE("CHIP8Emulator 60 Hz timers", "[chip8][timer]") {
+    // DT = ST = 200; JP self
+    const std::vector<uint8_t> program = {0x60, 0xC8, 0xF0, 0x15, 0xF0, 0x18, 0x12, 0x06};
+    // Snapshot layout: memory, V, I, PC, stack, SP, DT, ST, ...
+    const size_t timers = CHIP8Emulator::getMemorySize() + CHIP8Emulator::getRegisterCount() + 2 + 2 + 16 * 2 + 1;
+    auto delay_timer = [timers](const CHIP8Emulator& emulator) { return emulator.get_state()[timers]; };
+    auto sound_timer = [timers](const CHIP8Emulator& emulator) { return emulator.get_state()[timers + 1]; };
+
+    SECTION("Timers tick once per timer period, not once per instruction") {
+        CHIP8Emulator emulator;
+        load_program(emulator, program);
+        emulator.set_idle_skip(false);
+        REQUIRE(emulator.get_timer_period() == CHIP8Emulator::DEFAULT_TIMER_PERIOD);
+        emulator.set_timer_period(4);
+
+        // The loads run in cycles 1-3; cycle 4 is the first tick
+        emulator.run_cycles(3);
+        REQUIRE(delay_timer(emulator) == 200);
+        emulator.step();
+        REQUIRE(delay_timer(emulator) == 199);
+        emulator.run_cycles(4 * 10 - 1);
+        REQUIRE(delay_timer(emulator) == 190);
+        REQUIRE(sound_timer(emulator) == 190);
+    }
+
+    SECTION("run_frames ticks once per frame whatever the clock speed") {
+        for (size_t cycles_per_frame : {7, 10, 33}) {
+            CHIP8Emulator emulator;
+            load_program(emulator, program);
+            emulator.run_frames(25, cycles_per_frame);
+            INFO("cycles_per_frame = " << cycles_per_frame);
+            REQUIRE(emulator.get_timer_period() == CHIP8Emulator::DEFAULT_TIMER_PERIOD);
+            REQUIRE(delay_timer(emulator) == 175);
+            REQUIRE(sound_timer(emulator) == 175);
+        }
+    }
+
+    SECTION("run_frames leaves the configured period to run_cycles") {
+        CHIP8Emulator emulator;
+        load_program(emulator, program);
+        emulator.set_idle_skip(false);
+        emulator.set_timer_period(4);
+        emulator.run_frames(2, 33);
+        REQUIRE(emulator.get_timer_period() == 4);
+        REQUIRE(delay_timer(emulator) == 198);
+        // Both frames ended on a tick; from here timers tick every 4 cycles again
+        emulator.run_cycles(3);
+        REQUIRE(delay_timer(emulator) == 198);
+        emulator.run_cycles(4 * 10 - 3);
+        REQUIRE(delay_timer(emulator) == 188);
+    }
+
+    SECTION("A zero timer period is rejected") {
+        CHIP8Emulator emulator;
+        REQUIRE_THROWS_AS(emulator.set_timer_period(0), std::invalid_argument);
+    }
+}
+
+TEST_CASE("CHIP8Emulator display dirty tracking", "[chip8][dirty]") {
+    CHIP8Emulator emulator;
+    emulator.set_engine(GENERATE(ExecutionEngine::Interpreter, ExecutionEngine::Cached));
+    // CLS; V0 = 0; V1 = 8; I = glyph 0; DRW V0, V1, 5; JP self
+    load_program(emulator, {0x00, 0xE0, 0x60, 0x00, 0x61, 0x08, 0xA0, 0x00, 0xD0, 0x15, 0x12, 0x0A});
+
+    SECTION("set_state marks every row dirty") {
+        REQUIRE(emulator.take_dirty_rows() == CHIP8Emulator::ALL_ROWS);
+        REQUIRE(emulator.get_dirty_rows() == 0);
+    }
+
+    SECTION("CLS and DRW bump the generation and mark the rows they touch") {
+        emulator.take_dirty_rows();
+        uint64_t generation = emulator.get_display_generation();
+
+        emulator.step();
+        REQUIRE(emulator.get_display_generation() == generation + 1);
+        REQUIRE(emulator.take_dirty_rows() == CHIP8Emulator::ALL_ROWS);
+
+        emulator.run_cycles(3);
+        REQUIRE(emulator.get_display_generation() == generation + 1);
+        REQUIRE(emulator.get_dirty_rows() == 0);
+
+        emulator.step();
+        REQUIRE(emulator.get_display_generation() == generation + 2);
+        REQUIRE(emulator.take_dirty_rows() == (0x1Fu << 8));
+
+        emulator.run_cycles(100);
+        REQUIRE(emulator.get_display_generation() == generation + 2);
+        REQUIRE(emulator.get_dirty_rows() == 0);
+    }
+}
+
+TEST_CASE("CHIP8Emulator execution profile", "[chip8][profile]") {
+    const auto engine = GENERATE(ExecutionEngine::Interpreter, ExecutionEngine::Cached);
+    const bool idle_skip = GENERATE(false, true);
+    CHIP8Emulator emulator;
+    emulator.set_engine(engine);
+    emulator.set_idle_skip(idle_skip);
+    // CLS; V0 = 0; V1 = 8; I = glyph 0; DRW V0, V1, 5; V2 = K; JP self
+    load_program(emulator, {0x00, 0xE0, 0x60, 0x00, 0x61, 0x08, 0xA0, 0x00, 0xD0, 0x15, 0xF2, 0x0A, 0x12, 0x0C});
+
+    SECTION("Nothing is counted while profiling is off") {
+        emulator.run_cycles(100);
+        REQUIRE_FALSE(emulator.get_profiling());
+        REQUIRE(emulator.get_profile().pc_hits.empty());
+        REQUIRE(emulator.get_profile().key_wait_cycles == 0);
+    }
+
+    SECTION("Counts cover executed and fast-forwarded cycles alike") {
+        emulator.set_profiling(true);
+        emulator.run_cycles(100);
+        const ExecutionProfile& profile = emulator.get_profile();
+        REQUIRE(profile.clears == 1);
+        REQUIRE(profile.draws == 1);
+        REQUIRE(profile.key_wait_cycles == 95);
+        REQUIRE(profile.pc_hits[0x20A] == 95);
+        REQUIRE(profile.opcode_classes[0x0] == 1);
+        REQUIRE(profile.opcode_classes[0x6] == 2);
+        REQUIRE(profile.opcode_classes[0xA] == 1);
+        REQUIRE(profile.opcode_classes[0xD] == 1);
+        REQUIRE(profile.opcode_classes[0xF] == 95);
+
+        // The Fx0A that gets its key is a hit but not a wait; then the jump to self spins
+        std::vector<uint8_t> keys(16, 0);
+        keys[3] = 1;
+        emulator.set_input(keys.data(), keys.size());
+        emulator.run_cycles(51);
+        REQUIRE(profile.key_wait_cycles == 95);
+        REQUIRE(profile.pc_hits[0x20A] == 96);
+        REQUIRE(profile.pc_hits[0x20C] == 50);
+        REQUIRE(profile.opcode_classes[0x1] == 50);
+
+        emulator.set_profiling(false);
+        emulator.run_cycles(10);
+        REQUIRE(profile.pc_hits[0x20C] == 50);
+        emulator.reset_profile();
+        REQUIRE(profile.pc_hits[0x20A] == 0);
+        REQUIRE(profile.opcode_classes[0xF] == 0);
+        REQUIRE(profile.draws == 0);
+    }
+
+    SECTION("Delay-timer polls are counted per instruction of the loop") {
+        // Repeatedly: DT = V5 += 37; wait until DT reads 0; V6 += 1
+        CHIP8Emulator reference;
+        reference.set_engine(engine);
+        reference.set_idle_skip(false);
+        const std::vector<uint8_t> program = {
+            0x75, 0x25, 0xF5, 0x15, 0xF3, 0x07, 0x33, 0x00, 0x12, 0x04, 0x76, 0x01, 0x12, 0x00
+        };
+        load_program(reference, program);
+        load_program(emulator, program);
+        reference.set_profiling(true);
+        emulator.set_profiling(true);
+        reference.run_frames(200, 7);
+        emulator.run_frames(200, 7);
+        REQUIRE(reference.get_profile().pc_hits == emulator.get_profile().pc_hits);
+        REQUIRE(reference.get_profile().opcode_classes == emulator.get_profile().opcode_classes);
+        REQUIRE(emulator.get_profile().pc_hits[0x204] > 200);
+    }
+}
@@ -0,0 +1,53 @@
+# File: tests/test_state_store.py
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from data.state_store import StateStore
+
+def make_states(count=100, size=4000, seed=0):
+    """States that change a few bytes per step, like consecutive emulator snapshots."""
+    rng = np.random.default_rng(seed)
+    state = rng.integers(0, 256, size, dtype=np.uint8)
+    states = []
+    for _ in range(count):
+        state[rng.integers(0, size, 8)] = rng.integers(0, 256, 8, dtype=np.uint8)
+        states.append(state.tobytes())
+    return states
+
+def make_store(states):
+    store = StateStore(page_size=64, keyframe_interval=16)
+    store.extend(states)
+    return store
+
+def test_get_in_random_order():
+    states = make_states()
+    store = make_store(states)
+    for index in np.random.default_rng(1).permutation(len(states)):
+        assert store.get(int(index)) == states[index]
+    assert store[-1] == states[-1]
+    with pytest.raises(IndexError):
+        store.get(len(states))
+
+def test_save_load_round_trip(tmp_path):
+    states = make_states()
+    path = str(tmp_path / "states")
+    make_store(states).save(path)
+    loaded = StateStore.load(path)
+    assert len(loaded) == len(states)
+    assert [loaded.get(i) for i in range(len(states))] == states
+
+    # Appending after a load continues the delta chain from the last stored state
+    extra = make_states(count=20, seed=2)
+    loaded.extend(extra)
+    assert loaded.get(len(states) + 19) == extra[-1]
+
+def test_empty_store_round_trip(tmp_path):
+    path = str(tmp_path / "empty.npz")
+    StateStore().save(path)
+    assert len(StateStore.load(path)) == 0